@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['musician', 'ai_oracle_musician'],  # loaded on demand by musician_registry
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
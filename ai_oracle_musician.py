@@ -1,44 +1,52 @@
 # C:\syncphony\ai_oracle_musician.py
-# WORKING VERSION - Properly handles the decorator signature
+# Dispatch goes through MusicianProcess._execute_decorated_action like every other musician
 import json
 import os
 import sys
 import asyncio
+import collections
+import copy
+import hashlib
+import time
 from datetime import datetime
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from blob_store import atomic_write
 from musician import MusicianProcess
 from telemetry import emit_telemetry_event
+from workflow_analysis import analyze_workflow
 
-class AIOracleMusician(MusicianProcess):
+# --- Configuration ---
+ORACLE_BACKEND = os.environ.get('SYNCPHONY_ORACLE_BACKEND', "simulated")
+ORACLE_LATENCY_SCALE = float(os.environ.get('SYNCPHONY_ORACLE_LATENCY_SCALE', 1.0))  # simulated thinking time multiplier
+ORACLE_MEMO_MAX_ENTRIES = 256
+ORACLE_MEMO_TTL_SECONDS = float(os.environ.get('SYNCPHONY_ORACLE_MEMO_TTL', 24 * 3600))
+ORACLE_MEMO_DIR = os.environ.get('SYNCPHONY_ORACLE_MEMO_DIR',
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "oracle"))
+
+class SimulatedOracleBackend:
     """
-    AI Oracle Musician - TEST VERSION
-    Simulates AI responses to demonstrate the workflow without requiring Claude API access.
+    Canned, deterministic responses standing in for a real model. Thinking
+    time is simulated with asyncio.sleep so the musician's loop stays free.
     """
-    
-    def _map_actions(self):
-        return {
-            "analyze_goal": self.analyze_goal,
-            "suggest_symphony": self.suggest_symphony,
-            "capability_assessment": self.capability_assessment,
-            "optimize_workflow": self.optimize_workflow,
-            "explain_approach": self.explain_approach,
-            "generate_symphony": self.generate_symphony
-        }
-    
-    def analyze_goal(self, goal_description, context=None):
-        """
-        Analyzes a user's goal and breaks it down into actionable components.
-        """
-        self.log_queue.put(f"[{self.name}]: Analyzing goal: {goal_description}")
-        
-        # Simulate thinking time with blocking sleep (since this is sync)
-        import time
-        time.sleep(2)
-        
-        # Simulated analysis response
+    THINKING_SECONDS = {
+        "analyze_goal": 2,
+        "suggest_symphony": 1.5,
+        "generate_symphony": 3,
+        "capability_assessment": 1,
+        "explain_approach": 1.5,
+    }
+
+    def __init__(self, latency_scale=ORACLE_LATENCY_SCALE):
+        self.latency_scale = latency_scale
+
+    async def respond(self, action, arguments):
+        await asyncio.sleep(self.THINKING_SECONDS.get(action, 1) * self.latency_scale)
+        return getattr(self, f"_{action}")(**arguments)
+
+    def _analyze_goal(self, goal_description, context=None):
         analysis = {
             "goal_breakdown": [
                 "Set up web scraping environment",
@@ -64,20 +72,9 @@ class AIOracleMusician(MusicianProcess):
             ],
             "recommended_approach": "Use Python with requests/BeautifulSoup, implement rate limiting, save to structured CSV"
         }
-        
-        self.log_queue.put(f"[{self.name}]: Goal analysis complete - identified {len(analysis['goal_breakdown'])} main steps")
         return analysis
-    
-    def suggest_symphony(self, goal_description, analysis=None):
-        """
-        Suggests an optimal Symphony structure for achieving the goal.
-        """
-        self.log_queue.put(f"[{self.name}]: Suggesting Symphony for: {goal_description}")
-        
-        # Simulate thinking time
-        import time
-        time.sleep(1.5)
-        
+
+    def _suggest_symphony(self, goal_description, analysis=None):
         suggestion = {
             "symphony_overview": "Multi-stage web scraping pipeline with error handling and data validation",
             "task_sequence": [
@@ -108,20 +105,9 @@ class AIOracleMusician(MusicianProcess):
             ],
             "resource_requirements": ["Python environment", "Internet connection", "Storage space for data"]
         }
-        
-        self.log_queue.put(f"[{self.name}]: Symphony suggestion complete - {len(suggestion['task_sequence'])} tasks recommended")
         return suggestion
-    
-    def generate_symphony(self, goal_description, analysis=None, suggestion=None):
-        """
-        Generates a complete Symphony JSON file ready for execution.
-        """
-        self.log_queue.put(f"[{self.name}]: Generating complete Symphony for: {goal_description}")
-        
-        # Simulate thinking time
-        import time
-        time.sleep(3)
-        
+
+    def _generate_symphony(self, goal_description, analysis=None, suggestion=None):
         symphony = {
             "symphony_info": {
                 "name": "Real Estate Web Scraper Symphony",
@@ -185,20 +171,9 @@ class AIOracleMusician(MusicianProcess):
                 }
             ]
         }
-        
-        self.log_queue.put(f"[{self.name}]: Complete Symphony generated with {len(symphony['tasks'])} tasks")
         return symphony
-    
-    def capability_assessment(self, requirements):
-        """
-        Assesses whether Syncphony can handle the given requirements.
-        """
-        self.log_queue.put(f"[{self.name}]: Assessing capabilities for: {requirements}")
-        
-        # Simulate thinking time
-        import time
-        time.sleep(1)
-        
+
+    def _capability_assessment(self, requirements):
         assessment = {
             "can_handle": True,
             "confidence_level": "high",
@@ -221,62 +196,9 @@ class AIOracleMusician(MusicianProcess):
             ],
             "recommendation": "proceed"
         }
-        
-        self.log_queue.put(f"[{self.name}]: Capability assessment complete - recommendation: {assessment['recommendation']}")
         return assessment
-    
-    def optimize_workflow(self, existing_symphony):
-        """
-        Analyzes an existing Symphony and suggests optimizations.
-        """
-        self.log_queue.put(f"[{self.name}]: Optimizing workflow")
-        
-        # Simulate analysis time
-        import time
-        time.sleep(2)
-        
-        optimization = {
-            "optimization_opportunities": [
-                "Add parallel data validation step",
-                "Include progress monitoring", 
-                "Add error recovery mechanisms",
-                "Implement data backup checkpoints"
-            ],
-            "parallelization_suggestions": [
-                "URL processing can be parallelized",
-                "Data validation independent of CSV creation"
-            ],
-            "performance_improvements": [
-                "Use connection pooling for HTTP requests",
-                "Implement asynchronous scraping",
-                "Add caching for repeated requests"
-            ],
-            "reliability_enhancements": [
-                "Add retry logic with exponential backoff",
-                "Implement health checks for target sites",
-                "Create fallback data sources"
-            ],
-            "resource_optimizations": [
-                "Stream large datasets instead of loading in memory",
-                "Use compression for output files",
-                "Implement smart rate limiting"
-            ],
-            "estimated_improvement": 35
-        }
-        
-        self.log_queue.put(f"[{self.name}]: Workflow optimization complete - {optimization['estimated_improvement']}% improvement estimated")
-        return optimization
-    
-    def explain_approach(self, goal_description, proposed_symphony=None):
-        """
-        Explains the reasoning behind a proposed approach in human-friendly terms.
-        """
-        self.log_queue.put(f"[{self.name}]: Explaining approach for: {goal_description}")
-        
-        # Simulate explanation generation time
-        import time
-        time.sleep(1.5)
-        
+
+    def _explain_approach(self, goal_description, proposed_symphony=None):
         explanation = {
             "executive_summary": "This approach uses a staged pipeline to safely and efficiently scrape real estate data, emphasizing reliability and respectful data collection practices.",
             "step_by_step_explanation": [
@@ -311,56 +233,215 @@ class AIOracleMusician(MusicianProcess):
                 "Add machine learning for data insights"
             ]
         }
-        
-        self.log_queue.put(f"[{self.name}]: Approach explanation complete - {len(explanation['step_by_step_explanation'])} steps detailed")
         return explanation
 
-    # The key fix: match the EXACT signature that the decorated wrapper expects
-    async def _execute_decorated_action(self, action_name, parameters, task_id, *args, **kwargs):
+# Backends implement `async respond(action, arguments) -> dict`; pick one with SYNCPHONY_ORACLE_BACKEND.
+ORACLE_BACKENDS = {
+    "simulated": SimulatedOracleBackend,
+}
+
+class OracleMemo:
+    """
+    Memoizes Oracle responses by (action, normalized arguments).
+
+    Lookups go to an in-memory LRU first, then to one JSON file per key on
+    disk (shared across runs, expired after ttl_seconds). Concurrent requests
+    for the same key while it is being computed wait for that one computation
+    instead of starting their own (single-flight).
+    """
+    def __init__(self, cache_dir=ORACLE_MEMO_DIR, max_entries=ORACLE_MEMO_MAX_ENTRIES, ttl_seconds=ORACLE_MEMO_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = collections.OrderedDict()  # key -> (stored_at, value)
+        self._inflight = {}
+
+    @staticmethod
+    def key(action, arguments):
+        # Omitted and None arguments are the same request; dict key order does not matter.
+        normalized = {name: value for name, value in arguments.items() if value is not None}
+        material = json.dumps([action, normalized], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key, stored_at, value):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read(self, key):
+        """The fresh on-disk entry for key, or None. Blocking; runs in a thread."""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - stored["stored_at"] >= self.ttl_seconds:
+            return None
+        return stored
+
+    def _write(self, key, stored):
+        """Blocking; runs in a thread."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomic_write(self._path(key), json.dumps(stored, default=str).encode('utf-8'))
+
+    async def _lookup(self, key):
+        """Returns (value, source) for a fresh memoized value, or (None, None)."""
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            return entry[1], "memory"
+        stored = await asyncio.to_thread(self._read, key)
+        if stored is None:
+            return None, None
+        self._remember(key, stored["stored_at"], stored["value"])
+        return stored["value"], "disk"
+
+    async def _store(self, key, value):
+        stored_at = time.time()
+        self._remember(key, stored_at, value)
+        await asyncio.to_thread(self._write, key, {"stored_at": stored_at, "value": value})
+
+    async def get_or_compute(self, key, compute, refresh=False):
+        """
+        Returns (value, source), where source is "memory", "disk", "coalesced"
+        or "computed". compute is a zero-argument coroutine function. With
+        refresh the memoized value is ignored and replaced.
         """
-        Override to handle the exact signature that the log_task_lifecycle decorator creates.
-        Based on the debug output, it appears the arguments are:
-        - self (the instance, but being passed as action_name)
-        - action_name (the actual action string, but being passed as parameters) 
-        - parameters (the actual parameters dict, but being passed as task_id)
-        - task_id (the actual task_id, but being passed as first *args)
+        if not refresh:
+            value, source = await self._lookup(key)
+            if source is not None:
+                return copy.deepcopy(value), source
+        if key in self._inflight:
+            value = await asyncio.shield(self._inflight[key])
+            return copy.deepcopy(value), "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+            await self._store(key, value)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("Oracle request was cancelled."))
+            # Mark the exception retrieved so an unobserved failure does not log a warning.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        return copy.deepcopy(value), "computed"
+
+
+class AIOracleMusician(MusicianProcess):
+    """
+    AI Oracle Musician - TEST VERSION
+    Simulates AI responses to demonstrate the workflow without requiring Claude API access.
+    Responses come from a pluggable async backend (ORACLE_BACKENDS) through an OracleMemo;
+    optimize_workflow is computed locally from the Symphony's DAG.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._backend = None
+        self._memo = None
+
+    def _map_actions(self):
+        return {
+            "analyze_goal": self.analyze_goal,
+            "suggest_symphony": self.suggest_symphony,
+            "capability_assessment": self.capability_assessment,
+            "optimize_workflow": self.optimize_workflow,
+            "explain_approach": self.explain_approach,
+            "generate_symphony": self.generate_symphony
+        }
+
+    async def _consult(self, action, refresh=False, **arguments):
+        """Asks the backend, going through the memo layer."""
+        if self._backend is None:
+            self._backend = ORACLE_BACKENDS[ORACLE_BACKEND]()
+            self._memo = OracleMemo()
+        key = OracleMemo.key(action, arguments)
+        response, source = await self._memo.get_or_compute(key, lambda: self._backend.respond(action, arguments), refresh)
+        if source != "computed":
+            self.log_queue.put(f"[{self.name}]: Served '{action}' from the {source} memo.")
+        return response
+
+    async def analyze_goal(self, goal_description, context=None, refresh=False):
+        """
+        Analyzes a user's goal and breaks it down into actionable components.
+        """
+        self.log_queue.put(f"[{self.name}]: Analyzing goal: {goal_description}")
+        analysis = await self._consult("analyze_goal", refresh=refresh, goal_description=goal_description, context=context)
+        self.log_queue.put(f"[{self.name}]: Goal analysis complete - identified {len(analysis['goal_breakdown'])} main steps")
+        return analysis
+
+    async def suggest_symphony(self, goal_description, analysis=None, refresh=False):
+        """
+        Suggests an optimal Symphony structure for achieving the goal.
         """
-        # Debug logging to see what we're getting
-        self.log_queue.put(f"[{self.name} DEBUG]: _execute_decorated_action called with action_name='{action_name}', parameters='{parameters}', task_id='{task_id}', args='{args}'")
-        
-        # Based on the debug output, we need to reorder the parameters:
-        # The first argument (action_name) is actually 'self' (the instance)
-        # The second argument (parameters) is actually the action_name
-        # The third argument (task_id) is actually the parameters
-        # The fourth argument (first in args) is actually the task_id
-        
-        actual_action_name = parameters  # This is where the action name actually is
-        actual_parameters = task_id      # This is where the parameters actually are
-        actual_task_id = args[0] if args else "unknown_task"  # This is where the task_id actually is
-        
-        self.log_queue.put(f"[{self.name} DEBUG]: Corrected - action='{actual_action_name}', task_id='{actual_task_id}'")
-        
-        self._current_task_id = actual_task_id
-        
-        # Make sure action_name is a string
-        if not isinstance(actual_action_name, str):
-            self.log_queue.put(f"[{self.name} ERROR]: actual_action_name is not a string: {type(actual_action_name)} = {actual_action_name}")
-            raise ValueError(f"action_name must be a string, got {type(actual_action_name)}: {actual_action_name}")
-        
-        action_method_func = self.actions.get(actual_action_name)
-        if not action_method_func:
-            self.log_queue.put(f"[{self.name} ERROR]: Available actions: {list(self.actions.keys())}")
-            raise ValueError(f"Action '{actual_action_name}' not found for Musician '{self.name}'.")
-
-        self.log_queue.put(f"[{self.name}]: Executing action '{actual_action_name}' for task '{actual_task_id}'.")
-
-        # Since our action methods are sync, run them in an executor
-        if asyncio.iscoroutinefunction(action_method_func):
-            result = await action_method_func(**actual_parameters)
-        else:
-            # Run sync method in executor to not block the event loop
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, lambda: action_method_func(**actual_parameters))
-            
-        self._current_task_id = None
-        return result
\ No newline at end of file
+        self.log_queue.put(f"[{self.name}]: Suggesting Symphony for: {goal_description}")
+        suggestion = await self._consult("suggest_symphony", refresh=refresh, goal_description=goal_description, analysis=analysis)
+        self.log_queue.put(f"[{self.name}]: Symphony suggestion complete - {len(suggestion['task_sequence'])} tasks recommended")
+        return suggestion
+
+    async def generate_symphony(self, goal_description, analysis=None, suggestion=None, refresh=False):
+        """
+        Generates a complete Symphony JSON file ready for execution.
+        """
+        self.log_queue.put(f"[{self.name}]: Generating complete Symphony for: {goal_description}")
+        symphony = await self._consult("generate_symphony", refresh=refresh, goal_description=goal_description, analysis=analysis, suggestion=suggestion)
+        self.log_queue.put(f"[{self.name}]: Complete Symphony generated with {len(symphony['tasks'])} tasks")
+        return symphony
+
+    async def capability_assessment(self, requirements, refresh=False):
+        """
+        Assesses whether Syncphony can handle the given requirements.
+        """
+        self.log_queue.put(f"[{self.name}]: Assessing capabilities for: {requirements}")
+        assessment = await self._consult("capability_assessment", refresh=refresh, requirements=requirements)
+        self.log_queue.put(f"[{self.name}]: Capability assessment complete - recommendation: {assessment['recommendation']}")
+        return assessment
+
+    async def optimize_workflow(self, existing_symphony, historical_durations=None):
+        """
+        Analyzes an existing Symphony's task DAG (a dict, or a path to a Symphony
+        JSON file) and returns a rewritten Symphony with its predicted makespan.
+        historical_durations is {task_id: ms} or the GDC's metrics_rollup summary.
+        """
+        self.log_queue.put(f"[{self.name}]: Optimizing workflow")
+        if isinstance(existing_symphony, str):
+            with open(existing_symphony, 'r', encoding='utf-8') as f:
+                existing_symphony = json.load(f)
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(None, analyze_workflow, existing_symphony, historical_durations)
+
+        makespan = analysis["predicted_makespan_ms"]
+        saved_ms = makespan["original"] - makespan["optimized"]
+        opportunities = []
+        if analysis["redundant_edges"]:
+            opportunities.append(f"Drop {len(analysis['redundant_edges'])} dependency edge(s) already implied by other paths")
+        if analysis["ordering_only_edges"]:
+            opportunities.append(f"Drop {len(analysis['ordering_only_edges'])} edge(s) between file tasks that share no paths")
+        for chain in analysis["serial_chains"]:
+            opportunities.append(f"Serial chain {' -> '.join(chain['tasks'])} has {len(chain['independent_edges'])} independent step(s)")
+        for group in analysis["batchable_groups"]:
+            opportunities.append(f"Batch {len(group['tasks'])} {group['action']} tasks into one {group['batch_action']} call")
+
+        optimization = dict(analysis)
+        optimization["optimization_opportunities"] = opportunities
+        optimization["predicted_makespan_reduction_ms"] = saved_ms
+        optimization["estimated_improvement"] = round(100 * saved_ms / makespan["original"]) if makespan["original"] else 0
+        self.log_queue.put(f"[{self.name}]: Workflow optimization complete - {optimization['estimated_improvement']}% improvement estimated")
+        return optimization
+
+    async def explain_approach(self, goal_description, proposed_symphony=None, refresh=False):
+        """
+        Explains the reasoning behind a proposed approach in human-friendly terms.
+        """
+        self.log_queue.put(f"[{self.name}]: Explaining approach for: {goal_description}")
+        explanation = await self._consult("explain_approach", refresh=refresh, goal_description=goal_description, proposed_symphony=proposed_symphony)
+        self.log_queue.put(f"[{self.name}]: Approach explanation complete - {len(explanation['step_by_step_explanation'])} steps detailed")
+        return explanation
@@ -0,0 +1,198 @@
+# C:\syncphony\blob_store.py
+# Local content-addressed store for large string values. Values above a size
+# threshold are written once, keyed by their SHA256, and replaced in GDC
+# entries and telemetry events by small {"blob", "size", "preview"} references.
+# atomic_write is also used by the other modules that replace files in place
+# (musician file actions, the HTTP cache, the Oracle memo).
+
+import hashlib
+import os
+import tempfile
+import time
+
+DEFAULT_BLOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blobs")
+BLOB_DIR = os.environ.get('SYNCPHONY_BLOB_DIR', DEFAULT_BLOB_DIR)
+BLOB_THRESHOLD_BYTES = int(os.environ.get('SYNCPHONY_BLOB_THRESHOLD', 8192))
+BLOB_PREVIEW_CHARS = 120
+BLOB_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+# mkstemp creates files as 0600; atomic writes give them the mode open() would have.
+# Read once at import: os.umask can only be queried by setting it, which is not thread-safe.
+_PROCESS_UMASK = os.umask(0)
+os.umask(_PROCESS_UMASK)
+
+def atomic_write(path, data):
+    """Writes bytes to path via a temp file in the same directory and os.replace, keeping path's mode if it exists."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_PROCESS_UMASK
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class BlobStore:
+    """
+    Content-addressed blobs on disk, sharded by the first two hex digits.
+
+    Writes are atomic (temp file + os.replace) so several processes can share
+    one directory; storing a value that already exists only refreshes its
+    mtime, which is what age-based garbage collection looks at.
+    """
+    def __init__(self, root_dir=BLOB_DIR, threshold_bytes=BLOB_THRESHOLD_BYTES):
+        self.root_dir = root_dir
+        self.threshold_bytes = threshold_bytes
+
+    def _path_for(self, blob_hash):
+        if len(blob_hash) != 64 or any(c not in "0123456789abcdef" for c in blob_hash):
+            raise ValueError(f"Invalid blob hash: {blob_hash!r}")
+        return os.path.join(self.root_dir, blob_hash[:2], blob_hash)
+
+    @staticmethod
+    def is_reference(value):
+        return isinstance(value, dict) and set(value) == {"blob", "size", "preview"}
+
+    def put(self, value):
+        """Stores a str or bytes value and returns its reference dict."""
+        data = value.encode('utf-8') if isinstance(value, str) else bytes(value)
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self._path_for(blob_hash)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+        preview = value[:BLOB_PREVIEW_CHARS] if isinstance(value, str) else data[:BLOB_PREVIEW_CHARS].decode('utf-8', errors='replace')
+        return {"blob": blob_hash, "size": len(data), "preview": preview}
+
+    def put_file(self, path):
+        """Stores a file's contents, streaming it through the hash, and returns its reference dict."""
+        os.makedirs(self.root_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as out, open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    if not head:
+                        head = block[:BLOB_PREVIEW_CHARS * 4]
+                    digest.update(block)
+                    out.write(block)
+                    size += len(block)
+            blob_hash = digest.hexdigest()
+            blob_path = self._path_for(blob_hash)
+            if os.path.exists(blob_path):
+                os.remove(tmp_path)
+                os.utime(blob_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        preview = head.decode('utf-8', errors='replace')[:BLOB_PREVIEW_CHARS]
+        return {"blob": blob_hash, "size": size, "preview": preview}
+
+    def get(self, blob_hash):
+        """Returns the stored bytes. Raises KeyError if the blob is unknown."""
+        try:
+            with open(self._path_for(blob_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(blob_hash)
+
+    def get_text(self, blob_hash):
+        return self.get(blob_hash).decode('utf-8', errors='replace')
+
+    def externalize(self, data):
+        """
+        Returns data with every string longer than the threshold replaced by a
+        blob reference. Containers are copied only along the replaced paths;
+        data itself is returned when nothing was large enough.
+        """
+        if isinstance(data, str):
+            # len() is a cheap lower bound on the UTF-8 size, so only encode near the threshold.
+            if len(data) * 4 > self.threshold_bytes and len(data.encode('utf-8')) > self.threshold_bytes:
+                return self.put(data)
+            return data
+        if isinstance(data, dict):
+            copied = None
+            for key, value in data.items():
+                if not isinstance(value, (str, dict, list)):
+                    continue
+                replacement = self.externalize(value)
+                if replacement is not value:
+                    if copied is None:
+                        copied = dict(data)
+                    copied[key] = replacement
+            return data if copied is None else copied
+        if isinstance(data, list):
+            copied = None
+            for i, item in enumerate(data):
+                if not isinstance(item, (str, dict, list)):
+                    continue
+                replacement = self.externalize(item)
+                if replacement is not item:
+                    if copied is None:
+                        copied = list(data)
+                    copied[i] = replacement
+            return data if copied is None else copied
+        return data
+
+    def referenced_hashes(self, data, found=None):
+        """Collects the hashes of every blob reference inside data."""
+        found = set() if found is None else found
+        if self.is_reference(data):
+            found.add(data["blob"])
+        elif isinstance(data, dict):
+            for value in data.values():
+                self.referenced_hashes(value, found)
+        elif isinstance(data, list):
+            for item in data:
+                self.referenced_hashes(item, found)
+        return found
+
+    def collect_garbage(self, max_age_seconds=BLOB_MAX_AGE_SECONDS, live_data=None):
+        """
+        Deletes blobs not stored or re-stored within max_age_seconds, except
+        those still referenced from live_data (e.g. the current GDC state).
+        Returns the number of blobs removed.
+        """
+        if not os.path.isdir(self.root_dir):
+            return 0
+        live = self.referenced_hashes(live_data) if live_data is not None else set()
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for shard in os.listdir(self.root_dir):
+            shard_dir = os.path.join(self.root_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                try:
+                    if name in live or os.path.getmtime(path) >= cutoff:
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+
+_default_store = None
+
+def get_default_blob_store():
+    """Returns the process-wide BlobStore configured from the environment."""
+    global _default_store
+    if _default_store is None:
+        _default_store = BlobStore()
+    return _default_store
@@ -4,8 +4,14 @@ import queue
 import json
 import time
 import asyncio
+import collections
+import functools
 from logger_config import get_logger
 from event_system import EventSystem, event_publisher, GDC_SNAPSHOT_EVENT
+from telemetry_metrics import MetricsRollup
+from musician_registry import required_musicians
+from shm_transport import SharedPayloadTracker
+from remote_hosts import REMOTE_LISTEN, REMOTE_WAIT_SECONDS, LOCAL_SLOTS, RemoteMusicianHub
 
 # Centralized logger for the Conductor process
 logger = get_logger("Conductor")
@@ -17,7 +23,7 @@ class Conductor:
     It manages the overall state of the performance, including task dependencies
     and execution flow.
     """
-    def __init__(self, symphony_path, task_queues, reporting_queue, input_queue, log_queue, gdc_update_queue, genome_data_cache):
+    def __init__(self, symphony_path, task_queues, reporting_queue, input_queue, log_queue, gdc_update_queue, genome_data_cache, spawn_queue=None, use_remote_hosts=True):
         self.symphony_path = symphony_path
         self.task_queues = task_queues
         self.reporting_queue = reporting_queue
@@ -25,8 +31,20 @@ class Conductor:
         self.log_queue = log_queue
         self.gdc_update_queue = gdc_update_queue
         self.gdc = genome_data_cache
+        self.spawn_queue = spawn_queue # None: musicians were started up front by the caller
         self.symphony = None
+        self.required_musicians = []
+        self._spawn_requested = set()
+        self._unavailable_musicians = {} # musician -> launch error; their tasks fail at dispatch
+        self._control_reports = collections.deque() # launcher notices that arrived on the input queue
+        self.shared_payloads = SharedPayloadTracker() # large task parameters travel in shared memory
+        # Musician hosts on other machines; with hosts connected, local musicians get LOCAL_SLOTS tasks at a time
+        self.remote_hub = RemoteMusicianHub(self.log, log_queue) if REMOTE_LISTEN and use_remote_hosts else None
+        self._local_tasks = {} # task_id -> musician, for tasks on local queues
+        self._local_in_flight = collections.Counter()
+        self._ready_since = {}
         self.task_status = {}
+        self.metrics_rollup = MetricsRollup()
         self.event_system = EventSystem() # Each process has its own EventSystem instance
         self.stop_event = asyncio.Event()
 
@@ -55,11 +73,18 @@ class Conductor:
                 raise ValueError("Symphony file must contain a 'tasks' list.")
             
             self.symphony = symphony_data
-            self.log("Symphony loaded successfully.")
+            self.required_musicians = required_musicians(self.symphony["tasks"])
+            self.log(f"Symphony loaded successfully. Musicians needed: {', '.join(self.required_musicians) or 'none'}.")
+            unknown = [name for name in self.required_musicians if name not in self.task_queues]
+            if unknown and self.remote_hub:
+                self.log(f"No local musicians for {', '.join(unknown)}; their tasks wait up to {REMOTE_WAIT_SECONDS:g}s for a remote host.", "warning")
+            elif unknown:
+                self.log(f"Symphony names unknown musicians: {', '.join(unknown)}. Their tasks will fail.", "warning")
             
             # Initialize GDC with symphony structure
             self.gdc.set('symphony_structure', self.symphony)
             self.gdc.set('performance_status', 'loaded')
+            self.gdc.set('required_musicians', self.required_musicians)
             return True
         except FileNotFoundError:
             self.log(f"Symphony load failed: File not found at {self.symphony_path}", "error")
@@ -72,6 +97,95 @@ class Conductor:
             self.log("Halting due to error loading symphony.", "error")
             return False
 
+    def _merge_metrics_rollup(self, report):
+        """Merges a musician's duration histograms and publishes p50/p95/p99 per action in the GDC."""
+        self.metrics_rollup.merge_series(report.get("series", []))
+        self.gdc.set('metrics_rollup', self.metrics_rollup.summary())
+
+    def _ensure_musician(self, name):
+        """
+        Asks Mission Control to start a musician before each of its tasks is
+        dispatched. The launcher ignores the request while the process is alive
+        and relaunches it if it has died, so a crashed musician does not leave
+        later tasks on a queue nothing reads.
+        """
+        if self.spawn_queue is None:
+            return
+        if name not in self._spawn_requested:
+            self._spawn_requested.add(name)
+            self.log(f"Requesting launch of Musician '{name}'.")
+        self.spawn_queue.put({"command": "spawn_musician", "musician": name})
+
+    def _fail_tasks_for_musician(self, name, error, tasks_in_flight):
+        """Fails every in-flight task queued for a musician that could not be launched."""
+        for task in self.symphony["tasks"]:
+            task_id = task.get("task_id")
+            if task.get("musician") == name and task_id in self._local_tasks:
+                self.log(f"Task '{task_id}' failed: Musician '{name}' could not be launched.", "error")
+                self.task_status[task_id] = "failed"
+                self.gdc.set(f"task_status.{task_id}", "failed")
+                self.report_status(task_id, "failed", error)
+                self._task_finished(task_id, tasks_in_flight)
+
+    def _task_finished(self, task_id, tasks_in_flight):
+        """Frees everything a task held once its outcome is known."""
+        tasks_in_flight.discard(task_id)
+        self.shared_payloads.release(task_id)
+        musician = self._local_tasks.pop(task_id, None)
+        if musician is not None:
+            self._local_in_flight[musician] -= 1
+
+    def _place_task(self, task):
+        """
+        Where a ready task runs: "local", a RemoteHost, None to keep it pending
+        until a slot frees up, or "missing" when no musician can play it.
+        Without a remote hub every task goes straight onto its local queue.
+        """
+        name = task['musician']
+        has_local = name in self.task_queues
+        if self.remote_hub is None:
+            return "local" if has_local else "missing"
+        if has_local and self._local_in_flight[name] < LOCAL_SLOTS:
+            return "local"
+        host = self.remote_hub.pick_host(name)
+        if host is not None:
+            return host
+        if has_local or self.remote_hub.offers(name):
+            return None
+        waited = time.monotonic() - self._ready_since.setdefault(task.get("task_id"), time.monotonic())
+        return None if waited < REMOTE_WAIT_SECONDS else "missing"
+
+    def _handle_report(self, report, tasks_in_flight):
+        if report.get("type") == "metrics_rollup":
+            self._merge_metrics_rollup(report)
+            return
+        if report.get("type") == "musician_unavailable":
+            self._unavailable_musicians[report["musician"]] = report.get("error")
+            self._fail_tasks_for_musician(report["musician"], report.get("error"), tasks_in_flight)
+            return
+        task_id = report["task_id"]
+        status = report["status"]
+
+        self.log(f"Received report for task '{task_id}': {status}" + (f" ({report['error']})" if report.get("error") else ""))
+        self.task_status[task_id] = status
+        self.gdc.set(f"task_status.{task_id}", status)
+
+        if status in ["completed", "failed"]:
+            self._task_finished(task_id, tasks_in_flight)
+
+    def _pending_reports(self):
+        """Every report available right now: launcher notices and remote hosts first, then local musicians."""
+        while self._control_reports:
+            yield self._control_reports.popleft()
+        if self.remote_hub is not None:
+            while self.remote_hub.reports:
+                yield self.remote_hub.reports.popleft()
+        while True:
+            try:
+                yield self.reporting_queue.get_nowait()
+            except queue.Empty:
+                return
+
     async def _gdc_heartbeat_task(self):
         """Periodically sends GDC updates to Mission Control."""
         while not self.stop_event.is_set():
@@ -88,17 +202,37 @@ class Conductor:
             except Exception as e:
                 self.log(f"Error in GDC heartbeat task: {e}", "error")
 
+    async def _forward_cancel(self, task_id):
+        """Asks the musician running task_id to cancel it (killing any shell command it started)."""
+        if self.remote_hub is not None and self.remote_hub.is_remote(task_id):
+            self.log(f"Forwarding cancel request for task '{task_id}' to its musician host.")
+            await self.remote_hub.cancel(task_id)
+            return
+        task = next((t for t in (self.symphony or {}).get("tasks", []) if t.get("task_id") == task_id), None)
+        musician_queue = self.task_queues.get(task['musician']) if task else None
+        if musician_queue is None:
+            self.log(f"Cannot cancel unknown task '{task_id}'.", "warning")
+            return
+        self.log(f"Forwarding cancel request for task '{task_id}' to Musician '{task['musician']}'.")
+        musician_queue.put({"command": "cancel", "task_id": task_id})
+
     async def _input_listener_task(self):
         """Listens for stop commands from the input queue."""
         loop = asyncio.get_running_loop()
         while not self.stop_event.is_set():
             try:
-                # Use run_in_executor for the blocking queue.get() call
-                command = await loop.run_in_executor(None, self.input_queue.get)
+                # Use run_in_executor for the blocking queue.get() call. The timeout lets the
+                # listener end with the performance instead of holding a thread until STOP.
+                command = await loop.run_in_executor(None, functools.partial(self.input_queue.get, timeout=1))
                 if command == 'STOP':
                     self.log("STOP command received. Initiating graceful shutdown.")
                     self.stop_event.set()
                     break
+                if isinstance(command, dict) and command.get('command') == 'cancel_task':
+                    await self._forward_cancel(command.get('task_id'))
+                elif isinstance(command, dict) and command.get('type') == 'musician_unavailable':
+                    # Launcher notices come on the input queue, which only the Conductor reads.
+                    self._control_reports.append(command)
             except queue.Empty:
                 await asyncio.sleep(0.1) # Short sleep to prevent busy-waiting
             except Exception as e:
@@ -133,41 +267,58 @@ class Conductor:
                 
                 # Check if all dependencies are met
                 deps_met = all(self.task_status.get(dep) == "completed" for dep in dependencies)
-                
-                if deps_met:
-                    self.log(f"Dispatching task '{task_id}' to Musician '{task['musician']}'.")
-                    musician_queue = self.task_queues.get(task['musician'])
-                    if musician_queue:
-                        musician_queue.put(task)
-                        self.task_status[task_id] = "dispatched"
-                        self.gdc.set(f"task_status.{task_id}", "dispatched")
-                        tasks_in_flight.add(task_id)
+                failed_dep = next((dep for dep in dependencies if self.task_status.get(dep) == "failed"), None)
+
+                if failed_dep is not None:
+                    # Otherwise the task would stay pending and the performance would never finish.
+                    self.log(f"Task '{task_id}' skipped: dependency '{failed_dep}' failed.", "error")
+                    self.task_status[task_id] = "failed"
+                    self.gdc.set(f"task_status.{task_id}", "failed")
+                    self.report_status(task_id, "failed", f"Dependency '{failed_dep}' failed.")
+                    pending_tasks.remove(task)
+                elif deps_met:
+                    target = self._place_task(task)
+                    if target is None:
+                        continue # every slot for this musician is busy
+                    if target == "local" and task['musician'] in self._unavailable_musicians:
+                        error = self._unavailable_musicians[task['musician']]
+                        self.log(f"Task '{task_id}' failed: Musician '{task['musician']}' could not be launched.", "error")
+                        self.task_status[task_id] = "failed"
+                        self.gdc.set(f"task_status.{task_id}", "failed")
+                        self.report_status(task_id, "failed", error)
                         pending_tasks.remove(task)
+                        continue
+                    if target == "local":
+                        self.log(f"Dispatching task '{task_id}' to Musician '{task['musician']}'.")
+                        self._ensure_musician(task['musician'])
+                        self.task_queues[task['musician']].put(self.shared_payloads.pack(task))
+                        self._local_tasks[task_id] = task['musician']
+                        self._local_in_flight[task['musician']] += 1
+                    elif target != "missing":
+                        # Remote hosts get the payload inline: shared memory does not cross machines.
+                        self.log(f"Dispatching task '{task_id}' to Musician '{task['musician']}' on host '{target.host_id}'.")
+                        await self.remote_hub.dispatch(target, task)
                     else:
                         self.log(f"No queue found for musician '{task['musician']}'. Task '{task_id}' failed.", "error")
                         self.task_status[task_id] = "failed"
                         self.gdc.set(f"task_status.{task_id}", "failed")
                         self.report_status(task_id, "failed", f"Musician '{task['musician']}' not found.")
                         pending_tasks.remove(task)
+                        continue
+                    self.task_status[task_id] = "dispatched"
+                    self.gdc.set(f"task_status.{task_id}", "dispatched")
+                    tasks_in_flight.add(task_id)
+                    pending_tasks.remove(task)
 
-            # Check for updates from the reporting queue
-            try:
-                report = self.reporting_queue.get_nowait()
-                task_id = report["task_id"]
-                status = report["status"]
-                
-                self.log(f"Received report for task '{task_id}': {status}")
-                self.task_status[task_id] = status
-                self.gdc.set(f"task_status.{task_id}", status)
-                
-                if status in ["completed", "failed"]:
-                    tasks_in_flight.remove(task_id)
-                    
-            except queue.Empty:
-                pass # No reports, continue loop
+            # Apply every report that arrived since the last tick
+            for report in self._pending_reports():
+                self._handle_report(report, tasks_in_flight)
 
             await asyncio.sleep(0.1) # Polling interval
 
+        self.shared_payloads.release_all()
+        if self.shared_payloads.bytes_shared:
+            self.log(f"Passed {self.shared_payloads.bytes_shared} bytes of task payloads through shared memory.")
         self.log("Performance finished.")
         self.gdc.set('performance_status', 'finished')
         self.stop_event.set() # Signal other tasks to stop
@@ -180,6 +331,13 @@ class Conductor:
             self.log("Conductor shutting down due to symphony load failure.", "error")
             return
 
+        if self.remote_hub is not None:
+            try:
+                await self.remote_hub.start()
+            except (OSError, ValueError) as e:
+                self.log(f"Cannot accept musician hosts on '{REMOTE_LISTEN}': {e}. Running with local musicians only.", "error")
+                self.remote_hub = None
+
         # Create concurrent tasks for background operations and the main performance
         gdc_task = asyncio.create_task(self._gdc_heartbeat_task())
         input_task = asyncio.create_task(self._input_listener_task())
@@ -187,13 +345,15 @@ class Conductor:
 
         # Wait for all tasks to complete
         await asyncio.gather(gdc_task, input_task, performance_task)
+        if self.remote_hub is not None:
+            await self.remote_hub.stop()
 
         self.log("Asyncio loop closed. Process shutting down.")
 
 
-def main(symphony_path, task_queues, reporting_queue, input_queue, log_queue, gdc_update_queue, genome_data_cache):
+def main(symphony_path, task_queues, reporting_queue, input_queue, log_queue, gdc_update_queue, genome_data_cache, spawn_queue=None):
     """The main function for the Conductor process."""
-    conductor = Conductor(symphony_path, task_queues, reporting_queue, input_queue, log_queue, gdc_update_queue, genome_data_cache)
+    conductor = Conductor(symphony_path, task_queues, reporting_queue, input_queue, log_queue, gdc_update_queue, genome_data_cache, spawn_queue)
     try:
         asyncio.run(conductor.start())
     except KeyboardInterrupt:
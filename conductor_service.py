@@ -0,0 +1,429 @@
+# C:\syncphony\conductor_service.py
+# Headless Conductor service: runs many performances at once without the
+# Mission Control GUI. Every performance is a Conductor on the service's event
+# loop; their tasks do not go to per-role musician queues but to a shared pool
+# of musician processes (MusicianSlots, several per role). A fair scheduler
+# hands idle slots to the performance with the fewest tasks running, and no
+# performance runs more than its concurrency cap at once.
+#
+# Symphonies arrive over a local TCP socket (newline-delimited JSON, see
+# _handle_client), the WebSocket start_symphony command, or `python -m
+# syncphony run`. The TCP socket is unauthenticated: anyone who can connect
+# can run any symphony, and so any shell command, as this user. Keep
+# SYNCPHONY_SERVICE_LISTEN on a loopback address on shared machines. The
+# WebSocket commands need SYNCPHONY_WS_TOKEN. Task ids are namespaced "<performance_id>/<task_id>" while
+# they are in the pool, so performances may reuse the same ids.
+
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logger_config import get_logger
+from conductor import Conductor
+from genome_data_cache import GenomeDataCache
+from blob_store import get_default_blob_store
+from musician_registry import MUSICIAN_REGISTRY, MusicianSlot, canonical_name, musician_names, stop_slots
+from remote_hosts import parse_address, read_message, send_message
+from telemetry_metrics import MetricsRollup
+
+logger = get_logger("ConductorService")
+
+SERVICE_LISTEN = os.environ.get('SYNCPHONY_SERVICE_LISTEN', "127.0.0.1:7080")
+SERVICE_SLOTS_PER_ROLE = int(os.environ.get('SYNCPHONY_SERVICE_SLOTS', 2))              # musician processes per role
+SYMPHONY_MAX_CONCURRENCY = int(os.environ.get('SYNCPHONY_SYMPHONY_MAX_CONCURRENCY', 4))  # tasks one performance runs at once
+MAX_CONCURRENT_PERFORMANCES = int(os.environ.get('SYNCPHONY_MAX_PERFORMANCES', 16))     # later submissions queue
+SCHEDULER_TICK_SECONDS = 0.1
+PERFORMANCE_LOG_TAIL = 200
+
+class Performance:
+    """One submitted symphony and its Conductor."""
+    def __init__(self, performance_id, symphony_path, max_concurrency=None):
+        self.performance_id = performance_id
+        self.symphony_path = symphony_path
+        self.max_concurrency = max_concurrency
+        self.status = "queued"
+        self.conductor = None
+        self.reporting_queue = queue.Queue()
+        self.input_queue = queue.Queue()
+        self.log_queue = queue.Queue()
+        self.gdc_update_queue = queue.Queue()
+        self.gdc_state = None
+        self.log_tail = collections.deque(maxlen=PERFORMANCE_LOG_TAIL)
+        self.ready = collections.deque()  # (role, task) handed over by the Conductor, not yet on a musician
+        self.running = set()              # namespaced ids of tasks on a musician
+        self.served_at = 0.0
+        self.stop_requested = False
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    def concurrency_cap(self):
+        """Explicit cap from the submission, else the symphony's own "max_concurrency", else the service default."""
+        if self.max_concurrency:
+            return self.max_concurrency
+        symphony = self.conductor.symphony if self.conductor else None
+        return int((symphony or {}).get("max_concurrency") or SYMPHONY_MAX_CONCURRENCY)
+
+    def summary(self):
+        task_status = self.conductor.task_status if self.conductor else {}
+        return {
+            "performance_id": self.performance_id,
+            "symphony_path": self.symphony_path,
+            "status": self.status,
+            "tasks": dict(collections.Counter(task_status.values())),
+            "failed_tasks": [task_id for task_id, status in task_status.items() if status == "failed"],
+            "running": len(self.running),
+            "waiting_for_musician": len(self.ready),
+            "queued_s": round((self.started_at or time.time()) - self.submitted_at, 3),
+            "duration_s": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+        }
+
+
+class _ServiceTaskQueue:
+    """Stands in for a musician's task queue in one performance's Conductor; puts go to the service's scheduler."""
+    def __init__(self, service, performance, role):
+        self.service = service
+        self.performance = performance
+        self.role = role
+
+    def put(self, message):
+        self.service._accept(self.performance, self.role, message)
+
+
+class ConductorService:
+    def __init__(self, slots=None, max_performances=MAX_CONCURRENT_PERFORMANCES):
+        slots = slots or {}
+        self.slots = {role: [MusicianSlot(role, i) for i in range(slots.get(role, SERVICE_SLOTS_PER_ROLE))]
+                      for role in MUSICIAN_REGISTRY}
+        self.max_performances = max_performances
+        self.log_queue = multiprocessing.Queue()
+        self.reporting_queue = multiprocessing.Queue()
+        self.performances = {}
+        self.metrics_rollup = MetricsRollup()
+        self._ids = itertools.count(1)
+        self._task_slots = {}  # namespaced task id -> MusicianSlot
+        self._wakeup = asyncio.Event()
+        self._background = []
+        self._server = None
+        self._ws_feeds = None
+
+    def log(self, message, level="info"):
+        getattr(logger, level)(message)
+        if self._ws_feeds:
+            self._ws_feeds[0].put(message)
+
+    # --- Performances ---
+
+    def submit(self, symphony_path, max_concurrency=None):
+        """Queues a symphony; it starts as soon as fewer than max_performances are running. Returns its Performance."""
+        performance = Performance(f"p{next(self._ids)}", symphony_path, max_concurrency)
+        self.performances[performance.performance_id] = performance
+        self.log(f"[Service]: Accepted '{symphony_path}' as performance {performance.performance_id}.")
+        self._start_queued()
+        return performance
+
+    def stop_performance(self, performance_id):
+        performance = self.performances.get(performance_id)
+        if performance is None or performance.status not in ("queued", "running"):
+            return False
+        performance.stop_requested = True
+        if performance.status == "queued":
+            self._finish(performance)
+        else:
+            performance.input_queue.put('STOP')
+        return True
+
+    def _start_queued(self):
+        running = sum(1 for p in self.performances.values() if p.status == "running")
+        for performance in self.performances.values():
+            if running >= self.max_performances:
+                break
+            if performance.status == "queued":
+                self._start(performance)
+                running += 1
+
+    def _start(self, performance):
+        task_queues = {name: _ServiceTaskQueue(self, performance, canonical_name(name)) for name in musician_names()}
+        performance.conductor = Conductor(
+            performance.symphony_path, task_queues, performance.reporting_queue, performance.input_queue,
+            performance.log_queue, performance.gdc_update_queue, GenomeDataCache(blob_store=get_default_blob_store()),
+            use_remote_hosts=False)
+        performance.status = "running"
+        performance.started_at = time.time()
+        task = asyncio.create_task(performance.conductor.start())
+        task.add_done_callback(lambda task, performance=performance: self._finish(performance, task))
+
+    def _finish(self, performance, task=None):
+        if task is not None and not task.cancelled() and task.exception():
+            self.log(f"[Service ERROR]: Performance {performance.performance_id} crashed: {task.exception()}", "error")
+        self._drain_performance_queues(performance)
+        statuses = performance.conductor.task_status.values() if performance.conductor else ()
+        if performance.stop_requested:
+            performance.status = "stopped"
+        elif performance.conductor and performance.conductor.symphony and all(s == "completed" for s in statuses):
+            performance.status = "completed"
+        else:
+            performance.status = "failed"
+        performance.finished_at = time.time()
+        for role, queued_task in performance.ready:
+            performance.conductor.shared_payloads.release(queued_task.get("task_id"))
+        performance.ready.clear()
+        for task_id in performance.running:
+            self._task_slots[task_id].task_queue.put({"command": "cancel", "task_id": task_id})
+        summary = performance.summary()
+        self.log(f"[Service]: Performance {performance.performance_id} {performance.status}: {summary['tasks']}.")
+        if not performance.done.done():
+            performance.done.set_result(summary)
+        self._start_queued()
+        self._wakeup.set()
+
+    def _drain_performance_queues(self, performance):
+        while True:
+            try:
+                line = performance.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            # The Conductor already logged the line; keep it for status queries and the WS feed.
+            performance.log_tail.append(line)
+            if self._ws_feeds:
+                self._ws_feeds[0].put(f"[{performance.performance_id}] {line}")
+        while True:
+            try:
+                performance.gdc_state = performance.gdc_update_queue.get_nowait()
+            except queue.Empty:
+                break
+
+    # --- Scheduling ---
+
+    def _accept(self, performance, role, message):
+        if isinstance(message, dict) and message.get("command") == "cancel":
+            self._cancel(performance, message.get("task_id"))
+            return
+        performance.ready.append((role, message))
+        self._wakeup.set()
+
+    def _cancel(self, performance, task_id):
+        for entry in performance.ready:
+            if entry[1].get("task_id") == task_id:
+                performance.ready.remove(entry)
+                performance.reporting_queue.put({"task_id": task_id, "status": "failed", "error": "Task cancelled."})
+                return
+        namespaced = f"{performance.performance_id}/{task_id}"
+        if namespaced in performance.running:
+            self._task_slots[namespaced].task_queue.put({"command": "cancel", "task_id": namespaced})
+
+    def _idle_slot(self, role):
+        idle = [slot for slot in self.slots.get(role, ()) if not slot.in_flight]
+        # Running processes first, so the pool only grows when it has to.
+        return min(idle, key=lambda slot: (slot.process is None, slot.index)) if idle else None
+
+    def _schedule(self):
+        """
+        Hands idle slots to ready tasks until none fits. The performance with
+        the fewest tasks running goes first (ties: the one served longest ago),
+        so a large symphony cannot starve a small one, and a performance at its
+        cap waits even when slots are idle.
+        """
+        while True:
+            candidates = []
+            for performance in self.performances.values():
+                if performance.status != "running" or not performance.ready:
+                    continue
+                if len(performance.running) >= performance.concurrency_cap():
+                    continue
+                for index, (role, _) in enumerate(performance.ready):
+                    if self._idle_slot(role) is not None:
+                        candidates.append((len(performance.running), performance.served_at, performance, index))
+                        break
+            if not candidates:
+                return
+            _, _, performance, index = min(candidates, key=lambda c: c[:2])
+            role, task = performance.ready[index]
+            del performance.ready[index]
+            self._dispatch(performance, role, task)
+
+    def _dispatch(self, performance, role, task):
+        slot = self._idle_slot(role)
+        namespaced = f"{performance.performance_id}/{task.get('task_id')}"
+        if slot.process is None:
+            try:
+                slot.start(self.log_queue, self.reporting_queue)
+            except (KeyError, ImportError) as e:
+                performance.reporting_queue.put({"task_id": task.get("task_id"), "status": "failed",
+                                                 "error": f"Musician '{role}' could not be launched: {e}"})
+                return
+            self.log(f"[Service]: Started {role} slot {slot.index} (pid {slot.process.pid}).")
+        slot.in_flight.add(namespaced)
+        self._task_slots[namespaced] = slot
+        performance.running.add(namespaced)
+        performance.served_at = time.monotonic()
+        slot.task_queue.put(dict(task, task_id=namespaced))
+
+    def _on_report(self, report):
+        if report.get("type") == "metrics_rollup":
+            self.metrics_rollup.merge_series(report.get("series", []))
+            return
+        task_id = report.get("task_id") or ""
+        performance_id, _, original_id = task_id.partition("/")
+        performance = self.performances.get(performance_id)
+        if report.get("status") in ("completed", "failed"):
+            slot = self._task_slots.pop(task_id, None)
+            if slot is not None:
+                slot.in_flight.discard(task_id)
+            if performance is not None:
+                performance.running.discard(task_id)
+            self._wakeup.set()
+        if performance is not None and performance.status == "running":
+            performance.reporting_queue.put(dict(report, task_id=original_id))
+            if self._ws_feeds:
+                self._ws_feeds[1].put(dict(report, task_id=original_id, performance_id=performance_id))
+
+    async def _pump(self, mp_queue, handle):
+        while True:
+            try:
+                item = await asyncio.to_thread(mp_queue.get, timeout=0.5)
+            except queue.Empty:
+                continue
+            handle(item)
+
+    async def _scheduler(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), SCHEDULER_TICK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            for performance in self.performances.values():
+                if performance.status == "running":
+                    self._drain_performance_queues(performance)
+            self._schedule()
+
+    # --- Service lifecycle ---
+
+    def pool_status(self):
+        return {role: {"slots": len(slots), "started": sum(1 for s in slots if s.process is not None),
+                       "busy": sum(1 for s in slots if s.in_flight)}
+                for role, slots in self.slots.items()}
+
+    async def start(self, listen=None, ws_port=None):
+        # Every running Conductor keeps an executor thread polling its input queue.
+        asyncio.get_running_loop().set_default_executor(
+            concurrent.futures.ThreadPoolExecutor(max_workers=self.max_performances + 8))
+        self._background = [asyncio.create_task(self._pump(self.log_queue, lambda line: self.log(line))),
+                            asyncio.create_task(self._pump(self.reporting_queue, self._on_report)),
+                            asyncio.create_task(self._scheduler())]
+        if listen:
+            host, port = parse_address(listen)
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+            self.log(f"[Service]: Accepting symphonies on {host}:{port}.")
+        if ws_port:
+            # Imported here: websockets is only needed when the WS endpoint is enabled.
+            from telemetry import _telemetry_buffer, _buffer_lock
+            from telemetry_ws_server import TelemetryWebSocketServer
+            self._ws_feeds = (queue.Queue(), queue.Queue())
+            ws_server = TelemetryWebSocketServer(None, self._ws_feeds[0], self._ws_feeds[1],
+                                                 (_telemetry_buffer, _buffer_lock), symphony_service=self)
+            self._background.append(asyncio.create_task(ws_server.start(port=ws_port)))
+
+    async def stop(self):
+        """Stops running performances, then the musician pool."""
+        for performance in list(self.performances.values()):
+            self.stop_performance(performance.performance_id)
+        pending = [p.done for p in self.performances.values() if not p.done.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=10)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._background:
+            task.cancel()
+        terminated = await asyncio.to_thread(stop_slots, [slot for slots in self.slots.values() for slot in slots])
+        for slot in terminated:
+            self.log(f"[Service]: {slot.role} slot {slot.index} terminated forcefully.", "warning")
+
+    async def _handle_client(self, reader, writer):
+        """
+        Commands, one JSON object per line:
+          {"command": "start_symphony", "symphony_path": ..., "max_concurrency": n, "wait": bool}
+          {"command": "stop_symphony", "performance_id": ...}
+          {"command": "status"}
+        start_symphony is acknowledged with its performance_id; with "wait" a
+        performance_finished message follows when it ends.
+        """
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                command = message.get("command")
+                if command == "start_symphony" and message.get("symphony_path"):
+                    performance = self.submit(message["symphony_path"], message.get("max_concurrency"))
+                    await send_message(writer, {"type": "command_ack", "status": "accepted", "command": command,
+                                                "performance_id": performance.performance_id})
+                    if message.get("wait"):
+                        summary = await performance.done
+                        await send_message(writer, dict(summary, type="performance_finished"))
+                elif command == "stop_symphony":
+                    stopped = self.stop_performance(message.get("performance_id"))
+                    await send_message(writer, {"type": "command_ack", "status": "stopping" if stopped else "unknown",
+                                                "command": command, "performance_id": message.get("performance_id")})
+                elif command == "status":
+                    await send_message(writer, {"type": "status", "pool": self.pool_status(),
+                                                "performances": [p.summary() for p in self.performances.values()]})
+                else:
+                    await send_message(writer, {"type": "error", "message": f"Unknown command: {command}"})
+        except (ConnectionError, OSError, json.JSONDecodeError, ValueError) as e:
+            self.log(f"[Service]: Client connection error: {e}", "warning")
+        finally:
+            writer.close()
+
+
+async def run_symphonies(symphony_paths, slots=None, max_concurrency=None):
+    """Runs symphonies concurrently in a private service and returns their summaries."""
+    service = ConductorService(slots)
+    await service.start()
+    try:
+        performances = [service.submit(path, max_concurrency) for path in symphony_paths]
+        return await asyncio.gather(*(performance.done for performance in performances))
+    finally:
+        await service.stop()
+
+async def serve_forever(listen=SERVICE_LISTEN, ws_port=None, slots=None, max_performances=MAX_CONCURRENT_PERFORMANCES):
+    service = ConductorService(slots, max_performances)
+    await service.start(listen, ws_port)
+    try:
+        await asyncio.Future()
+    finally:
+        await service.stop()
+
+async def submit_to_service(symphony_path, listen=SERVICE_LISTEN, max_concurrency=None, wait=True):
+    """Client side of the service socket. Returns the ack, or the final summary when waiting."""
+    host, port = parse_address(listen)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await send_message(writer, {"command": "start_symphony", "symphony_path": os.path.abspath(symphony_path),
+                                    "max_concurrency": max_concurrency, "wait": wait})
+        answer = await read_message(reader)
+        if wait and answer and answer.get("type") == "command_ack":
+            answer = await read_message(reader)
+        return answer
+    finally:
+        writer.close()
+
+async def query_service(listen=SERVICE_LISTEN):
+    host, port = parse_address(listen)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await send_message(writer, {"command": "status"})
+        return await read_message(reader)
+    finally:
+        writer.close()
@@ -20,7 +20,7 @@ class GenomeDataCache:
     This class is intended to be instantiated and managed by the Conductor.
     """
     # Make SNAPSHOT_INTERVAL_SECONDS an instance attribute for robustness
-    def __init__(self):
+    def __init__(self, blob_store=None):
         self.SNAPSHOT_INTERVAL_SECONDS = 5  # Moved here from class level for robustness
         self._data_cache = {
             "tasks": {},
@@ -30,6 +30,9 @@ class GenomeDataCache:
         }
         self._last_merkle_root = None
         self._root_history = collections.deque(maxlen=100)  # MODIFIED: Could make maxlen configurable if needed
+        # Optional BlobStore: large strings written via set() are stored once and
+        # kept in the cache as {blob, size, preview} references.
+        self._blob_store = blob_store
 
     def update_data(self, category: str, key: str, value: dict):
         """
@@ -62,6 +65,8 @@ class GenomeDataCache:
         - set('performance_status', 'loaded')
         - set('task_status.task_1', 'completed')
         """
+        if self._blob_store is not None:
+            value = self._blob_store.externalize(value)
         if '.' in key:
             # Handle nested keys like 'task_status.task_1'
             parts = key.split('.')
@@ -1,7 +1,87 @@
-import requests
 import json
 import time  # MODIFIED: Added for retry backoff
 import random  # MODIFIED: Added for jitter
+import asyncio
+import collections
+import hashlib
+import os
+import threading
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from blob_store import atomic_write
+
+# --- Circuit breakers ---
+# Shared by the sync helpers and the async client: after CIRCUIT_FAILURE_THRESHOLD
+# consecutive failures a host is "open" and requests fail immediately; after
+# CIRCUIT_RESET_SECONDS one probe request is let through ("half-open").
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('SYNCPHONY_CIRCUIT_FAILURES', 5))
+CIRCUIT_RESET_SECONDS = float(os.environ.get('SYNCPHONY_CIRCUIT_RESET_SECONDS', 30))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, host, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self):
+        """True if a request may be sent now. In half-open state only one probe is allowed at a time."""
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def check(self, url):
+        if not self.allow():
+            raise CircuitOpenError(f"LeapToolkit circuit open for '{self.host}'; not requesting '{url}'.")
+
+    def record(self, ok):
+        """Records the outcome of an allowed request (ok=False for network errors, timeouts and 5xx)."""
+        self._probe_in_flight = False
+        if ok:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """Releases a half-open probe whose request was cancelled before it finished."""
+        self._probe_in_flight = False
+
+
+def host_of(url):
+    """Returns the scheme://host[:port] part of a URL, the unit that breakers and rate limits apply to."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+_circuit_breakers = {}
+
+def get_circuit_breaker(url):
+    """Returns the process-wide CircuitBreaker for url's host."""
+    host = host_of(url)
+    breaker = _circuit_breakers.get(host)
+    if breaker is None:
+        breaker = _circuit_breakers[host] = CircuitBreaker(host)
+    return breaker
+
 
 def get_json_from_url(url, retries=3, backoff_factor=1):
     """
@@ -18,17 +98,23 @@ def get_json_from_url(url, retries=3, backoff_factor=1):
     Raises:
         Exception: If the network request or JSON parsing fails after retries.
     """
+    import requests  # only the blocking helpers use requests; the async client does not
+    breaker = get_circuit_breaker(url)
     attempt = 0
     while attempt < retries:
+        breaker.check(url)
         try:
             # A timeout prevents the script from hanging on a non-responsive server
             response = requests.get(url, timeout=10)
+            breaker.record(response.status_code < 500)
             
             # This will raise an HTTPError for bad responses (e.g., 404 Not Found)
             response.raise_for_status()
             
             return response.json()
         except requests.exceptions.RequestException as e:
+            if not isinstance(e, requests.exceptions.HTTPError):
+                breaker.record(False)
             attempt += 1
             if attempt >= retries:
                 raise Exception(f"LeapToolkit network error fetching '{url}' after {retries} attempts: {e}")
@@ -58,20 +144,566 @@ def post_data_to_api(url, data_payload, headers=None, auth=None, retries=3, back
     """
     if headers is None:
         headers = {'Content-Type': 'application/json'}
+    import requests
+    breaker = get_circuit_breaker(url)
     attempt = 0
     while attempt < retries:
+        breaker.check(url)
         try:
             response = requests.post(url, json=data_payload, headers=headers, auth=auth, timeout=10)
+            breaker.record(response.status_code < 500)
             
             # Check for HTTP errors
             response.raise_for_status()
             
             return response.json()
         except requests.exceptions.RequestException as e:
+            if not isinstance(e, requests.exceptions.HTTPError):
+                breaker.record(False)
             attempt += 1
             if attempt >= retries:
                 raise Exception(f"LeapToolkit failed to post data to '{url}' after {retries} attempts: {e}")
             sleep_time = backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, 0.1)
             time.sleep(sleep_time)
         except json.JSONDecodeError:
-            raise Exception(f"LeapToolkit failed to parse JSON response from '{url}' after posting.")
\ No newline at end of file
+            raise Exception(f"LeapToolkit failed to parse JSON response from '{url}' after posting.")
+
+# --- Async client ---
+# Musicians run an asyncio loop, so they use this pooled client instead of the
+# blocking functions above, which are kept for scripts.
+HTTP_TIMEOUT_SECONDS = 10
+HTTP_MAX_CONNECTIONS = int(os.environ.get('SYNCPHONY_HTTP_MAX_CONNECTIONS', 100))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.environ.get('SYNCPHONY_HTTP_MAX_CONNECTIONS_PER_HOST', 8))
+HTTP_KEEPALIVE_SECONDS = 30
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+HEDGE_LATENCY_WINDOW = 200       # recent latencies per host used for the p95 hedge delay
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.05
+HTTP_CACHE_DIR = os.environ.get('SYNCPHONY_HTTP_CACHE_DIR',
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "http"))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('SYNCPHONY_HTTP_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+HTTP_CACHE_DEFAULT_TTL_SECONDS = 300
+# Request headers that always take part in the cache key; a response's Vary header adds more.
+HTTP_CACHE_KEY_HEADERS = ("accept", "accept-language", "authorization")
+# Request headers that make a response per-user; such responses are stored only when marked public.
+HTTP_CACHE_CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+class HttpCache:
+    """
+    On-disk LRU cache of GET responses, one JSON file per (URL, vary headers).
+
+    Entries carry an expiry time plus the ETag/Last-Modified validators, so an
+    expired entry is revalidated with a conditional request instead of being
+    downloaded again. Reads refresh a file's mtime and the least recently used
+    files are evicted once the directory exceeds max_bytes. Listeners are told
+    "hit", "miss", "revalidated" or "stale" for every lookup that completes.
+
+    The methods do blocking file I/O; AsyncLeapClient calls them through
+    asyncio.to_thread. Cache-Control: private responses are never stored, and
+    responses to requests carrying Authorization or Cookie only when the server
+    marks them Cache-Control: public.
+    """
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._sizes = None  # key -> file size, scanned from disk on first use
+        self._sizes_lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def record(self, outcome):
+        for callback in self._listeners:
+            callback(outcome)
+
+    @staticmethod
+    def _header_values(headers, names):
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        return {name: lowered.get(name, "") for name in sorted(names)}
+
+    def _key(self, url, headers):
+        material = json.dumps([url, self._header_values(headers, HTTP_CACHE_KEY_HEADERS)])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_sizes(self):
+        if self._sizes is None:
+            self._sizes = {}
+            if os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith(".json"):
+                        try:
+                            self._sizes[name[:-5]] = os.path.getsize(os.path.join(self.cache_dir, name))
+                        except FileNotFoundError:
+                            continue
+        return self._sizes
+
+    def get(self, url, headers=None):
+        """Returns the stored entry for this request (fresh or not), or None."""
+        path = self._path(self._key(url, headers))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        # The response varied on headers beyond the key set; they must match too.
+        if entry.get("vary") and self._header_values(headers, entry["vary"]) != entry.get("vary_values"):
+            return None
+        return entry
+
+    @staticmethod
+    def _cache_control(response_headers):
+        cache_control = response_headers.get("Cache-Control", "").lower()
+        return {d.strip().split("=")[0]: d.strip() for d in cache_control.split(",") if d.strip()}
+
+    @classmethod
+    def _ttl_from(cls, response_headers, default_ttl):
+        """Freshness lifetime from Cache-Control (None for no-store), else default_ttl."""
+        directives = cls._cache_control(response_headers)
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return 0
+        if "max-age" in directives:
+            try:
+                return int(directives["max-age"].split("=", 1)[1])
+            except (IndexError, ValueError):
+                pass
+        return default_ttl
+
+    def put(self, url, headers, response_headers, body, ttl_seconds):
+        """Stores a 200 response unless Cache-Control forbids it or it is per-user; returns the entry."""
+        # The cache directory is shared: a per-user response is never kept, and one to a request
+        # with credentials only if the server says anyone may reuse it.
+        directives = self._cache_control(response_headers)
+        if "private" in directives:
+            return None
+        if any(self._header_values(headers, HTTP_CACHE_CREDENTIAL_HEADERS).values()) and "public" not in directives:
+            return None
+        ttl_seconds = self._ttl_from(response_headers, ttl_seconds)
+        if ttl_seconds is None:
+            return None
+        vary = sorted({v.strip().lower() for v in response_headers.get("Vary", "").split(",") if v.strip()} - {"*"})
+        entry = {
+            "url": url,
+            "stored_at": time.time(),
+            "expires_at": time.time() + ttl_seconds,
+            "ttl_s": ttl_seconds,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "vary": vary,
+            "vary_values": self._header_values(headers, vary),
+            "body": body.decode('utf-8', errors='replace'),
+        }
+        self._write(self._key(url, headers), entry)
+        return entry
+
+    def refresh(self, url, headers, entry, response_headers):
+        """Extends an entry's expiry after a 304 Not Modified, keeping its lifetime unless the 304 sets one."""
+        ttl_seconds = self._ttl_from(response_headers, entry.get("ttl_s", HTTP_CACHE_DEFAULT_TTL_SECONDS))
+        entry["ttl_s"] = ttl_seconds or 0
+        entry["expires_at"] = time.time() + entry["ttl_s"]
+        self._write(self._key(url, headers), entry)
+
+    def _write(self, key, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = json.dumps(entry).encode('utf-8')
+        atomic_write(self._path(key), data)
+        with self._sizes_lock:
+            sizes = self._load_sizes()
+            sizes[key] = len(data)
+            if sum(sizes.values()) > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Removes least recently used files until the cache fits max_bytes. Called with _sizes_lock held."""
+        sizes = self._load_sizes()
+        total = sum(sizes.values())
+        by_age = []
+        for key in sizes:
+            try:
+                by_age.append((os.path.getmtime(self._path(key)), key))
+            except FileNotFoundError:
+                by_age.append((0, key))
+        for _mtime, key in sorted(by_age):
+            if total <= self.max_bytes:
+                break
+            total -= sizes.pop(key)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+def _hash_into(digest, path, block_bytes):
+    """Feeds a file into digest block by block; returns its size."""
+    size = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_bytes), b""):
+            digest.update(block)
+            size += len(block)
+    return size
+
+def _write_and_hash(out, digest, chunk):
+    out.write(chunk)
+    digest.update(chunk)
+
+def _content_range_start(content_range):
+    """First byte position of a "bytes start-end/total" Content-Range, or None."""
+    try:
+        unit, _, byte_range = (content_range or "").partition(" ")
+        return int(byte_range.split("-", 1)[0]) if unit.strip().lower() == "bytes" else None
+    except ValueError:
+        return None
+
+
+class AsyncLeapClient:
+    """
+    One keep-alive aiohttp session shared by every request in a process.
+
+    The connector caps open connections overall and per host, so a burst of
+    requests to one API queues instead of opening a socket per request.
+    Retries back off with asyncio.sleep and never block the event loop.
+    """
+    def __init__(self, max_connections=HTTP_MAX_CONNECTIONS, max_connections_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+                 timeout=HTTP_TIMEOUT_SECONDS):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+        self._latencies = {}  # host -> recent successful request latencies (seconds)
+        self.stats = collections.Counter()  # hedged, hedge_won, circuit_rejected
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._loop = loop
+        return self._session
+
+    async def _attempt(self, session, method, url, breaker, **kwargs):
+        """One request, with its outcome recorded in the host's breaker and latency window."""
+        started = time.monotonic()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                breaker.record(response.status < 500)
+                response.raise_for_status()
+                body = await response.read()
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if not isinstance(e, aiohttp.ClientResponseError):
+                breaker.record(False)
+            raise
+        except BaseException:
+            # Not a network outcome (e.g. a bad argument); just free a half-open probe.
+            breaker.abandon()
+            raise
+        latencies = self._latencies.setdefault(breaker.host, collections.deque(maxlen=HEDGE_LATENCY_WINDOW))
+        latencies.append(time.monotonic() - started)
+        return response.status, response.headers, body
+
+    def _hedge_delay(self, host):
+        """The host's recent p95 latency, or None until there are enough samples to trust it."""
+        latencies = self._latencies.get(host)
+        if not latencies or len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        return max(ordered[int(0.95 * (len(ordered) - 1))], HEDGE_MIN_DELAY_SECONDS)
+
+    async def _hedged_attempt(self, session, url, breaker, **kwargs):
+        """
+        Sends a GET and, if it has not finished within the host's p95 latency,
+        a second identical one; the first successful response wins and the
+        other request is cancelled.
+        """
+        delay = self._hedge_delay(breaker.host)
+        first = asyncio.ensure_future(self._attempt(session, "GET", url, breaker, **kwargs))
+        pending = {first}
+        error = None
+        # Whatever happens to the caller, including cancellation during the first
+        # wait, no attempt outlives this call (a half-open probe would block the host).
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+            if breaker.state == "closed":  # never hedge a half-open probe
+                self.stats["hedged"] += 1
+                pending.add(asyncio.ensure_future(self._attempt(session, "GET", url, breaker, **kwargs)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.stats["hedge_won"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def request(self, method, url, retries=3, backoff_factor=1, hedge=False, **kwargs):
+        """
+        Sends one request, retrying network and HTTP (4xx/5xx) errors; returns
+        (status, headers, body). Fails fast with CircuitOpenError while the
+        host's circuit is open. hedge=True enables hedged GETs.
+        """
+        session = self._get_session()
+        breaker = get_circuit_breaker(url)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.stats["circuit_rejected"] += 1
+                raise CircuitOpenError(f"LeapToolkit circuit open for '{breaker.host}'; not requesting '{url}'.")
+            try:
+                if hedge and method == "GET":
+                    return await self._hedged_attempt(session, url, breaker, **kwargs)
+                return await self._attempt(session, method, url, breaker, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt >= retries:
+                    raise Exception(f"LeapToolkit network error on {method} '{url}' after {retries} attempts: {e}")
+                await asyncio.sleep(backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, 0.1))
+
+    @staticmethod
+    def _parse_json(url, body):
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError:
+            raise Exception(f"LeapToolkit failed to parse JSON from '{url}'. Response was not valid JSON.")
+
+    async def request_json(self, method, url, retries=3, backoff_factor=1, **kwargs):
+        """Like request(), returning the parsed JSON body."""
+        _status, _headers, body = await self.request(method, url, retries=retries, backoff_factor=backoff_factor, **kwargs)
+        return self._parse_json(url, body)
+
+    async def get_json(self, url, headers=None, retries=3, backoff_factor=1, cache=None, ttl_seconds=None,
+                       stale_on_error=False, hedge=False):
+        """
+        GETs url as JSON. With cache (an HttpCache) a fresh cached copy is
+        returned without a request, an expired one is revalidated with
+        If-None-Match/If-Modified-Since, and with stale_on_error an expired copy
+        is served when the server cannot be reached. hedge is passed to request().
+        """
+        if cache is None:
+            return await self.request_json("GET", url, retries=retries, backoff_factor=backoff_factor,
+                                           headers=headers, hedge=hedge)
+
+        ttl_seconds = HTTP_CACHE_DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        entry = await asyncio.to_thread(cache.get, url, headers)
+        if entry is not None and entry["expires_at"] > time.time():
+            cache.record("hit")
+            return self._parse_json(url, entry["body"])
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            status, response_headers, body = await self.request("GET", url, retries=retries, backoff_factor=backoff_factor,
+                                                                headers=request_headers, hedge=hedge)
+        except Exception:
+            if entry is not None and stale_on_error:
+                cache.record("stale")
+                return self._parse_json(url, entry["body"])
+            raise
+
+        if status == 304 and entry is not None:
+            await asyncio.to_thread(cache.refresh, url, headers, entry, response_headers)
+            cache.record("revalidated")
+            return self._parse_json(url, entry["body"])
+        data = self._parse_json(url, body)
+        if status == 200:
+            await asyncio.to_thread(cache.put, url, headers, response_headers, body, ttl_seconds)
+        cache.record("miss")
+        return data
+
+    async def post_json(self, url, data_payload, headers=None, auth=None, retries=3, backoff_factor=1):
+        if auth is not None and not isinstance(auth, aiohttp.BasicAuth):
+            auth = aiohttp.BasicAuth(*auth)
+        return await self.request_json("POST", url, retries=retries, backoff_factor=backoff_factor,
+                                       json=data_payload, headers=headers, auth=auth)
+
+    async def download(self, url, dest, checksum=None, resume=True, headers=None, retries=3, backoff_factor=1,
+                       chunk_bytes=DOWNLOAD_CHUNK_BYTES):
+        """
+        Streams url to dest with bounded memory. Data goes to dest + ".part" and
+        is moved into place with os.replace only once complete (and verified),
+        so dest never holds a partial file. An existing .part is resumed with
+        an HTTP Range request, guarded by If-Range so a changed resource is
+        downloaded from scratch. checksum is "algorithm:hexdigest" (or a bare
+        sha256 hexdigest) and is verified against a hash computed while streaming.
+        """
+        if checksum and ":" in checksum:
+            algorithm, expected = checksum.split(":", 1)
+        else:
+            algorithm, expected = "sha256", checksum
+        part_path = dest + ".part"
+        meta_path = part_path + ".json"
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        if not resume:
+            for path in (part_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        session = self._get_session()
+        breaker = get_circuit_breaker(url)
+        # Long downloads must not hit the session's total timeout; only stalls should.
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        started = time.monotonic()
+        resumed_from = None
+        attempt = 0
+        while True:
+            breaker.check(url)
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            validator = None
+            if offset and os.path.exists(meta_path):
+                meta = await asyncio.to_thread(_read_json, meta_path)
+                validator = meta.get("etag") or meta.get("last_modified") if meta.get("url") == url else None
+            request_headers = dict(headers or {})
+            if offset and validator:
+                request_headers["Range"] = f"bytes={offset}-"
+                request_headers["If-Range"] = validator
+            else:
+                offset = 0
+            try:
+                async with session.get(url, headers=request_headers, timeout=timeout) as response:
+                    breaker.record(response.status < 500)
+                    if response.status == 416 and offset:
+                        # Range not satisfiable: the .part is already complete or stale; restart cleanly.
+                        os.remove(part_path)
+                        continue
+                    response.raise_for_status()
+                    if response.status != 206:
+                        offset = 0
+                    elif _content_range_start(response.headers.get("Content-Range")) != offset:
+                        # The server sent some other range; appending it would corrupt the file.
+                        os.remove(part_path)
+                        continue
+                    elif resumed_from is None:
+                        resumed_from = offset
+                    # File I/O and hashing run in threads: a multi-GB resume must not stall
+                    # the other requests sharing this client's event loop.
+                    await asyncio.to_thread(_write_json, meta_path, {"url": url, "etag": response.headers.get("ETag"),
+                                                                     "last_modified": response.headers.get("Last-Modified")})
+                    digest = hashlib.new(algorithm)
+                    size = 0
+                    if offset:
+                        # Bring the running hash up to date with the bytes already on disk.
+                        size = await asyncio.to_thread(_hash_into, digest, part_path, chunk_bytes)
+                    out = await asyncio.to_thread(open, part_path, 'ab' if offset else 'wb')
+                    try:
+                        async for chunk in response.content.iter_chunked(chunk_bytes):
+                            await asyncio.to_thread(_write_and_hash, out, digest, chunk)
+                            size += len(chunk)
+                    finally:
+                        await asyncio.to_thread(out.close)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    breaker.record(False)
+                attempt += 1
+                if attempt >= retries:
+                    raise Exception(f"LeapToolkit failed to download '{url}' after {retries} attempts: {e}")
+                await asyncio.sleep(backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, 0.1))
+
+        if expected and digest.hexdigest() != expected.lower():
+            os.remove(part_path)
+            os.remove(meta_path)
+            raise Exception(f"LeapToolkit checksum mismatch for '{url}': expected {algorithm}:{expected}, got {digest.hexdigest()}.")
+        os.replace(part_path, dest)
+        os.remove(meta_path)
+        return {
+            "path": dest,
+            "bytes": size,
+            "resumed_from": resumed_from,
+            "checksum": f"{algorithm}:{digest.hexdigest()}",
+            "duration_ms": (time.monotonic() - started) * 1000,
+        }
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class TokenBucket:
+    """
+    Async token bucket: acquire() takes one token, waiting for a refill when
+    the bucket is empty. rate is tokens per second; burst is the capacity.
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_async_client = None
+_http_cache = None
+
+def get_http_cache():
+    """Returns this process's shared HttpCache."""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache()
+    return _http_cache
+
+def get_async_client():
+    """Returns this process's shared AsyncLeapClient."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncLeapClient()
+    return _async_client
+
+
+async def async_get_json_from_url(url, retries=3, backoff_factor=1, headers=None, cache=False, ttl_seconds=None,
+                                  stale_on_error=False, hedge=False):
+    """Async counterpart of get_json_from_url using the shared pooled client and, if asked, the HTTP cache."""
+    return await get_async_client().get_json(url, headers=headers, retries=retries, backoff_factor=backoff_factor,
+                                             cache=get_http_cache() if cache else None, ttl_seconds=ttl_seconds,
+                                             stale_on_error=stale_on_error, hedge=hedge)
+
+
+async def async_post_data_to_api(url, data_payload, headers=None, auth=None, retries=3, backoff_factor=1):
+    """Async counterpart of post_data_to_api using the shared pooled client."""
+    return await get_async_client().post_json(url, data_payload, headers=headers, auth=auth,
+                                              retries=retries, backoff_factor=backoff_factor)
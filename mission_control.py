@@ -38,24 +38,27 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from conductor import main as conductor_main
-from musician import AVAILABLE_MUSICIANS
+from musician_registry import musician_names, MusicianLauncher
 import siip_agent
 from telemetry import _telemetry_buffer, _buffer_lock
 from genome_data_cache import GenomeDataCache
+from blob_store import get_default_blob_store
 from telemetry_ws_server import TelemetryWebSocketServer
 from integrity_check_script_content import analyze_codebase
 
 class MissionControl:
-    def __init__(self, root, task_queues, log_queue, input_queue, reporting_queue, gdc_update_queue):
+    def __init__(self, root, task_queues, log_queue, input_queue, reporting_queue, gdc_update_queue, spawn_queue):
         self.root = root
         self.task_queues = task_queues
         self.log_queue = log_queue
         self.input_queue = input_queue
         self.reporting_queue = reporting_queue
         self.gdc_update_queue = gdc_update_queue # MODIFIED: Added queue for GDC state
+        self.spawn_queue = spawn_queue
         self.symphony_path = None
         self.conductor_process = None
-        self.musician_processes = []
+        # Musicians are started on demand when the Conductor dispatches their first task
+        self.launcher = MusicianLauncher(task_queues, log_queue, reporting_queue, spawn_queue, notify_queue=input_queue)
         self.siip_data_path = tk.StringVar()
 
         self.root.title("Syncphony Mission Control v3.8 (Harmonized)")
@@ -71,7 +74,7 @@ class MissionControl:
         self.ws_server = TelemetryWebSocketServer(
             self.gdc,
             self.log_queue,
-            self.reporting_queue,
+            None, # reports reach WS clients through the GDC task statuses and the Conductor's log lines
             (_telemetry_buffer, _buffer_lock)
         )
 
@@ -165,23 +168,10 @@ class MissionControl:
                 self.log_message(f"[MissionControl ERROR]: Error reading log queue: {e}")
                 break
 
-        # Process reporting messages
-        while True:
-            try:
-                report = self.reporting_queue.get_nowait()
-                task_id = report.get('task_id', 'N/A')
-                status = report.get('status', 'N/A')
-                error = report.get('error', '')
-                report_msg = f"[MissionControl Report]: Task '{task_id}' Status: {status}"
-                if error:
-                    report_msg += f", Error: {error}"
-                self.log_message(report_msg)
-            except queue.Empty:
-                break
-            except Exception as e:
-                self.log_message(f"[MissionControl ERROR]: Error reading reporting queue: {e}")
-                break
-        
+        # The reporting queue belongs to the Conductor: task outcomes, metrics rollups and
+        # launcher notices must all reach it, and it logs each task report, so nothing
+        # here reads that queue.
+
         # MODIFIED: Process GDC state updates from the Conductor
         while True:
             try:
@@ -218,7 +208,7 @@ class MissionControl:
         self.log_message("--- New Performance Starting ---")
         self.toggle_controls(True)
 
-        all_queues = [self.log_queue, self.reporting_queue, self.input_queue, self.gdc_update_queue] + list(self.task_queues.values())
+        all_queues = [self.log_queue, self.reporting_queue, self.input_queue, self.gdc_update_queue, self.spawn_queue] + list(self.task_queues.values())
         for q in all_queues:
             try:
                 while True:
@@ -226,19 +216,22 @@ class MissionControl:
             except queue.Empty:
                 pass
 
-        self.musician_processes = []
-        for name, MusicianClass in AVAILABLE_MUSICIANS.items():
-            musician = MusicianClass(name, self.task_queues[name], self.log_queue, self.reporting_queue)
-            self.musician_processes.append(musician)
-            musician.start()
-            self.log_message(f"[Mission Control]: Launched '{name}' musician process.")
+        self.launcher.open()
+
+        # Drop blobs from earlier runs that nothing in the current GDC still references
+        try:
+            removed = get_default_blob_store().collect_garbage(live_data=self.gdc._data_cache)
+            if removed:
+                self.log_message(f"[Mission Control]: Removed {removed} expired blobs.")
+        except OSError as e:
+            self.log_message(f"[Mission Control ERROR]: Blob garbage collection failed: {e}")
 
         # FIXED: Create a new GenomeDataCache instance specifically for the Conductor
-        conductor_gdc = GenomeDataCache()
+        conductor_gdc = GenomeDataCache(blob_store=get_default_blob_store())
         
         self.conductor_process = multiprocessing.Process(
             target=conductor_main,
-            args=(self.symphony_path, self.task_queues, self.reporting_queue, self.input_queue, self.log_queue, self.gdc_update_queue, conductor_gdc)
+            args=(self.symphony_path, self.task_queues, self.reporting_queue, self.input_queue, self.log_queue, self.gdc_update_queue, conductor_gdc, self.spawn_queue)
         )
         self.conductor_process.start()
         self.log_message(f"[Mission Control]: Launched 'Conductor' process.")
@@ -261,12 +254,6 @@ class MissionControl:
             except Exception as e:
                 self.log_message(f"[Mission Control ERROR]: Could not send STOP to Conductor input queue: {e}")
 
-        for q in self.task_queues.values():
-            try:
-                q.put('STOP')
-            except Exception as e:
-                self.log_message(f"[Mission Control ERROR]: Could not send STOP to musician task queue: {e}")
-
         if self.conductor_process:
             self.conductor_process.join(timeout=5)
             if self.conductor_process.is_alive():
@@ -274,13 +261,10 @@ class MissionControl:
                 self.log_message("[Mission Control]: Conductor terminated forcefully.")
             self.conductor_process = None
 
-        for musician_process in self.musician_processes:
-            if musician_process.is_alive():
-                musician_process.join(timeout=5)
-                if musician_process.is_alive():
-                    musician_process.terminate()
-                    self.log_message(f"[Mission Control]: Musician {musician_process.name} terminated forcefully.")
-        self.musician_processes = []
+        # The Conductor is gone, so no further spawn requests can race the shutdown.
+        # Pooled musicians (SYNCPHONY_PERSISTENT_MUSICIANS=1) stay up for the next performance.
+        for name in self.launcher.end_performance():
+            self.log_message(f"[Mission Control]: Musician {name} terminated forcefully.")
         
         self.log_message("[Mission Control]: All processes signaled to shut down.")
         self.status_bar.config(text="Performance stopped.")
@@ -289,6 +273,7 @@ class MissionControl:
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to quit Syncphony Mission Control?"):
             self.stop_performance()
+            self.launcher.close()
             
             if hasattr(self, 'async_loop') and self.async_loop.is_running():
                 self.async_loop.call_soon_threadsafe(self.async_loop.stop)
@@ -366,15 +351,16 @@ if __name__ == "__main__":
 
     logger.info("mission_control.py - Initializing queues...")
 
-    task_queues = {role: multiprocessing.Queue() for role in AVAILABLE_MUSICIANS}
+    task_queues = {role: multiprocessing.Queue() for role in musician_names()}
     log_queue = multiprocessing.Queue()
     input_queue = multiprocessing.Queue()
     reporting_queue = multiprocessing.Queue()
     gdc_update_queue = multiprocessing.Queue() # MODIFIED: Create the new queue
+    spawn_queue = multiprocessing.Queue()
 
     logger.info("mission_control.py - Creating Tkinter root...")
     root = tk.Tk()
-    app = MissionControl(root, task_queues, log_queue, input_queue, reporting_queue, gdc_update_queue)
+    app = MissionControl(root, task_queues, log_queue, input_queue, reporting_queue, gdc_update_queue, spawn_queue)
     logger.info("mission_control.py - Starting mainloop...")
     root.mainloop()
     logger.info("mission_control.py - Mainloop finished.")
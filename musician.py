@@ -2,7 +2,7 @@
 # Key Changes:
 # - Refactored ShellExecutorMusician's run_command to use shell=False and shlex.split().
 # - This is a critical security enhancement to prevent shell injection vulnerabilities.
-# - Added AIOracleMusician import and registration
+# - Musician roles are registered in musician_registry.py and imported on demand
 
 import multiprocessing
 import time
@@ -17,18 +17,51 @@ import collections
 import sys
 import random
 import shlex
+import codecs
+import functools
+import signal
+import socket
+import tempfile
+import concurrent.futures
+import hashlib
+import mmap
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from telemetry import log_task_lifecycle, emit_telemetry_event, _telemetry_flusher_task
-from leap_toolkit import get_json_from_url, post_data_to_api
+from telemetry import log_task_lifecycle, emit_telemetry_event, _telemetry_flusher_task, add_rollup_sink, flush_metrics_rollup, increment_counter, start_new_performance
+from python_forkserver import is_warm_argv
+from blob_store import atomic_write, get_default_blob_store
+from shm_transport import attach_payloads, as_bytes
+
+# --- Configuration ---
+# Streaming output from shell commands
+SHELL_STREAM_READ_BYTES = 64 * 1024
+SHELL_OUTPUT_TAIL_CHARS = 64 * 1024          # kept in memory per stream for the task result
+SHELL_LOG_FLUSH_INTERVAL_SECONDS = 0.5       # at most one log/telemetry batch per stream per interval
+SHELL_LOG_MAX_PENDING_CHARS = 256 * 1024     # older unsent output beyond this is dropped, not buffered
+SHELL_KILL_GRACE_SECONDS = 3                 # SIGTERM -> SIGKILL delay for cancelled commands
+# Warm Python workers (POSIX only): `python ...` commands fork from a pre-initialized interpreter
+SHELL_WARM_PYTHON = os.environ.get('SYNCPHONY_WARM_PYTHON', "0") == "1"
+SHELL_WARM_PYTHON_PRELOAD = os.environ.get('SYNCPHONY_WARM_PYTHON_PRELOAD', "json,re,subprocess,urllib.request")
+FORKSERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_forkserver.py")
+# Bulk file operations
+FS_IO_WORKERS = int(os.environ.get('SYNCPHONY_FS_WORKERS', min(32, (os.cpu_count() or 1) + 4)))
+FS_HASH_BLOCK_BYTES = 1024 * 1024
+FS_READ_MAX_BYTES = 16 * 1024 * 1024         # cap for range/head/tail reads; larger requests are clipped
+FS_SEARCH_MAX_LINE_CHARS = 1000              # context returned per search match
+FS_FINGERPRINT_CACHE = os.environ.get('SYNCPHONY_FS_FINGERPRINT_CACHE',
+                                      os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "fingerprints.json"))
 
 class MusicianProcess(multiprocessing.Process):
-    def __init__(self, name, task_queue, log_queue, reporting_queue):
+    # Actions that accept shm_transport.SharedBuffer values for large payloads instead of str
+    ZERO_COPY_ACTIONS = frozenset()
+
+    def __init__(self, name, task_queue, log_queue, reporting_queue, control_queue=None):
         super().__init__()
         self.name = name
         self.task_queue = task_queue
         self.log_queue = log_queue
         self.reporting_queue = reporting_queue
+        self.control_queue = control_queue  # reset acknowledgements for a persistent musician pool
         self.actions = self._map_actions()
         self._current_task_id = None
         self._loop = None
@@ -44,15 +77,19 @@ class MusicianProcess(multiprocessing.Process):
 
         self.log_queue.put(f"[{self.name}]: Executing action '{action_name}' for task '{task_id_for_decorator}'.")
 
-        if asyncio.iscoroutinefunction(action_method_func):
-            await action_method_func(self, **parameters)
-        else:
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                getattr(self, action_name),
-                **parameters
-            )
+        # Actions are bound methods; sync ones run in the default executor.
+        # run_in_executor() takes no kwargs, hence the partial. Payloads the
+        # Conductor moved to shared memory are attached only while the action runs.
+        with attach_payloads(parameters, zero_copy=action_name in self.ZERO_COPY_ACTIONS) as parameters:
+            if asyncio.iscoroutinefunction(action_method_func):
+                result = await action_method_func(**parameters)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    functools.partial(action_method_func, **parameters)
+                )
         self._current_task_id = None
+        return result
 
     def run(self):
         self.log_queue.put(f"[{self.name}]: Process started, initializing asyncio loop.")
@@ -66,38 +103,141 @@ class MusicianProcess(multiprocessing.Process):
             loop.close()
             self.log_queue.put(f"[{self.name}]: Asyncio loop closed. Process shutting down.")
 
+    def _forward_metrics_rollup(self, series):
+        """Sends drained duration histograms to the Conductor for merging into the GDC."""
+        self.reporting_queue.put({"type": "metrics_rollup", "musician": self.name, "series": series})
+
+    async def _on_shutdown(self):
+        """Hook for subclasses to release resources when STOP is received."""
+
+    async def _run_task(self, task):
+        """Runs one task through the lifecycle decorator and reports its outcome."""
+        task_id = task.get('task_id')
+        details = task.get('details', {})
+        action = details.get('action')
+        parameters = details.get('parameters', {})
+        timeout_s = task.get('timeout_s', details.get('timeout_s'))
+
+        self.log_queue.put(f"[{self.name}]: Received task '{task_id}' (Action: {action}).")
+
+        if action not in self.actions:
+            error_msg = f"Unknown action '{action}' for task '{task_id}'."
+            self.log_queue.put(f"[{self.name} ERROR]: {error_msg}")
+            self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": error_msg})
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s if timeout_s is not None else None
+        try:
+            # Decorate the plain function: the wrapper passes the instance itself.
+            decorated_action_runner = log_task_lifecycle()(type(self)._execute_decorated_action)
+            await asyncio.wait_for(decorated_action_runner(self, action, parameters, task_id), timeout_s)
+            self.reporting_queue.put({"task_id": task_id, "status": "completed"})
+            self.log_queue.put(f"[{self.name}]: Task '{task_id}' completed successfully.")
+        except asyncio.TimeoutError as e:
+            # asyncio.TimeoutError is the builtin TimeoutError on 3.11+, so an action's own
+            # socket or subprocess timeout lands here too; only an expired deadline is ours.
+            if deadline is not None and loop.time() >= deadline:
+                error_msg = f"Task '{task_id}' timed out after {timeout_s}s and was cancelled."
+                self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": error_msg})
+                self.log_queue.put(f"[{self.name} ERROR]: {error_msg}")
+            else:
+                error = str(e) or type(e).__name__
+                self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": error})
+                self.log_queue.put(f"[{self.name} ERROR]: Task '{task_id}' failed: {error}")
+        except asyncio.CancelledError:
+            self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": "Task cancelled."})
+            self.log_queue.put(f"[{self.name}]: Task '{task_id}' cancelled.")
+        except Exception as e:
+            self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": str(e)})
+            self.log_queue.put(f"[{self.name} ERROR]: Task '{task_id}' failed: {e}")
+        finally:
+            self._current_task_id = None
+
+    async def _task_runner(self):
+        """
+        Executes queued tasks one at a time, each as its own asyncio task so
+        the main loop can cancel it while it runs.
+        """
+        while True:
+            task = await self._ready_tasks.get()
+            task_id = task.get('task_id')
+            if task_id in self._cancelled_task_ids:
+                self._cancelled_task_ids.discard(task_id)
+                self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": "Task cancelled."})
+                self.log_queue.put(f"[{self.name}]: Task '{task_id}' cancelled before it started.")
+                continue
+            running = asyncio.create_task(self._run_task(task))
+            self._running_tasks[task_id] = running
+            try:
+                # wait() rather than await, so cancelling the task does not cancel the runner.
+                await asyncio.wait([running])
+            finally:
+                self._running_tasks.pop(task_id, None)
+
+    async def _reset_for_performance(self, token=None):
+        """
+        Clears per-performance state when a pooled process is reused by a new
+        performance, then acknowledges on the control queue so the launcher
+        knows the process is healthy.
+        """
+        in_flight = list(self._running_tasks.values())
+        for running in in_flight:
+            running.cancel()
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=SHELL_KILL_GRACE_SECONDS + 1)
+        while not self._ready_tasks.empty():
+            self._ready_tasks.get_nowait()
+        self._cancelled_task_ids.clear()
+        self._current_task_id = None
+        await start_new_performance(self.name)
+        if token is not None and self.control_queue is not None:
+            healthy = not self._runner.done()
+            self.control_queue.put({"musician": self.name, "token": token, "pid": os.getpid(), "healthy": healthy})
+
+    def _cancel_task(self, task_id):
+        running = self._running_tasks.get(task_id)
+        if running is not None:
+            self.log_queue.put(f"[{self.name}]: Cancelling running task '{task_id}'.")
+            running.cancel()
+        else:
+            self._cancelled_task_ids.add(task_id)
+
     async def _run_musician_loop(self):
-        asyncio.create_task(_telemetry_flusher_task())
+        add_rollup_sink(self._forward_metrics_rollup)
+        asyncio.create_task(_telemetry_flusher_task(self.name))
         self.log_queue.put(f"[{self.name}]: Telemetry flusher task started.")
 
+        self._ready_tasks = asyncio.Queue()
+        self._running_tasks = {}
+        self._cancelled_task_ids = set()
+        runner = self._runner = asyncio.create_task(self._task_runner())
+
         backoff_time = 0.01
         while True:
             try:
-                task = await asyncio.to_thread(self.task_queue.get, timeout=1)
-                if task == 'STOP':
+                # Keep reading the queue while a task runs so STOP and cancel
+                # requests are acted on immediately, not after the task ends.
+                message = await asyncio.to_thread(self.task_queue.get, timeout=1)
+                if message == 'STOP':
                     self.log_queue.put(f"[{self.name}]: Received STOP signal. Shutting down.")
+                    runner.cancel()
+                    in_flight = list(self._running_tasks.values())
+                    for running in in_flight:
+                        running.cancel()
+                    if in_flight:
+                        # Cancelled shell commands get SHELL_KILL_GRACE_SECONDS before SIGKILL.
+                        await asyncio.wait(in_flight, timeout=SHELL_KILL_GRACE_SECONDS + 1)
+                    await self._on_shutdown()
+                    await flush_metrics_rollup(self.name)
                     break
-
-                task_id = task.get('task_id')
-                details = task.get('details', {})
-                action = details.get('action')
-                parameters = details.get('parameters', {})
-
-                self.log_queue.put(f"[{self.name}]: Received task '{task_id}' (Action: {action}).")
-
-                if action in self.actions:
-                    try:
-                        decorated_action_runner = log_task_lifecycle()(self._execute_decorated_action)
-                        await decorated_action_runner(self, action, parameters, task_id)
-                        self.reporting_queue.put({"task_id": task_id, "status": "completed"})
-                        self.log_queue.put(f"[{self.name}]: Task '{task_id}' completed successfully.")
-                    except Exception as e:
-                        self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": str(e)})
-                        self.log_queue.put(f"[{self.name} ERROR]: Task '{task_id}' failed: {e}")
-                else:
-                    error_msg = f"Unknown action '{action}' for task '{task_id}'."
-                    self.log_queue.put(f"[{self.name} ERROR]: {error_msg}")
-                    self.reporting_queue.put({"task_id": task_id, "status": "failed", "error": error_msg})
+                if isinstance(message, dict) and message.get('command') == 'cancel':
+                    self._cancel_task(message.get('task_id'))
+                    continue
+                if isinstance(message, dict) and message.get('command') == 'reset':
+                    await self._reset_for_performance(message.get('token'))
+                    continue
+                await self._ready_tasks.put(message)
                 backoff_time = 0.01
             except queue.Empty:
                 await asyncio.sleep(backoff_time)
@@ -107,14 +247,153 @@ class MusicianProcess(multiprocessing.Process):
                 await asyncio.sleep(1)
                 backoff_time = 0.01
 
+def _atomic_copy(src, dst):
+    """Copies src (contents and metadata) over dst via a temp file and os.replace."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", prefix=".tmp-")
+    os.close(fd)
+    try:
+        shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _fast_copy(src, dst):
+    """
+    Copies src over dst atomically, letting the kernel move the bytes
+    (copy_file_range, else shutil's sendfile path) and preserving mtime so the
+    next (size, mtime) check sees the files as identical.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", prefix=".tmp-")
+    try:
+        copied = False
+        if hasattr(os, "copy_file_range"):
+            try:
+                with open(src, 'rb') as fsrc:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        sent = os.copy_file_range(fsrc.fileno(), fd, min(remaining, 1 << 30))
+                        if sent == 0:
+                            break
+                        remaining -= sent
+                copied = remaining == 0
+            except OSError:
+                copied = False
+        os.close(fd)
+        fd = None
+        if not copied:
+            shutil.copyfile(src, tmp_path)
+        shutil.copystat(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _file_digest(path, block_bytes=FS_HASH_BLOCK_BYTES):
+    """SHA256 of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class _FingerprintCache:
+    """
+    Persistent {path: [size, mtime_ns, sha256]} map, so files whose size and
+    mtime have not changed since the last run are never re-hashed.
+    """
+    def __init__(self, cache_path=FS_FINGERPRINT_CACHE):
+        self.cache_path = cache_path
+        self._entries = None
+        self._dirty = False
+
+    def load(self):
+        if self._entries is None:
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def digest(self, path, stat_result):
+        key = os.path.abspath(path)
+        cached = self.load().get(key)
+        if cached and cached[0] == stat_result.st_size and cached[1] == stat_result.st_mtime_ns:
+            return cached[2]
+        digest = _file_digest(path)
+        self.record(path, stat_result, digest)
+        return digest
+
+    def record(self, path, stat_result, digest):
+        self.load()[os.path.abspath(path)] = [stat_result.st_size, stat_result.st_mtime_ns, digest]
+        self._dirty = True
+
+    def forget(self, path):
+        if self.load().pop(os.path.abspath(path), None) is not None:
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        atomic_write(self.cache_path, json.dumps(self._entries).encode('utf-8'))
+        self._dirty = False
+
 class FileSystemMusician(MusicianProcess):
+    ZERO_COPY_ACTIONS = frozenset({"write_file", "write_files"})
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._io_pool = None
+        self._fingerprints = None
+
+    async def _on_shutdown(self):
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+
     def _map_actions(self):
         return {
             "create_directory": self.create_directory,
             "write_file": self.write_file,
+            "write_files": self.write_files,
             "read_file": self.read_file,
-            "delete_path": self.delete_path
+            "delete_path": self.delete_path,
+            "delete_paths": self.delete_paths,
+            "copy_tree": self.copy_tree,
+            "sync_tree": self.sync_tree
         }
+
+    async def _run_io(self, entries, operation):
+        """Runs operation(entry) for every entry on the I/O thread pool, returning results in order."""
+        if self._io_pool is None:
+            # Created lazily so it lives in the musician process, not the parent that constructed us.
+            self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=FS_IO_WORKERS, thread_name_prefix=f"{self.name}-io")
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(self._io_pool, operation, entry) for entry in entries))
+
+    @staticmethod
+    def _make_dirs(directories):
+        """Creates each distinct directory once; returns {dir: error} for the ones that failed."""
+        errors = {}
+        for directory in sorted({d for d in directories if d}):
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                errors[directory] = str(e)
+        return errors
+
+    def _finish_bulk(self, operation_name, results, started):
+        failed = [r for r in results if r["status"] == "failed"]
+        self.log_queue.put(f"[{self.name}]: {operation_name} finished: {len(results) - len(failed)}/{len(results)} succeeded.")
+        if failed:
+            lines = [f"{r.get('path', r.get('src'))}: {r['error']}" for r in failed]
+            raise Exception(f"{operation_name}: {len(failed)} of {len(results)} entries failed:\n" + "\n".join(lines))
+        return {"results": results, "failed": 0, "duration_ms": (time.monotonic() - started) * 1000}
     
     def create_directory(self, path):
         os.makedirs(path, exist_ok=True)
@@ -122,17 +401,134 @@ class FileSystemMusician(MusicianProcess):
 
     def write_file(self, file_path, content):
         normalized_path = os.path.normpath(file_path.strip())
-        os.makedirs(os.path.dirname(normalized_path), exist_ok=True)
-        with open(normalized_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        os.makedirs(os.path.dirname(normalized_path) or ".", exist_ok=True)
+        atomic_write(normalized_path, as_bytes(content))
         self.log_queue.put(f"[{self.name}]: File '{normalized_path}' written.")
 
-    def read_file(self, file_path):
+    async def write_files(self, files):
+        """
+        Writes many files in one task. files is a list of {"file_path", "content"}
+        dicts or a {path: content} mapping. Parent directories are created once,
+        each file is written atomically, and the writes run on the I/O pool.
+        Returns a per-file result and raises if any file could not be written.
+        """
+        if isinstance(files, dict):
+            files = [{"file_path": path, "content": content} for path, content in files.items()]
+        started = time.monotonic()
+        entries = [(os.path.normpath(f["file_path"].strip()), f.get("content", "")) for f in files]
+        dir_errors = (await self._run_io([[os.path.dirname(path) for path, _ in entries]], self._make_dirs))[0]
+
+        def write_one(entry):
+            path, content = entry
+            parent_error = dir_errors.get(os.path.dirname(path))
+            if parent_error:
+                return {"path": path, "status": "failed", "error": parent_error}
+            data = as_bytes(content)
+            try:
+                atomic_write(path, data)
+            except OSError as e:
+                return {"path": path, "status": "failed", "error": str(e)}
+            return {"path": path, "status": "written", "bytes": len(data)}
+
+        results = await self._run_io(entries, write_one)
+        return self._finish_bulk("write_files", results, started)
+
+    def read_file(self, file_path, mode="text", offset=0, length=None, lines=100, pattern=None,
+                  max_matches=100, algorithm="sha256", encoding='utf-8'):
+        """
+        Reads a file in one of several modes, none of which holds more than
+        FS_READ_MAX_BYTES of it in memory:
+
+        - "text": the whole file as a str; files above the blob threshold are
+          streamed into the blob store and returned as a blob reference.
+        - "range": length bytes starting at offset.
+        - "head" / "tail": the first / last `lines` lines.
+        - "search": regex `pattern` matched over an mmap of the file; returns
+          the byte offset and line of up to max_matches matches.
+        - "hash": streaming digest with hashlib `algorithm`.
+
+        Non-"text" modes return a dict; any content larger than the blob
+        threshold in it is replaced by a blob reference.
+        """
         normalized_path = os.path.normpath(file_path.strip())
-        with open(normalized_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        self.log_queue.put(f"[{self.name}]: File '{normalized_path}' read.")
-        return content
+        size = os.path.getsize(normalized_path)
+        blob_store = get_default_blob_store()
+
+        if mode == "text":
+            if size > blob_store.threshold_bytes:
+                result = blob_store.put_file(normalized_path)
+            else:
+                with open(normalized_path, 'r', encoding=encoding) as f:
+                    result = f.read()
+        elif mode == "range":
+            offset = max(0, int(offset))
+            length = FS_READ_MAX_BYTES if length is None else max(0, min(int(length), FS_READ_MAX_BYTES))
+            with open(normalized_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+            result = {"offset": offset, "length": len(data), "content": data.decode(encoding, errors='replace')}
+        elif mode == "head":
+            data = bytearray()
+            line_count = 0
+            with open(normalized_path, 'rb') as f:
+                while line_count < lines and len(data) < FS_READ_MAX_BYTES:
+                    line = f.readline(FS_READ_MAX_BYTES - len(data))
+                    if not line:
+                        break
+                    data += line
+                    line_count += 1
+            result = {"offset": 0, "length": len(data), "lines": line_count, "content": data.decode(encoding, errors='replace')}
+        elif mode == "tail":
+            chunks = []
+            newlines = 0
+            read_bytes = 0
+            position = size
+            with open(normalized_path, 'rb') as f:
+                # Read backwards until there is one newline more than the lines wanted.
+                while position > 0 and newlines <= lines and read_bytes < FS_READ_MAX_BYTES:
+                    step = min(SHELL_STREAM_READ_BYTES, position)
+                    position -= step
+                    f.seek(position)
+                    chunk = f.read(step)
+                    chunks.append(chunk)
+                    newlines += chunk.count(b"\n")
+                    read_bytes += len(chunk)
+            data = b"".join(reversed(chunks))
+            tail_lines = data.splitlines(keepends=True)[-lines:] if lines > 0 else []
+            data = b"".join(tail_lines)[-FS_READ_MAX_BYTES:]
+            result = {"offset": size - len(data), "length": len(data), "lines": len(tail_lines), "content": data.decode(encoding, errors='replace')}
+        elif mode == "search":
+            if not pattern:
+                raise ValueError("read_file mode 'search' needs a pattern.")
+            regex = re.compile(pattern.encode(encoding) if isinstance(pattern, str) else pattern)
+            matches = []
+            truncated = False
+            if size > 0:
+                with open(normalized_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for match in regex.finditer(mapped):
+                        if len(matches) >= max_matches:
+                            truncated = True
+                            break
+                        line_start = mapped.rfind(b"\n", 0, match.start()) + 1
+                        line_end = mapped.find(b"\n", match.end())
+                        line_end = size if line_end == -1 else line_end
+                        line = mapped[line_start:min(line_end, line_start + FS_SEARCH_MAX_LINE_CHARS)]
+                        matches.append({"offset": match.start(), "match": match.group(0).decode(encoding, errors='replace'),
+                                        "line": line.decode(encoding, errors='replace').rstrip("\r")})
+            result = {"pattern": regex.pattern.decode(encoding, errors='replace'), "matches": matches, "truncated": truncated}
+        elif mode == "hash":
+            digest = hashlib.new(algorithm)
+            with open(normalized_path, 'rb') as f:
+                for block in iter(lambda: f.read(FS_HASH_BLOCK_BYTES), b""):
+                    digest.update(block)
+            result = {"algorithm": algorithm, "hexdigest": digest.hexdigest()}
+        else:
+            raise ValueError(f"Unknown read_file mode '{mode}'.")
+
+        if isinstance(result, dict) and not blob_store.is_reference(result):
+            result = blob_store.externalize(dict(result, path=normalized_path, size=size))
+        self.log_queue.put(f"[{self.name}]: File '{normalized_path}' read (mode: {mode}).")
+        return result
 
     def delete_path(self, path):
         if os.path.isdir(path):
@@ -144,84 +540,673 @@ class FileSystemMusician(MusicianProcess):
         else:
             self.log_queue.put(f"[{self.name}]: Path '{path}' not found.")
 
-class ShellExecutorMusician(MusicianProcess):
-    def _map_actions(self):
-        return {"run_command": self.run_command}
+    async def delete_paths(self, paths):
+        """Deletes many files or directory trees in parallel. Missing paths are reported, not treated as errors."""
+        started = time.monotonic()
 
-    def run_command(self, command, cwd):
-        try:
-            # MODIFIED: Use shlex.split for safety and shell=False
-            if isinstance(command, str):
-                cmd_list = shlex.split(command)
+        def delete_one(path):
+            path = os.path.normpath(path.strip())
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                return {"path": path, "status": "missing"}
+            except OSError as e:
+                return {"path": path, "status": "failed", "error": str(e)}
+            return {"path": path, "status": "deleted"}
+
+        results = await self._run_io(paths, delete_one)
+        return self._finish_bulk("delete_paths", results, started)
+
+    async def copy_tree(self, copies=None, src=None, dst=None, overwrite=True):
+        """
+        Copies files or directory trees. Pass src/dst for one copy or copies as a
+        list of {"src", "dst"}. Destination directories are created once, files
+        are copied in parallel on the I/O pool and each lands atomically. With
+        overwrite=False existing destination files are left alone. Returns the
+        file count and bytes per entry.
+        """
+        copies = list(copies or [])
+        if src is not None:
+            copies.append({"src": src, "dst": dst})
+        started = time.monotonic()
+
+        def scan(entry):
+            entry_src = os.path.normpath(entry["src"].strip())
+            entry_dst = os.path.normpath(entry["dst"].strip())
+            result = {"src": entry_src, "dst": entry_dst, "status": "copied", "files": 0, "skipped": 0, "bytes": 0}
+            directories, pairs = [], []
+            if os.path.isdir(entry_src):
+                for root, _dirs, names in os.walk(entry_src):
+                    target_root = os.path.normpath(os.path.join(entry_dst, os.path.relpath(root, entry_src)))
+                    directories.append(target_root)
+                    pairs.extend((os.path.join(root, name), os.path.join(target_root, name)) for name in names)
+            elif os.path.isfile(entry_src):
+                directories.append(os.path.dirname(entry_dst))
+                pairs.append((entry_src, entry_dst))
+            else:
+                result.update({"status": "failed", "error": f"Source '{entry_src}' not found."})
+            return result, directories, pairs
+
+        scanned = await self._run_io(copies, scan)
+        results = [result for result, _, _ in scanned]
+        file_pairs = [(index, file_src, file_dst) for index, (_, _, pairs) in enumerate(scanned) for file_src, file_dst in pairs]
+        dir_errors = (await self._run_io([[d for _, directories, _ in scanned for d in directories]], self._make_dirs))[0]
+
+        def copy_one(pair):
+            _index, file_src, file_dst = pair
+            parent_error = dir_errors.get(os.path.dirname(file_dst))
+            if parent_error:
+                return "failed", f"{file_dst}: {parent_error}", 0
+            if not overwrite and os.path.exists(file_dst):
+                return "skipped", None, 0
+            try:
+                _atomic_copy(file_src, file_dst)
+                return "copied", None, os.path.getsize(file_dst)
+            except OSError as e:
+                return "failed", f"{file_src}: {e}", 0
+
+        outcomes = await self._run_io(file_pairs, copy_one)
+        for (index, _file_src, _file_dst), (status, error, size) in zip(file_pairs, outcomes):
+            result = results[index]
+            if status == "copied":
+                result["files"] += 1
+                result["bytes"] += size
+            elif status == "skipped":
+                result["skipped"] += 1
+            elif result["status"] != "failed":
+                result.update({"status": "failed", "error": error})
+        return self._finish_bulk("copy_tree", results, started)
+
+    async def sync_tree(self, src, dst, delete_extras=False):
+        """
+        Mirrors the src directory into dst, copying only what changed.
+
+        Files with the same size and mtime are taken as unchanged. Files whose
+        size matches but whose mtime differs are compared by content hash, using
+        the persistent fingerprint cache so unchanged files are not re-read on
+        the next run. With delete_extras, files and directories in dst that do
+        not exist in src are removed.
+        """
+        src = os.path.normpath(src.strip())
+        dst = os.path.normpath(dst.strip())
+        if not os.path.isdir(src):
+            raise FileNotFoundError(f"Source directory '{src}' not found.")
+        if self._fingerprints is None:
+            self._fingerprints = _FingerprintCache()
+        fingerprints = self._fingerprints
+        started = time.monotonic()
+
+        def scan(root_dir):
+            files, directories = {}, set()
+            if os.path.isdir(root_dir):
+                for root, dirs, names in os.walk(root_dir):
+                    rel_root = os.path.relpath(root, root_dir)
+                    directories.update(os.path.normpath(os.path.join(rel_root, d)) for d in dirs)
+                    for name in names:
+                        rel_path = os.path.normpath(os.path.join(rel_root, name))
+                        try:
+                            files[rel_path] = os.stat(os.path.join(root, name))
+                        except FileNotFoundError:
+                            continue
+            return files, directories
+
+        (src_files, src_dirs), (dst_files, dst_dirs) = await self._run_io([src, dst], scan)
+        await self._run_io([None], lambda _: fingerprints.load())  # once, before the pool shares it
+
+        def compare(rel_path):
+            src_stat = src_files[rel_path]
+            dst_stat = dst_files.get(rel_path)
+            if dst_stat is None or dst_stat.st_size != src_stat.st_size:
+                return rel_path, "copy"
+            if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+                return rel_path, "unchanged"
+            src_path, dst_path = os.path.join(src, rel_path), os.path.join(dst, rel_path)
+            if fingerprints.digest(src_path, src_stat) == fingerprints.digest(dst_path, dst_stat):
+                # Same content: align the mtime so the cheap check succeeds next time.
+                os.utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+                fingerprints.forget(dst_path)
+                return rel_path, "unchanged"
+            return rel_path, "copy"
+
+        decisions = await self._run_io(sorted(src_files), compare)
+        to_copy = [rel_path for rel_path, decision in decisions if decision == "copy"]
+        dir_errors = (await self._run_io([[os.path.join(dst, d) for d in sorted(src_dirs)] + [dst]], self._make_dirs))[0]
+
+        def copy_one(rel_path):
+            src_path, dst_path = os.path.join(src, rel_path), os.path.join(dst, rel_path)
+            parent_error = dir_errors.get(os.path.dirname(dst_path))
+            if parent_error:
+                return {"path": rel_path, "status": "failed", "error": parent_error}
+            try:
+                if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                    shutil.rmtree(dst_path)
+                _fast_copy(src_path, dst_path)
+            except OSError as e:
+                return {"path": rel_path, "status": "failed", "error": str(e)}
+            fingerprints.forget(dst_path)
+            return {"path": rel_path, "status": "copied", "bytes": src_files[rel_path].st_size}
+
+        results = await self._run_io(to_copy, copy_one)
+
+        if delete_extras:
+            extra_files = [os.path.join(dst, p) for p in dst_files if p not in src_files]
+            # Only the top-most extra directories; rmtree takes care of what is below them.
+            extra_dirs = [d for d in sorted(dst_dirs - src_dirs)
+                          if os.path.dirname(d) in ("", ".") or os.path.dirname(d) in src_dirs]
+            extra_files = [f for f in extra_files if not any(
+                os.path.relpath(f, dst).startswith(d + os.sep) for d in extra_dirs)]
+
+            def delete_one(path):
+                try:
+                    if os.path.isdir(path) and not os.path.islink(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                    fingerprints.forget(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    return {"path": os.path.relpath(path, dst), "status": "failed", "error": str(e)}
+                return {"path": os.path.relpath(path, dst), "status": "deleted"}
+
+            results += await self._run_io(extra_files + [os.path.join(dst, d) for d in extra_dirs], delete_one)
+
+        await self._run_io([None], lambda _: fingerprints.save())
+        summary = self._finish_bulk("sync_tree", results, started)
+        summary.update({
+            "copied": sum(1 for r in results if r["status"] == "copied"),
+            "deleted": sum(1 for r in results if r["status"] == "deleted"),
+            "unchanged": len(decisions) - len(to_copy),
+            "bytes_copied": sum(r.get("bytes", 0) for r in results),
+        })
+        return summary
+
+class _OutputTail:
+    """Keeps only the last max_chars characters written to it."""
+    def __init__(self, max_chars=SHELL_OUTPUT_TAIL_CHARS):
+        self.max_chars = max_chars
+        self._chunks = collections.deque()
+        self._size = 0
+        self.truncated = False
+
+    def append(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size > self.max_chars:
+            overflow = self._size - self.max_chars
+            head = self._chunks[0]
+            if len(head) <= overflow:
+                self._chunks.popleft()
+                self._size -= len(head)
             else:
-                cmd_list = command # Assume it's already a list of args
+                self._chunks[0] = head[overflow:]
+                self._size -= overflow
+            self.truncated = True
+
+    def getvalue(self):
+        return "".join(self._chunks)
 
-            self.log_queue.put(f"[{self.name}]: Running command: '{cmd_list}' in '{cwd}'")
-            result = subprocess.run(
-                cmd_list, shell=False, cwd=cwd, check=True,
-                capture_output=True, text=True, encoding='utf-8', errors='ignore'
+if os.name == 'nt':
+    _NEW_PROCESS_GROUP_KWARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP_KWARGS = {"start_new_session": True}
+
+async def _terminate_process_group(process, grace_seconds=SHELL_KILL_GRACE_SECONDS):
+    """Terminates a command started in its own process group, escalating to a kill after the grace period."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == 'nt':
+            process.terminate()
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        await asyncio.wait_for(process.wait(), grace_seconds)
+        return
+    except asyncio.TimeoutError:
+        pass
+    try:
+        if os.name == 'nt':
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        return
+    await process.wait()
+
+async def _pipe_stream_reader(fd):
+    """Wraps the read end of an os.pipe() in an asyncio StreamReader."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, 'rb', 0))
+    return reader
+
+class _WarmPythonProcess:
+    """
+    A child forked by the warm Python server, exposing the parts of
+    asyncio.subprocess.Process that _spawn_and_stream relies on.
+    """
+    def __init__(self, pid, stdout, stderr, control_reader, control_writer):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+        self._control_reader = control_reader
+        self._control_writer = control_writer
+
+    async def wait(self):
+        if self.returncode is None:
+            line = await self._control_reader.readline()
+            message = json.loads(line) if line else {}
+            # No exit message means the server itself went away; report a signal-style failure.
+            self.returncode = message.get("returncode", -signal.SIGKILL)
+            self._control_writer.close()
+        return self.returncode
+
+    def terminate(self):
+        os.killpg(self.pid, signal.SIGTERM)
+
+    def kill(self):
+        os.killpg(self.pid, signal.SIGKILL)
+
+class _WarmPythonServer:
+    """Owns one python_forkserver.py process per musician, started on first use."""
+    def __init__(self, preload):
+        self.preload = [m.strip() for m in preload.split(",") if m.strip()]
+        self.socket_path = None
+        self._process = None
+        self._start_lock = asyncio.Lock()
+
+    async def _ensure_started(self):
+        async with self._start_lock:
+            if self._process is not None and self._process.returncode is None:
+                return
+            self.socket_path = os.path.join(tempfile.mkdtemp(prefix="syncphony-fork-"), "python.sock")
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, FORKSERVER_SCRIPT, "--socket", self.socket_path, "--preload", ",".join(self.preload),
+                stdout=asyncio.subprocess.PIPE
             )
-            
-            # Use run_coroutine_threadsafe to safely call async functions from this sync method
-            if result.stdout:
-                stdout_content = result.stdout.strip()
-                self.log_queue.put(f"[{self.name} STDOUT]: {stdout_content}")
-                asyncio.run_coroutine_threadsafe(
-                    emit_telemetry_event(self.name, self._current_task_id, "sub_log_entry",
-                                         {"log_type": "stdout", "content": stdout_content}),
-                    loop=self._loop
-                )
+            ready = await asyncio.wait_for(self._process.stdout.readline(), 30)
+            if ready.strip() != b"READY":
+                raise RuntimeError("Warm Python server failed to start.")
+
+    async def spawn(self, argv, cwd, env):
+        await self._ensure_started()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            payload = json.dumps({"argv": argv, "cwd": cwd, "env": env}).encode('utf-8') + b"\n"
+            sent = socket.send_fds(sock, [payload], [out_w, err_w])
+            if sent < len(payload):
+                sock.sendall(payload[sent:])
+        except Exception:
+            sock.close()
+            os.close(out_r)
+            os.close(err_r)
+            raise
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+
+        control_reader, control_writer = await asyncio.open_unix_connection(sock=sock)
+        first = json.loads(await control_reader.readline() or b"{}")
+        if "pid" not in first:
+            control_writer.close()
+            os.close(out_r)
+            os.close(err_r)
+            raise RuntimeError(first.get("error", "Warm Python server closed the connection."))
+        stdout = await _pipe_stream_reader(out_r)
+        stderr = await _pipe_stream_reader(err_r)
+        return _WarmPythonProcess(first["pid"], stdout, stderr, control_reader, control_writer)
+
+    async def stop(self):
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
+            await self._process.wait()
+        self._process = None
+
+class ShellExecutorMusician(MusicianProcess):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._child_processes = {}
+        self._warm_python = None
+
+    async def _on_shutdown(self):
+        if self._warm_python is not None:
+            await self._warm_python.stop()
+
+    def _warm_python_argv(self, cmd_list, warm):
+        """Returns the interpreter arguments if this command can run on a warm worker, else None."""
+        if not warm or os.name == 'nt' or not cmd_list:
+            return None
+        interpreter = cmd_list[0]
+        # Bare `python`/`python3` are taken to mean this musician's interpreter.
+        if os.path.basename(interpreter) not in ("python", "python3", os.path.basename(sys.executable)) \
+                and os.path.abspath(interpreter) != os.path.abspath(sys.executable):
+            return None
+        argv = list(cmd_list[1:])
+        return argv if is_warm_argv(argv) else None
+
+    def _map_actions(self):
+        return {
+            "run_command": self.run_command,
+            "run_commands": self.run_commands
+        }
+
+    async def _publish_output(self, log_type, text, task_id, label=None):
+        prefix = f"{log_type.upper()} {label}" if label else log_type.upper()
+        self.log_queue.put(f"[{self.name} {prefix}]: {text.rstrip()}")
+        source = f"subprocess_output {label}" if label else "subprocess_output"
+        await emit_telemetry_event(self.name, task_id, "sub_log_entry",
+                                   {"log_type": log_type, "content": text, "source": source})
+
+    async def _pump_output(self, stream, log_type, tail, task_id, label=None):
+        """
+        Reads a subprocess pipe chunk by chunk into the bounded tail, and
+        forwards its output to the log queue and telemetry in batches of at
+        most one per SHELL_LOG_FLUSH_INTERVAL_SECONDS, split at line breaks
+        where there are any.
+        """
+        loop = asyncio.get_running_loop()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        pending = ""
+        omitted = 0
+        last_flush = loop.time()
+        eof = False
+        while not eof:
+            timeout = max(SHELL_LOG_FLUSH_INTERVAL_SECONDS - (loop.time() - last_flush), 0.01) if pending else None
+            try:
+                chunk = await asyncio.wait_for(stream.read(SHELL_STREAM_READ_BYTES), timeout)
+            except asyncio.TimeoutError:
+                chunk = None
+            if chunk is not None:
+                eof = not chunk
+                text = decoder.decode(chunk, final=eof)
+                if text:
+                    tail.append(text)
+                    pending += text
+                    if len(pending) > SHELL_LOG_MAX_PENDING_CHARS:
+                        omitted += len(pending) - SHELL_LOG_MAX_PENDING_CHARS
+                        pending = pending[-SHELL_LOG_MAX_PENDING_CHARS:]
+
+            if not pending or (not eof and loop.time() - last_flush < SHELL_LOG_FLUSH_INTERVAL_SECONDS):
+                continue
+            # Send up to the last line break ("\r" counts, for progress bars); a partial
+            # line with no break is sent whole once the interval has passed.
+            cut = len(pending) if eof else max(pending.rfind("\n"), pending.rfind("\r")) + 1
+            if cut == 0:
+                cut = len(pending)
+            batch, pending = pending[:cut], pending[cut:]
+            if omitted:
+                batch = f"[... {omitted} characters omitted ...]\n{batch}"
+                omitted = 0
+            await self._publish_output(log_type, batch, task_id, label)
+            last_flush = loop.time()
+
+    async def _spawn_and_stream(self, command, cwd, env, task_id, label=None, warm=False):
+        """
+        Runs one command to completion while streaming its output, and returns
+        its result dict. A non-zero exit code is returned, not raised; failing
+        to start the command raises.
+        """
+        # MODIFIED: Use shlex.split for safety and shell=False
+        if isinstance(command, str):
+            cmd_list = shlex.split(command)
+        else:
+            cmd_list = command # Assume it's already a list of args
 
-            if result.stderr:
-                stderr_content = result.stderr.strip()
-                self.log_queue.put(f"[{self.name} STDERR]: {stderr_content}")
-                asyncio.run_coroutine_threadsafe(
-                    emit_telemetry_event(self.name, self._current_task_id, "sub_log_entry",
-                                         {"log_type": "stderr", "content": stderr_content}),
-                    loop=self._loop
+        process_env = None
+        if env:
+            process_env = dict(os.environ)
+            process_env.update({str(k): str(v) for k, v in env.items()})
+
+        self.log_queue.put(f"[{self.name}]: Running command{' ' + label if label else ''}: '{cmd_list}' in '{cwd}'")
+        started = time.monotonic()
+        process = None
+        warm_argv = self._warm_python_argv(cmd_list, warm)
+        if warm_argv is not None:
+            try:
+                if self._warm_python is None:
+                    self._warm_python = _WarmPythonServer(SHELL_WARM_PYTHON_PRELOAD)
+                process = await self._warm_python.spawn(warm_argv, cwd, process_env or dict(os.environ))
+            except Exception as e:
+                self.log_queue.put(f"[{self.name}]: Warm Python worker unavailable, starting a fresh interpreter: {e}")
+        if process is None:
+            try:
+                # Own process group, so cancelling kills the whole tree (e.g. gradle daemons, npm scripts).
+                process = await asyncio.create_subprocess_exec(
+                    *cmd_list, cwd=cwd, env=process_env,
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                    **_NEW_PROCESS_GROUP_KWARGS
                 )
-            return {"stdout": result.stdout, "stderr": result.stderr, "returncode": result.returncode}
-        except subprocess.CalledProcessError as e:
-            error_details = f"Command '{command}' failed in '{cwd}' with exit code {e.returncode}.\nSTDOUT: {e.stdout}\nSTDERR: {e.stderr}"
+            except Exception as e:
+                raise Exception(f"An unexpected error occurred running command '{command}': {e}")
+
+        self._child_processes.setdefault(task_id, set()).add(process)
+        stdout_tail = _OutputTail()
+        stderr_tail = _OutputTail()
+        try:
+            await asyncio.gather(
+                self._pump_output(process.stdout, "stdout", stdout_tail, task_id, label),
+                self._pump_output(process.stderr, "stderr", stderr_tail, task_id, label),
+            )
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            self.log_queue.put(f"[{self.name}]: Killing command for cancelled task '{task_id}': '{cmd_list}'")
+            await _terminate_process_group(process)
+            raise
+        finally:
+            processes = self._child_processes.get(task_id)
+            if processes is not None:
+                processes.discard(process)
+                if not processes:
+                    del self._child_processes[task_id]
+
+        return {
+            "command": command,
+            "cwd": cwd,
+            "returncode": returncode,
+            "stdout": stdout_tail.getvalue(),
+            "stderr": stderr_tail.getvalue(),
+            "stdout_truncated": stdout_tail.truncated,
+            "stderr_truncated": stderr_tail.truncated,
+            "duration_ms": (time.monotonic() - started) * 1000,
+        }
+
+    async def run_command(self, command, cwd=None, env=None, warm=None):
+        warm = SHELL_WARM_PYTHON if warm is None else warm
+        result = await self._spawn_and_stream(command, cwd, env, self._current_task_id, warm=warm)
+        if result["returncode"] != 0:
+            error_details = f"Command '{command}' failed in '{cwd}' with exit code {result['returncode']}.\nSTDOUT: {result['stdout']}\nSTDERR: {result['stderr']}"
             raise Exception(error_details)
-        except Exception as e:
-            raise Exception(f"An unexpected error occurred running command '{command}': {e}")
+        return {k: result[k] for k in ("stdout", "stderr", "returncode", "stdout_truncated", "stderr_truncated")}
+
+    async def run_commands(self, commands, max_jobs=None, cwd=None, env=None, fail_fast=True, warm=None):
+        """
+        Runs a group of independent commands concurrently inside this task.
+
+        Each entry is a command string/list or a dict with "command" and
+        optional "cwd" and "env" (merged over the group-level env). At most
+        max_jobs run at once (default: CPU count). With fail_fast the first
+        failure cancels the rest; otherwise every command runs. Returns
+        per-command exit codes and timings, and raises if any command failed.
+        """
+        task_id = self._current_task_id
+        warm = SHELL_WARM_PYTHON if warm is None else warm
+        specs = []
+        for entry in commands:
+            spec = entry if isinstance(entry, dict) else {"command": entry}
+            merged_env = dict(env or {})
+            merged_env.update(spec.get("env") or {})
+            specs.append({"command": spec["command"], "cwd": spec.get("cwd", cwd), "env": merged_env,
+                          "warm": spec.get("warm", warm)})
+
+        semaphore = asyncio.Semaphore(max(1, int(max_jobs or os.cpu_count() or 4)))
+        group_started = time.monotonic()
+        results = [{"index": i, "command": spec["command"], "cwd": spec["cwd"], "status": "skipped", "returncode": None}
+                   for i, spec in enumerate(specs)]
+
+        async def run_one(i, spec):
+            async with semaphore:
+                results[i]["start_offset_ms"] = (time.monotonic() - group_started) * 1000
+                results[i]["status"] = "running"
+                try:
+                    outcome = await self._spawn_and_stream(spec["command"], spec["cwd"], spec["env"], task_id,
+                                                           label=f"#{i}", warm=spec["warm"])
+                except asyncio.CancelledError:
+                    results[i]["status"] = "cancelled"
+                    raise
+                except Exception as e:
+                    results[i].update({"status": "failed", "error": str(e)})
+                    return False
+                outcome.pop("command")
+                outcome.pop("cwd")
+                results[i].update(outcome)
+                results[i]["status"] = "ok" if outcome["returncode"] == 0 else "failed"
+                return results[i]["status"] == "ok"
+
+        jobs = [asyncio.create_task(run_one(i, spec)) for i, spec in enumerate(specs)]
+        try:
+            pending = set(jobs)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if fail_fast and any(not job.cancelled() and job.result() is False for job in done):
+                    for job in pending:
+                        job.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    break
+        except asyncio.CancelledError:
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            raise
+
+        failed = [r for r in results if r["status"] != "ok"]
+        summary = {
+            "results": results,
+            "failed": len(failed),
+            "duration_ms": (time.monotonic() - group_started) * 1000,
+        }
+        self.log_queue.put(f"[{self.name}]: Command group finished: {len(results) - len(failed)}/{len(results)} succeeded.")
+        if failed:
+            lines = [f"#{r['index']} {r['command']!r}: {r['status']} (exit code {r['returncode']})" for r in failed]
+            raise Exception(f"{len(failed)} of {len(results)} commands did not succeed:\n" + "\n".join(lines))
+        return summary
+
+def _leap_toolkit():
+    """leap_toolkit imports aiohttp, so it is loaded when WebMusician first needs it rather than in every musician process."""
+    import leap_toolkit
+    return leap_toolkit
 
 class WebMusician(MusicianProcess):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_counters_registered = False
+
     def _map_actions(self):
         return {
             "get_json": self.get_json,
-            "post_data": self.post_data
+            "get_json_many": self.get_json_many,
+            "post_data": self.post_data,
+            "download_file": self.download_file
+        }
+
+    async def _on_shutdown(self):
+        if "leap_toolkit" in sys.modules:
+            await _leap_toolkit().get_async_client().close()
+
+    async def get_json(self, url, headers=None, retries=3, backoff_factor=1, cache=False, cache_ttl=None,
+                       stale_on_error=False, hedge=False):
+        if cache and not self._cache_counters_registered:
+            # Cache outcomes become http_cache.* counters in the telemetry metrics rollup.
+            _leap_toolkit().get_http_cache().add_listener(lambda outcome: increment_counter(f"http_cache.{outcome}"))
+            self._cache_counters_registered = True
+        return await _leap_toolkit().async_get_json_from_url(url, retries=retries, backoff_factor=backoff_factor,
+                                                             headers=headers, cache=cache, ttl_seconds=cache_ttl,
+                                                             stale_on_error=stale_on_error, hedge=hedge)
+
+    async def get_json_many(self, urls, max_concurrency=16, rate_per_host=None, burst_per_host=None, headers=None,
+                            retries=3, backoff_factor=1, cache=False, cache_ttl=None, stale_on_error=False,
+                            hedge=False):
+        """
+        GETs many URLs as JSON in one task. At most max_concurrency requests
+        are in flight, and with rate_per_host each host gets a token bucket of
+        that many requests per second. Each outcome is appended to an NDJSON
+        file as it completes; the file is returned inline when small, or as a
+        blob reference. Failures are reported per URL. The task fails only if
+        every URL failed.
+        """
+        started = time.monotonic()
+        leap_toolkit = _leap_toolkit()
+        semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        buckets = {}
+        failures = []
+        succeeded = 0
+        fd, results_path = tempfile.mkstemp(prefix="get_json_many-", suffix=".ndjson")
+        results_file = os.fdopen(fd, 'w', encoding='utf-8')
+
+        async def fetch(index, url):
+            nonlocal succeeded
+            if rate_per_host:
+                # Wait for the host's token before taking a slot, so a throttled
+                # host cannot hold slots that other hosts' requests could use.
+                host = leap_toolkit.host_of(url)
+                if host not in buckets:
+                    buckets[host] = leap_toolkit.TokenBucket(rate_per_host, burst_per_host)
+                await buckets[host].acquire()
+            async with semaphore:
+                try:
+                    data = await self.get_json(url, headers=headers, retries=retries, backoff_factor=backoff_factor,
+                                               cache=cache, cache_ttl=cache_ttl, stale_on_error=stale_on_error,
+                                               hedge=hedge)
+                    entry = {"index": index, "url": url, "status": "ok", "data": data}
+                    succeeded += 1
+                except Exception as e:
+                    entry = {"index": index, "url": url, "status": "failed", "error": str(e)}
+                    failures.append({"index": index, "url": url, "error": str(e)})
+            results_file.write(json.dumps(entry) + "\n")
+
+        try:
+            await asyncio.gather(*(fetch(i, url) for i, url in enumerate(urls)))
+            results_file.close()
+            blob_store = get_default_blob_store()
+            if os.path.getsize(results_path) > blob_store.threshold_bytes:
+                results = blob_store.put_file(results_path)
+            else:
+                with open(results_path, 'r', encoding='utf-8') as f:
+                    results = sorted((json.loads(line) for line in f), key=lambda entry: entry["index"])
+        finally:
+            results_file.close()
+            os.remove(results_path)
+
+        failures.sort(key=lambda failure: failure["index"])
+        self.log_queue.put(f"[{self.name}]: Fetched {succeeded}/{len(urls)} URLs.")
+        if urls and not succeeded:
+            raise Exception(f"All {len(urls)} requests failed; first error: {failures[0]['error']}")
+        return {
+            "total": len(urls),
+            "succeeded": succeeded,
+            "failed": len(failures),
+            "failures": failures,
+            "results": results,
+            "duration_ms": (time.monotonic() - started) * 1000,
         }
 
-    async def get_json(self, url): # This action is async
-        return await get_json_from_url(url)
-
-    async def post_data(self, url, payload): # This action is async
-        return await post_data_to_api(url, payload)
-
-# Import the AI Oracle Musician
-try:
-    from ai_oracle_musician import AIOracleMusician
-    AI_ORACLE_AVAILABLE = True
-except ImportError:
-    AI_ORACLE_AVAILABLE = False
-    print("Warning: AI Oracle Musician not available - ai_oracle_musician.py not found")
-
-# Build the available musicians dictionary
-AVAILABLE_MUSICIANS = {
-    "FileSystemMusician": FileSystemMusician,
-    "ShellExecutorMusician": ShellExecutorMusician,
-    "WebMusician": WebMusician,
-    "FileSystem": FileSystemMusician,
-    "ShellExecutor": ShellExecutorMusician,
-    "Web": WebMusician,
-}
-
-# Add AI Oracle if available
-if AI_ORACLE_AVAILABLE:
-    AVAILABLE_MUSICIANS.update({
-        "AIOracleMusician": AIOracleMusician,
-        "AIOracle": AIOracleMusician,
-        "Oracle": AIOracleMusician
-    })
\ No newline at end of file
+    async def download_file(self, url, dest, checksum=None, resume=True, headers=None, retries=3, backoff_factor=1):
+        result = await _leap_toolkit().get_async_client().download(url, os.path.normpath(dest.strip()), checksum=checksum,
+                                                                   resume=resume, headers=headers, retries=retries,
+                                                                   backoff_factor=backoff_factor)
+        resumed = f" (resumed at byte {result['resumed_from']})" if result["resumed_from"] else ""
+        self.log_queue.put(f"[{self.name}]: Downloaded '{url}' to '{result['path']}': {result['bytes']} bytes{resumed}.")
+        return result
+
+    async def post_data(self, url, payload, headers=None, auth=None, retries=3, backoff_factor=1):
+        return await _leap_toolkit().async_post_data_to_api(url, payload, headers=headers, auth=auth,
+                                                            retries=retries, backoff_factor=backoff_factor)
@@ -0,0 +1,229 @@
+# C:\syncphony\musician_host.py
+# Musician host daemon: runs musician processes for a remote Conductor.
+#
+#   python musician_host.py --conductor 10.0.0.5:7070 --musician ShellExecutorMusician=4
+#
+# The host registers its roles and how many tasks of each it runs at once,
+# then executes dispatched tasks in local musician processes (one process per
+# slot, started when first needed) and streams their reports, log lines and
+# telemetry back over the same connection. Several hosts may run on one
+# machine for testing. The Conductor side is remote_hosts.RemoteMusicianHub;
+# it listens when SYNCPHONY_REMOTE_LISTEN is set.
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logger_config import get_logger
+from musician_registry import MusicianSlot, canonical_name, parse_musicians, pick_slot, stop_slots
+from remote_hosts import (HOST_HEARTBEAT_SECONDS, MAX_MESSAGE_BYTES, REMOTE_TOKEN,
+                          parse_address, read_message, send_message)
+
+logger = get_logger("MusicianHost")
+
+RECONNECT_MIN_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 2.0
+
+class MusicianHost:
+    def __init__(self, conductor_address, musicians, host_id=None, token=REMOTE_TOKEN):
+        self.conductor_address = conductor_address
+        self.capacity = {canonical_name(role): slots for role, slots in musicians.items()}
+        self.host_id = host_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.token = token
+        self.log_queue = multiprocessing.Queue()
+        self.reporting_queue = multiprocessing.Queue()
+        self.slots = {role: [MusicianSlot(role, i) for i in range(slots)] for role, slots in self.capacity.items()}
+        self._task_slots = {}  # task_id -> MusicianSlot
+        self._writer = None
+        self._stopping = False
+        self._relay = None
+
+    def log(self, message, level="info"):
+        getattr(logger, level)(f"[{self.host_id}]: {message}")
+
+    async def _send(self, message):
+        """Sends to the Conductor; messages are dropped while disconnected."""
+        writer = self._writer
+        if writer is None:
+            return
+        try:
+            await send_message(writer, message)
+        except (ConnectionError, OSError):
+            pass
+
+    async def _start_telemetry_relay(self):
+        """
+        Musicians post telemetry to a local ingest server whose batches are
+        forwarded to the Conductor, which flushes them to the real collector.
+        Must run before any musician class is imported.
+        """
+        from telemetry_ingest_server import TelemetryIngestServer
+
+        host = self
+
+        class TelemetryRelay(TelemetryIngestServer):
+            async def handle_events(self, request):
+                response = await super().handle_events(request)
+                # While disconnected, events stay buffered for the next Conductor.
+                if self.events and host._writer is not None:
+                    events = list(self.events)
+                    self.events.clear()
+                    await host._send({"type": "telemetry", "events": events})
+                return response
+
+        self._relay = TelemetryRelay()
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        runner = await self._relay.start("127.0.0.1", port)
+        os.environ['SYNCPHONY_TELEMETRY_ENDPOINT'] = f"http://127.0.0.1:{port}/telemetry_events"
+        return runner
+
+    async def _pump(self, mp_queue, forward):
+        while True:
+            try:
+                item = await asyncio.to_thread(mp_queue.get, timeout=0.5)
+            except queue.Empty:
+                continue
+            await forward(item)
+
+    async def _forward_log(self, message):
+        await self._send({"type": "log", "message": message})
+
+    async def _forward_report(self, report):
+        task_id = report.get("task_id")
+        if task_id is not None:
+            if task_id not in self._task_slots:
+                return  # abandoned when the connection dropped; the Conductor already failed it
+            if report.get("status") in ("completed", "failed"):
+                self._task_slots.pop(task_id).in_flight.discard(task_id)
+        await self._send({"type": "report", "report": report})
+
+    async def _run_task(self, task):
+        task_id = task.get("task_id")
+        role = canonical_name(task.get("musician"))
+        if role not in self.slots:
+            await self._send({"type": "report", "report": {"task_id": task_id, "status": "failed",
+                              "error": f"Host '{self.host_id}' does not run musician '{role}'."}})
+            return
+        slot = pick_slot(self.slots[role])
+        if slot.process is None:
+            try:
+                slot.start(self.log_queue, self.reporting_queue)
+            except (KeyError, ImportError) as e:
+                await self._send({"type": "report", "report": {"task_id": task_id, "status": "failed",
+                                  "error": f"Host '{self.host_id}' cannot launch '{role}': {e}"}})
+                return
+            self.log(f"Started {role} slot {slot.index} (pid {slot.process.pid}).")
+        slot.in_flight.add(task_id)
+        self._task_slots[task_id] = slot
+        slot.task_queue.put(task)
+
+    def _abandon_tasks(self):
+        """The Conductor is gone and has failed our tasks; reset the busy slots so they drop them."""
+        for slot in {slot for slot in self._task_slots.values()}:
+            slot.task_queue.put({"command": "reset"})
+            slot.in_flight.clear()
+        self._task_slots.clear()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(HOST_HEARTBEAT_SECONDS)
+            await self._send({"type": "heartbeat", "in_flight": len(self._task_slots)})
+
+    async def _session(self, reader, writer):
+        """Registers with the Conductor and serves it until the connection drops. Returns False if rejected."""
+        await send_message(writer, {"type": "register", "host_id": self.host_id, "token": self.token,
+                                    "musicians": self.capacity, "pid": os.getpid()})
+        answer = await read_message(reader)
+        if not answer or not answer.get("ok"):
+            self.log(f"Conductor rejected registration: {(answer or {}).get('error', 'connection closed')}", "error")
+            return answer is None
+        self._writer = writer
+        self.log(f"Registered with Conductor at {self.conductor_address}: "
+                 + ", ".join(f"{role} x{slots}" for role, slots in self.capacity.items()))
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                if message.get("type") == "task":
+                    await self._run_task(message["task"])
+                elif message.get("type") == "cancel":
+                    slot = self._task_slots.get(message.get("task_id"))
+                    if slot is not None:
+                        slot.task_queue.put({"command": "cancel", "task_id": message["task_id"]})
+        finally:
+            heartbeat.cancel()
+            self._writer = None
+            self._abandon_tasks()
+        return True
+
+    async def serve(self):
+        relay_runner = await self._start_telemetry_relay()
+        pumps = [asyncio.create_task(self._pump(self.log_queue, self._forward_log)),
+                 asyncio.create_task(self._pump(self.reporting_queue, self._forward_report))]
+        host, port = parse_address(self.conductor_address)
+        delay = RECONNECT_MIN_SECONDS
+        try:
+            while not self._stopping:
+                try:
+                    reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE_BYTES)
+                except OSError:
+                    # The Conductor only listens while a performance runs; keep trying.
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                    continue
+                delay = RECONNECT_MIN_SECONDS
+                try:
+                    if not await self._session(reader, writer):
+                        return
+                except (ConnectionError, OSError, ValueError) as e:
+                    self.log(f"Connection to Conductor lost: {e}", "warning")
+                finally:
+                    writer.close()
+                self.log("Disconnected from Conductor; waiting for the next performance.")
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            await relay_runner.cleanup()
+
+    def stop_all(self, timeout=5):
+        """Sends STOP to every started slot, then joins or terminates it."""
+        self._stopping = True
+        stop_slots([slot for slots in self.slots.values() for slot in slots], timeout)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run musicians for a remote Syncphony Conductor.")
+    parser.add_argument("--conductor", default=os.environ.get('SYNCPHONY_REMOTE_LISTEN') or "127.0.0.1:7070",
+                        help="HOST:PORT the Conductor listens on (SYNCPHONY_REMOTE_LISTEN).")
+    parser.add_argument("--musician", action="append", default=[], metavar="ROLE[=SLOTS]",
+                        help="A role to offer and how many of its tasks to run at once; repeatable.")
+    parser.add_argument("--host-id", default=None)
+    parser.add_argument("--token", default=REMOTE_TOKEN)
+    args = parser.parse_args()
+
+    # SIGTERM shuts down like Ctrl+C so the musician processes are stopped, not orphaned.
+    # Spawned (not forked) musicians do not inherit this handler.
+    signal.signal(signal.SIGTERM, _interrupt)
+    multiprocessing.set_start_method("spawn")
+    musician_host = MusicianHost(args.conductor, parse_musicians(args.musician or ["ShellExecutorMusician"]),
+                                 args.host_id, args.token)
+    try:
+        asyncio.run(musician_host.serve())
+    except KeyboardInterrupt:
+        logger.info("Musician host interrupted by user.")
+    finally:
+        musician_host.stop_all()
@@ -0,0 +1,294 @@
+# C:\syncphony\musician_registry.py
+# Maps musician role names (as used in Symphony "musician" fields) to the
+# classes that play them. Classes are given as "module:Class" strings and only
+# imported when a role is first launched, so a performance that only uses
+# FileSystemMusician never imports aiohttp or the Oracle.
+#
+# MusicianLauncher starts musician processes on demand: the Conductor puts
+# {"command": "spawn_musician", "musician": <role>} on the spawn queue right
+# before it dispatches that role's first task. With SYNCPHONY_PERSISTENT_MUSICIANS=1
+# the launched processes form a pool that outlives the performance: only the
+# Conductor is restarted, and each pooled musician is reset and health-checked
+# before the next performance reuses it.
+
+import importlib
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+MUSICIAN_POOL_PERSISTENT = os.environ.get('SYNCPHONY_PERSISTENT_MUSICIANS', "0") == "1"
+MUSICIAN_HEALTH_CHECK_TIMEOUT_SECONDS = float(os.environ.get('SYNCPHONY_MUSICIAN_HEALTH_TIMEOUT', 5))
+
+MUSICIAN_REGISTRY = {
+    "FileSystemMusician": "musician:FileSystemMusician",
+    "ShellExecutorMusician": "musician:ShellExecutorMusician",
+    "WebMusician": "musician:WebMusician",
+    "AIOracleMusician": "ai_oracle_musician:AIOracleMusician",
+}
+
+# Short role names accepted in Symphony files. Each alias is its own role with
+# its own task queue and process, exactly like the full name.
+MUSICIAN_ALIASES = {
+    "FileSystem": "FileSystemMusician",
+    "ShellExecutor": "ShellExecutorMusician",
+    "Web": "WebMusician",
+    "AIOracle": "AIOracleMusician",
+    "Oracle": "AIOracleMusician",
+}
+
+_class_cache = {}
+
+def register_musician(name, target):
+    """Adds or replaces a role. target is a "module:Class" string or the class itself."""
+    MUSICIAN_REGISTRY[name] = target
+    _class_cache.pop(name, None)
+
+def musician_names():
+    """Every role a Symphony may name, full names first."""
+    return list(MUSICIAN_REGISTRY) + [alias for alias in MUSICIAN_ALIASES if alias not in MUSICIAN_REGISTRY]
+
+def canonical_name(name):
+    """The full role name for an alias; other names are returned unchanged."""
+    return MUSICIAN_ALIASES.get(name, name) if name not in MUSICIAN_REGISTRY else name
+
+def get_musician_class(name):
+    """Imports and returns the class for a role. Raises KeyError for unknown roles, ImportError if its module is missing."""
+    if name in _class_cache:
+        return _class_cache[name]
+    target = MUSICIAN_REGISTRY.get(name) or MUSICIAN_REGISTRY.get(MUSICIAN_ALIASES.get(name))
+    if target is None:
+        raise KeyError(f"Unknown musician '{name}'.")
+    if isinstance(target, str):
+        module_name, _, class_name = target.partition(":")
+        target = getattr(importlib.import_module(module_name), class_name)
+    _class_cache[name] = target
+    return target
+
+def parse_musicians(specs):
+    """["ShellExecutorMusician=4", "FileSystem"] -> {"ShellExecutorMusician": 4, "FileSystemMusician": 1}"""
+    musicians = {}
+    for spec in specs:
+        role, _, slots = spec.partition("=")
+        musicians[canonical_name(role)] = int(slots or 1)
+    return musicians
+
+def required_musicians(tasks):
+    """Roles named by a Symphony's tasks, in first-use order."""
+    needed = []
+    for task in tasks:
+        name = task.get("musician")
+        if name and name not in needed:
+            needed.append(name)
+    return needed
+
+
+class MusicianSlot:
+    """
+    One musician process in a pool of same-role processes, each with its own
+    task queue so a pool can run several tasks of a role at once. Started on
+    first use; runs one task at a time, like a launched musician.
+    """
+    def __init__(self, role, index):
+        self.role = role
+        self.index = index
+        self.task_queue = multiprocessing.Queue()
+        self.process = None
+        self.in_flight = set()
+
+    def start(self, log_queue, reporting_queue):
+        self.process = get_musician_class(self.role)(self.role, self.task_queue, log_queue, reporting_queue)
+        self.process.start()
+
+
+def pick_slot(slots):
+    """The least busy slot; idle slots that are already running win over unstarted ones."""
+    return min(slots, key=lambda slot: (len(slot.in_flight), slot.process is None, slot.index))
+
+def stop_slots(slots, timeout=5):
+    """Sends STOP to every started slot, then joins or terminates it. Returns the slots terminated forcefully."""
+    started = [slot for slot in slots if slot.process is not None]
+    for slot in started:
+        slot.task_queue.put('STOP')
+    terminated = []
+    for slot in started:
+        slot.process.join(timeout=timeout)
+        if slot.process.is_alive():
+            slot.process.terminate()
+            terminated.append(slot)
+    return terminated
+
+
+def _release_abandoned_read_lock(task_queue):
+    """
+    A musician waits on its task queue holding the queue's read lock, so one
+    that is killed usually leaves the lock taken and its replacement would
+    block forever. The musician is the queue's only reader; once it is dead a
+    held lock can only be its own.
+    """
+    if task_queue is None:
+        return
+    try:
+        task_queue._rlock.release()
+    except ValueError:
+        pass  # the lock was free
+
+
+class MusicianLauncher:
+    """
+    Starts musician processes the first time they are asked for and, unless
+    persistent, stops them at the end of a performance. spawn requests
+    arriving between performances are ignored, so a request left over from a
+    finished performance cannot leak a process.
+    """
+    def __init__(self, task_queues, log_queue, reporting_queue, spawn_queue=None, persistent=MUSICIAN_POOL_PERSISTENT,
+                 notify_queue=None):
+        self.task_queues = task_queues
+        self.log_queue = log_queue
+        self.reporting_queue = reporting_queue
+        self.spawn_queue = spawn_queue
+        # Where the Conductor hears about roles that cannot be launched. The Conductor's
+        # input queue is read by nobody else, unlike the reporting queue.
+        self.notify_queue = notify_queue if notify_queue is not None else reporting_queue
+        self.persistent = persistent
+        self.control_queue = multiprocessing.Queue() if persistent else None
+        self.processes = {}
+        self._lock = threading.Lock()
+        self._accepting = False
+        self._listener = None
+        self._tokens = itertools.count(1)
+        self._unavailable = set() # roles that failed to launch this performance; reported once
+
+    def open(self):
+        """Accepts spawn requests for a new performance, after resetting and health-checking any pooled musicians."""
+        with self._lock:
+            if self.processes:
+                self._reset_pool()
+            self._unavailable.clear()
+            self._accepting = True
+        if self.spawn_queue is not None and self._listener is None:
+            self._listener = threading.Thread(target=self._listen, name="MusicianLauncher", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            request = self.spawn_queue.get()
+            if request is None:
+                return
+            if isinstance(request, dict) and request.get("command") == "spawn_musician":
+                self.ensure(request.get("musician"))
+
+    def _reset_pool(self, timeout=MUSICIAN_HEALTH_CHECK_TIMEOUT_SECONDS):
+        """
+        Sends a reset to every pooled musician and waits for the acknowledgements.
+        The reset is queued before any task of the new performance, so a musician
+        never sees the old performance's state. Dead or unresponsive processes are
+        terminated and dropped; they are respawned on demand like any other role.
+        """
+        started = time.monotonic()
+        token = next(self._tokens)
+        waiting = {}
+        for name, process in list(self.processes.items()):
+            if process.is_alive():
+                self.task_queues[name].put({"command": "reset", "token": token})
+                waiting[name] = process
+            else:
+                self.log_queue.put(f"[Launcher]: Pooled musician '{name}' exited (code {process.exitcode}); it will be respawned.")
+                del self.processes[name]
+                _release_abandoned_read_lock(self.task_queues[name])
+        deadline = started + timeout
+        while waiting:
+            try:
+                ack = self.control_queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if ack.get("token") != token or ack.get("musician") not in waiting:
+                continue  # late answer to an earlier check
+            process = waiting.pop(ack["musician"])
+            if not ack.get("healthy"):
+                self._discard(ack["musician"], process, "reported its task runner as stopped")
+        for name, process in waiting.items():
+            self._discard(name, process, f"did not answer the health check within {timeout:g}s")
+        if self.processes:
+            self.log_queue.put(f"[Launcher]: Reusing {len(self.processes)} pooled musicians "
+                               f"({', '.join(self.processes)}), reset in {(time.monotonic() - started) * 1000:.0f}ms.")
+
+    def _discard(self, name, process, reason):
+        self.log_queue.put(f"[Launcher ERROR]: Pooled musician '{name}' {reason}; terminating it.")
+        process.terminate()
+        process.join(timeout=1)
+        self.processes.pop(name, None)
+
+    def ensure(self, name):
+        """Starts the musician for role name unless it is already running. Returns True if it is running."""
+        with self._lock:
+            if not self._accepting or name in self._unavailable:
+                return False
+            process = self.processes.get(name)
+            if process is not None and process.is_alive():
+                return True
+            if process is not None:
+                self.log_queue.put(f"[Launcher]: Musician '{name}' exited (code {process.exitcode}); relaunching it.")
+                del self.processes[name]
+                _release_abandoned_read_lock(self.task_queues.get(name))
+            if name not in self.task_queues:
+                self.log_queue.put(f"[Launcher ERROR]: No task queue for musician '{name}'.")
+                return False
+            try:
+                musician_class = get_musician_class(name)
+            except (KeyError, ImportError) as e:
+                self.log_queue.put(f"[Launcher ERROR]: Cannot launch musician '{name}': {e}")
+                self._unavailable.add(name)
+                # Lets the Conductor fail the tasks it queued for this role, and every later one.
+                self.notify_queue.put({"type": "musician_unavailable", "musician": name, "error": str(e)})
+                return False
+            process = musician_class(name, self.task_queues[name], self.log_queue, self.reporting_queue, self.control_queue)
+            process.start()
+            self.processes[name] = process
+            self.log_queue.put(f"[Launcher]: Launched '{name}' musician process (pid {process.pid}).")
+            return True
+
+    def end_performance(self):
+        """
+        Called once the Conductor has exited. A persistent pool keeps its processes
+        and only has them cancel leftover tasks; otherwise every musician is stopped.
+        Returns the roles terminated forcefully.
+        """
+        if not self.persistent:
+            return self.stop_all()
+        with self._lock:
+            self._accepting = False
+            for name, process in self.processes.items():
+                if process.is_alive():
+                    self.task_queues[name].put({"command": "reset"})
+        return []
+
+    def stop_all(self, timeout=5):
+        """Sends STOP to every launched musician, then joins or terminates it. Returns the roles terminated forcefully."""
+        with self._lock:
+            self._accepting = False
+            processes, self.processes = self.processes, {}
+        for name, process in processes.items():
+            try:
+                self.task_queues[name].put('STOP')
+            except Exception as e:
+                self.log_queue.put(f"[Launcher ERROR]: Could not send STOP to '{name}': {e}")
+        terminated = []
+        for name, process in processes.items():
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+                terminated.append(name)
+        return terminated
+
+    def close(self):
+        """Stops all musicians and the spawn-request listener."""
+        terminated = self.stop_all()
+        if self._listener is not None:
+            self.spawn_queue.put(None)
+            self._listener.join(timeout=1)
+            self._listener = None
+        return terminated
+
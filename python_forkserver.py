@@ -0,0 +1,205 @@
+# C:\syncphony\python_forkserver.py
+# Warm Python interpreter server for ShellExecutorMusician (POSIX only).
+#
+# The server imports a configurable set of modules once, then forks a fresh
+# child for every `python script.py ...`, `python -m mod ...`,
+# `python -c code ...` or `python --version` request, so repeated Python
+# commands skip interpreter startup and the preloaded imports.
+#
+# Protocol, over a Unix stream socket, one request per connection:
+#   client -> server: one JSON line {"argv": [...], "cwd": ..., "env": {...}}
+#                     sent with the write ends of its stdout/stderr pipes (SCM_RIGHTS)
+#   server -> client: {"pid": <child pid>}\n ... {"returncode": <exit code>}\n
+#                     or {"error": "..."}\n if the request was rejected
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import traceback
+
+MAX_REQUEST_BYTES = 4 * 1024 * 1024
+
+def is_warm_argv(argv):
+    """True if argv (the arguments after the interpreter) can be served by a forked child."""
+    if not argv:
+        return False
+    if argv[0] in ("-V", "--version"):
+        return len(argv) == 1
+    if argv[0] in ("-m", "-c"):
+        return len(argv) >= 2
+    return not argv[0].startswith("-")
+
+def _run_child(argv, cwd, env, stdout_fd, stderr_fd):
+    """Runs in the forked child. Never returns."""
+    code = 0
+    try:
+        os.setsid()
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        for fd in (devnull, stdout_fd, stderr_fd):
+            os.close(fd)
+        if cwd:
+            os.chdir(cwd)
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+
+        if argv[0] in ("-V", "--version"):
+            print(f"Python {platform.python_version()}")
+        elif argv[0] == "-m":
+            sys.argv = argv[1:]
+            sys.path[0] = os.getcwd()
+            runpy.run_module(argv[1], run_name="__main__", alter_sys=True)
+        elif argv[0] == "-c":
+            sys.argv = ["-c"] + argv[2:]
+            sys.path[0] = ""
+            exec(compile(argv[1], "<string>", "exec"), {"__name__": "__main__", "__builtins__": __builtins__})
+        else:
+            sys.argv = argv
+            sys.path[0] = os.path.dirname(os.path.abspath(argv[0]))
+            runpy.run_path(argv[0], run_name="__main__")
+    except SystemExit as e:
+        # Same exit-code rules as the interpreter itself.
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+class PythonForkServer:
+    def __init__(self, socket_path, preload=()):
+        self.socket_path = socket_path
+        self.preload = [m for m in preload if m]
+        self._children = {}  # pid -> client connection waiting for the exit code
+        self._wake_fds = ()
+
+    def _preload_modules(self):
+        for module_name in self.preload:
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                print(f"[ForkServer]: Failed to preload '{module_name}': {e}", file=sys.stderr, flush=True)
+
+    def _send(self, conn, message):
+        try:
+            conn.sendall(json.dumps(message).encode('utf-8') + b"\n")
+        except OSError:
+            pass
+
+    def _handle_request(self, conn):
+        fds = []
+        try:
+            data, fds, _flags, _addr = socket.recv_fds(conn, MAX_REQUEST_BYTES, 2)
+            while not data.endswith(b"\n"):
+                more = conn.recv(MAX_REQUEST_BYTES)
+                if not more:
+                    break
+                data += more
+            request = json.loads(data)
+            argv = request["argv"]
+            if len(fds) != 2 or not is_warm_argv(argv):
+                raise ValueError("Request needs a supported argv and exactly two file descriptors.")
+        except Exception as e:
+            self._send(conn, {"error": str(e)})
+            conn.close()
+            for fd in fds:
+                os.close(fd)
+            return
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            self._listener.close()
+            for fd in self._wake_fds:
+                os.close(fd)
+            for child_conn in self._children.values():
+                child_conn.close()
+            _run_child(argv, request.get("cwd"), request.get("env"), fds[0], fds[1])
+        for fd in fds:
+            os.close(fd)
+        self._children[pid] = conn
+        self._send(conn, {"pid": pid})
+
+    def _reap_children(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            conn = self._children.pop(pid, None)
+            if conn is not None:
+                self._send(conn, {"returncode": os.waitstatus_to_exitcode(status)})
+                conn.close()
+
+    def serve_forever(self):
+        self._preload_modules()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen(64)
+
+        # SIGCHLD wakes the selector through a self-pipe so exits are reported immediately.
+        wake_r, wake_w = os.pipe()
+        self._wake_fds = (wake_r, wake_w)
+        os.set_blocking(wake_w, False)
+        signal.set_wakeup_fd(wake_w)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        selector = selectors.DefaultSelector()
+        selector.register(self._listener, selectors.EVENT_READ, "accept")
+        selector.register(wake_r, selectors.EVENT_READ, "wake")
+        print("READY", flush=True)
+        try:
+            while True:
+                for key, _ in selector.select(timeout=1.0):
+                    if key.data == "accept":
+                        conn, _ = self._listener.accept()
+                        conn.setblocking(True)
+                        self._handle_request(conn)
+                    else:
+                        os.read(wake_r, 4096)
+                self._reap_children()
+        finally:
+            self._listener.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm Python fork server for ShellExecutorMusician.")
+    parser.add_argument("--socket", required=True, help="Unix socket path to listen on.")
+    parser.add_argument("--preload", default="", help="Comma-separated modules to import before forking.")
+    args = parser.parse_args()
+    try:
+        PythonForkServer(args.socket, args.preload.split(",")).serve_forever()
+    except KeyboardInterrupt:
+        pass
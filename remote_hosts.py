@@ -0,0 +1,247 @@
+# C:\syncphony\remote_hosts.py
+# Remote musician hosts. A musician host daemon (musician_host.py) runs
+# musician processes on another machine, or another terminal, and connects
+# to the Conductor over TCP. The Conductor's RemoteMusicianHub accepts those
+# connections and dispatches tasks to them next to the local musicians.
+#
+# Protocol: one JSON object per line, in both directions.
+#   host -> conductor: {"type": "register", "host_id", "token", "musicians": {role: capacity}, ...}
+#                      {"type": "report", "report": {...}}      task reports and metrics rollups
+#                      {"type": "log", "message": "..."}
+#                      {"type": "telemetry", "events": [...]}   forwarded telemetry batches
+#                      {"type": "heartbeat", "in_flight": n}
+#   conductor -> host: {"type": "registered", "ok": bool, "error": ...}
+#                      {"type": "task", "task": {...}}
+#                      {"type": "cancel", "task_id": ...}
+#
+# Hosts receive shell tasks with their parameters, so a hub listening on
+# anything but a loopback address requires SYNCPHONY_REMOTE_TOKEN.
+
+import asyncio
+import collections
+import hmac
+import ipaddress
+import json
+import os
+import time
+
+from musician_registry import canonical_name
+
+REMOTE_LISTEN = os.environ.get('SYNCPHONY_REMOTE_LISTEN', "")          # "host:port"; empty disables the hub
+REMOTE_TOKEN = os.environ.get('SYNCPHONY_REMOTE_TOKEN', "")            # shared secret hosts must present, if set
+REMOTE_WAIT_SECONDS = float(os.environ.get('SYNCPHONY_REMOTE_WAIT', 30))  # how long a task may wait for a host offering its role
+LOCAL_SLOTS = int(os.environ.get('SYNCPHONY_LOCAL_SLOTS', 1))          # tasks in flight per local musician while hosts are connected
+HOST_HEARTBEAT_SECONDS = 2
+HOST_TIMEOUT_SECONDS = 10
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+def parse_address(address, default_host="127.0.0.1"):
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
+
+async def send_message(writer, message):
+    writer.write(json.dumps(message).encode('utf-8') + b"\n")
+    await writer.drain()
+
+async def read_message(reader):
+    """Returns the next message, or None when the peer closed the connection. Raises ValueError for anything but a JSON object."""
+    line = await reader.readline()
+    if not line:
+        return None
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("message is not a JSON object")
+    return message
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # a host name that may resolve anywhere
+
+
+class RemoteHost:
+    """The Conductor's view of one connected musician host."""
+    def __init__(self, host_id, musicians, writer):
+        self.host_id = host_id
+        self.capacity = {canonical_name(role): max(1, int(slots)) for role, slots in musicians.items()}
+        self.writer = writer
+        self.in_flight = {}  # task_id -> role
+        self.last_seen = time.monotonic()
+
+    def load(self, role):
+        running = sum(1 for r in self.in_flight.values() if r == role)
+        return running, self.capacity[role]
+
+
+class RemoteMusicianHub:
+    """
+    Accepts musician host connections in the Conductor process. Reports,
+    logs and telemetry from the hosts are fed into the same paths the local
+    musicians use: reports land in self.reports, which the Conductor drains
+    together with its reporting queue.
+    """
+    def __init__(self, log, log_queue, listen=REMOTE_LISTEN, token=REMOTE_TOKEN):
+        self.log = log
+        self.log_queue = log_queue
+        self.listen = listen
+        self.token = token
+        self.hosts = {}
+        self.reports = collections.deque()
+        self._server = None
+        self._reaper = None
+        self._task_hosts = {}  # task_id -> RemoteHost
+        self._connections = set()
+        self._telemetry_flusher = None
+
+    async def start(self):
+        """Starts listening. Raises ValueError for a non-loopback address without a token."""
+        host, port = parse_address(self.listen)
+        if not self.token and not is_loopback(host):
+            raise ValueError("listening beyond loopback needs SYNCPHONY_REMOTE_TOKEN")
+        self._server = await asyncio.start_server(self._handle_host, host, port, limit=MAX_MESSAGE_BYTES)
+        self._reaper = asyncio.create_task(self._reap_silent_hosts())
+        self.log(f"Accepting musician hosts on {host}:{port}.")
+
+    async def stop(self):
+        if self._reaper:
+            self._reaper.cancel()
+        if self._server:
+            self._server.close()
+        for host in list(self.hosts.values()):
+            host.writer.close()
+        if self._connections:
+            # Closing the writers ends every connection handler; let them finish before the loop does.
+            await asyncio.wait(self._connections, timeout=HOST_HEARTBEAT_SECONDS)
+        if self._server:
+            await self._server.wait_closed()
+        if self._telemetry_flusher:
+            self._telemetry_flusher.cancel()
+            from telemetry import _flush_telemetry_buffer
+            await _flush_telemetry_buffer(None, "Conductor")
+
+    def offers(self, role):
+        role = canonical_name(role)
+        return any(role in host.capacity for host in self.hosts.values())
+
+    def pick_host(self, role, require_free_slot=True):
+        """The least loaded host offering role, or None. With require_free_slot, only hosts below capacity count."""
+        role = canonical_name(role)
+        best, best_ratio = None, None
+        for host in self.hosts.values():
+            if role not in host.capacity:
+                continue
+            running, capacity = host.load(role)
+            if require_free_slot and running >= capacity:
+                continue
+            ratio = running / capacity
+            if best is None or ratio < best_ratio:
+                best, best_ratio = host, ratio
+        return best
+
+    async def dispatch(self, host, task):
+        host.in_flight[task["task_id"]] = canonical_name(task["musician"])
+        self._task_hosts[task["task_id"]] = host
+        try:
+            await send_message(host.writer, {"type": "task", "task": task})
+        except (ConnectionError, OSError) as e:
+            self._drop_host(host, f"send failed: {e}")
+
+    def is_remote(self, task_id):
+        return task_id in self._task_hosts
+
+    async def cancel(self, task_id):
+        host = self._task_hosts.get(task_id)
+        if host is None:
+            return
+        try:
+            await send_message(host.writer, {"type": "cancel", "task_id": task_id})
+        except (ConnectionError, OSError) as e:
+            self._drop_host(host, f"send failed: {e}")
+
+    def _task_finished(self, task_id):
+        host = self._task_hosts.pop(task_id, None)
+        if host is not None:
+            host.in_flight.pop(task_id, None)
+
+    def _drop_host(self, host, reason):
+        if self.hosts.get(host.host_id) is not host:
+            return
+        del self.hosts[host.host_id]
+        host.writer.close()
+        if not host.in_flight:
+            self.log(f"Musician host '{host.host_id}' disconnected ({reason}).")
+            return
+        self.log(f"Musician host '{host.host_id}' lost ({reason}); failing its {len(host.in_flight)} tasks.", "warning")
+        for task_id in list(host.in_flight):
+            self._task_finished(task_id)
+            self.reports.append({"task_id": task_id, "status": "failed",
+                                 "error": f"Musician host '{host.host_id}' lost: {reason}"})
+
+    async def _reap_silent_hosts(self):
+        while True:
+            await asyncio.sleep(HOST_HEARTBEAT_SECONDS)
+            now = time.monotonic()
+            for host in list(self.hosts.values()):
+                if now - host.last_seen > HOST_TIMEOUT_SECONDS:
+                    self._drop_host(host, f"no heartbeat for {HOST_TIMEOUT_SECONDS}s")
+
+    async def _forward_telemetry(self, events):
+        # Imported here: the Conductor only needs telemetry once a host forwards some.
+        from telemetry import enqueue_events, _telemetry_flusher_task
+        if self._telemetry_flusher is None:
+            self._telemetry_flusher = asyncio.create_task(_telemetry_flusher_task())
+        await enqueue_events(events)
+
+    async def _handle_host(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        host = None
+        self._connections.add(asyncio.current_task())
+        try:
+            message = await read_message(reader)
+            if not message or message.get("type") != "register":
+                return
+            if self.token and not hmac.compare_digest(str(message.get("token") or "").encode('utf-8'),
+                                                      self.token.encode('utf-8')):
+                await send_message(writer, {"type": "registered", "ok": False, "error": "invalid token"})
+                self.log(f"Rejected musician host from {peer}: invalid token.", "warning")
+                return
+            host = RemoteHost(message.get("host_id") or f"{peer[0]}:{peer[1]}", message.get("musicians", {}), writer)
+            if host.host_id in self.hosts:
+                self._drop_host(self.hosts[host.host_id], "replaced by a new connection")
+            self.hosts[host.host_id] = host
+            await send_message(writer, {"type": "registered", "ok": True})
+            offered = ", ".join(f"{role} x{slots}" for role, slots in host.capacity.items())
+            self.log(f"Musician host '{host.host_id}' registered from {peer[0]}: {offered}.")
+
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                host.last_seen = time.monotonic()
+                kind = message.get("type")
+                if kind == "report":
+                    report = message.get("report")
+                    if not isinstance(report, dict):
+                        continue
+                    if "task_id" in report and report["task_id"] not in host.in_flight:
+                        # Only the host running a task may report on it.
+                        self.log(f"Ignored report from '{host.host_id}' for task '{report['task_id']}' it does not run.", "warning")
+                        continue
+                    if report.get("status") in ("completed", "failed"):
+                        self._task_finished(report.get("task_id"))
+                    self.reports.append(report)
+                elif kind == "log":
+                    self.log_queue.put(f"[{host.host_id}] {message.get('message')}")
+                elif kind == "telemetry":
+                    await self._forward_telemetry(message.get("events", []))
+        except (ConnectionError, OSError, json.JSONDecodeError, asyncio.IncompleteReadError, ValueError) as e:
+            if host is not None:
+                self._drop_host(host, str(e))
+        finally:
+            if host is not None:
+                self._drop_host(host, "connection closed")
+            writer.close()
+            self._connections.discard(asyncio.current_task())
@@ -0,0 +1,214 @@
+# C:\syncphony\shm_transport.py
+# Shared-memory transport for large task payloads. Before a task is put on a
+# musician's queue, every parameter string above a size threshold (and any
+# top-level parameter container whose pickle is still that large) is copied
+# once into a multiprocessing.shared_memory segment and replaced by a small
+# {"shm", "size", "kind", "preview"} descriptor, so only the descriptor is
+# pickled through the queue's pipe.
+#
+# The sender owns the segments: SharedPayloadTracker unlinks them when the
+# task's outcome is reported or the performance ends. The musician attaches
+# for the duration of the task only. Actions listed in a musician's
+# ZERO_COPY_ACTIONS receive SharedBuffer objects (read-only memoryviews
+# into the segment) instead of decoded strings.
+
+import contextlib
+import os
+import pickle
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+SHM_TRANSPORT_ENABLED = os.environ.get('SYNCPHONY_SHM_TRANSPORT', "1") == "1"
+SHM_THRESHOLD_BYTES = int(os.environ.get('SYNCPHONY_SHM_THRESHOLD', 64 * 1024))
+SHM_PREVIEW_CHARS = 120
+
+class SharedBuffer:
+    """Read-only view of one payload in shared memory. Only valid while its task runs."""
+    def __init__(self, view, kind):
+        self.view = view
+        self.kind = kind
+
+    def __len__(self):
+        return len(self.view)
+
+    def text(self):
+        """Decodes the payload; this is the one copy zero-copy consumers avoid."""
+        return str(self.view, 'utf-8')
+
+    def __str__(self):
+        return self.text()
+
+def as_bytes(value):
+    """A bytes-like object for a str, bytes or SharedBuffer value; SharedBuffers are not copied."""
+    if isinstance(value, SharedBuffer):
+        return value.view
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    return value
+
+def is_descriptor(value):
+    return isinstance(value, dict) and set(value) == {"shm", "size", "kind", "preview"}
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching also registers the segment with this process's resource
+    # tracker, which would unlink it when the musician exits although the sender owns it.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedPayloadTracker:
+    """
+    Packs large task payloads into shared memory on the sending side and keeps
+    each segment alive until release(task_id). Windows frees a segment as soon
+    as its last handle closes, so the sender's handle must outlive the task.
+    """
+    def __init__(self, threshold_bytes=SHM_THRESHOLD_BYTES, enabled=SHM_TRANSPORT_ENABLED):
+        self.threshold_bytes = threshold_bytes
+        self.enabled = enabled
+        self._segments = {}  # task_id -> [SharedMemory]
+        self.bytes_shared = 0
+
+    def _put(self, task_id, data, kind, preview):
+        segment = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        segment.buf[:len(data)] = data
+        self._segments.setdefault(task_id, []).append(segment)
+        self.bytes_shared += len(data)
+        return {"shm": segment.name, "size": len(data), "kind": kind, "preview": preview}
+
+    def _pack_value(self, task_id, value):
+        if isinstance(value, str):
+            # len() is a lower bound on the UTF-8 size, so only encode near the threshold.
+            if len(value) * 4 <= self.threshold_bytes:
+                return value
+            data = value.encode('utf-8')
+            if len(data) <= self.threshold_bytes:
+                return value
+            return self._put(task_id, data, "text", value[:SHM_PREVIEW_CHARS])
+        if isinstance(value, (bytes, bytearray)):
+            if len(value) <= self.threshold_bytes:
+                return value
+            return self._put(task_id, value, "bytes", "")
+        if isinstance(value, dict):
+            copied = None
+            for key, item in value.items():
+                replacement = self._pack_value(task_id, item)
+                if replacement is not item:
+                    if copied is None:
+                        copied = dict(value)
+                    copied[key] = replacement
+            return value if copied is None else copied
+        if isinstance(value, list):
+            copied = None
+            for i, item in enumerate(value):
+                replacement = self._pack_value(task_id, item)
+                if replacement is not item:
+                    if copied is None:
+                        copied = list(value)
+                    copied[i] = replacement
+            return value if copied is None else copied
+        return value
+
+    def pack(self, task):
+        """
+        Returns the task with large parameter payloads moved to shared memory.
+        The task itself is returned when nothing was large enough; otherwise
+        only the dicts along the replaced paths are copied.
+        """
+        details = task.get("details") or {}
+        parameters = details.get("parameters")
+        if not self.enabled or not isinstance(parameters, dict):
+            return task
+        task_id = task.get("task_id")
+        packed = self._pack_value(task_id, parameters)
+        for key, value in packed.items():
+            # Containers of many small strings (write_files, whole symphonies) go over as one pickled segment.
+            if not isinstance(value, (dict, list)) or is_descriptor(value):
+                continue
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(data) > self.threshold_bytes:
+                if packed is parameters:
+                    packed = dict(parameters)
+                packed[key] = self._put(task_id, data, "pickle", "")
+        if packed is parameters:
+            return task
+        return dict(task, details=dict(details, parameters=packed))
+
+    def segment_count(self, task_id=None):
+        if task_id is not None:
+            return len(self._segments.get(task_id, ()))
+        return sum(len(segments) for segments in self._segments.values())
+
+    def release(self, task_id):
+        """Closes and unlinks every segment created for task_id."""
+        for segment in self._segments.pop(task_id, ()):
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+    def release_all(self):
+        for task_id in list(self._segments):
+            self.release(task_id)
+
+
+@contextlib.contextmanager
+def attach_payloads(parameters, zero_copy=False):
+    """
+    Yields parameters with every descriptor replaced by its payload: a
+    SharedBuffer when zero_copy is set and the payload is text or bytes,
+    otherwise a str, bytes or the unpickled container. Segments are closed
+    on exit, so SharedBuffers must not be kept beyond the task.
+    """
+    opened = []
+
+    def resolve(value):
+        if is_descriptor(value):
+            segment = _attach(value["shm"])
+            window = segment.buf[:value["size"]]
+            view = window.toreadonly()
+            opened.append((segment, window, view))
+            if value["kind"] == "pickle":
+                # Unpickles straight from the segment; nested descriptors are resolved too.
+                return resolve(pickle.loads(view))
+            if zero_copy:
+                return SharedBuffer(view, value["kind"])
+            return str(view, 'utf-8') if value["kind"] == "text" else bytes(view)
+        if isinstance(value, dict):
+            copied = None
+            for key, item in value.items():
+                replacement = resolve(item)
+                if replacement is not item:
+                    if copied is None:
+                        copied = dict(value)
+                    copied[key] = replacement
+            return value if copied is None else copied
+        if isinstance(value, list):
+            copied = None
+            for i, item in enumerate(value):
+                replacement = resolve(item)
+                if replacement is not item:
+                    if copied is None:
+                        copied = list(value)
+                    copied[i] = replacement
+            return value if copied is None else copied
+        return value
+
+    try:
+        yield resolve(parameters)
+    finally:
+        for segment, window, view in opened:
+            try:
+                view.release()
+                window.release()
+                segment.close()
+            except BufferError:
+                # Something (e.g. a timed-out executor thread) still holds the view;
+                # the mapping is freed when that reference goes away.
+                pass
@@ -0,0 +1,193 @@
+# C:\syncphony\startup_bench.py
+# Import-time and startup budget for Syncphony processes.
+#
+#   python startup_bench.py
+#       Prints the `-X importtime` breakdown of every process entry module and
+#       the time from Process.start() to the first completed task per musician.
+#
+#   python startup_bench.py --save-baseline
+#       Stores the medians in startup_baseline.json.
+#
+#   python startup_bench.py --check
+#       Exits with status 1 when a measurement exceeds its baseline by more than
+#       --tolerance (relative) plus --slack-ms. Baselines are machine specific:
+#       re-save them when moving to a different machine or Python version.
+
+import argparse
+import http.server
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BENCH_DIR)
+from musician_registry import MUSICIAN_REGISTRY, get_musician_class
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "startup_baseline.json")
+ENTRY_MODULES = ["telemetry", "musician", "ai_oracle_musician", "leap_toolkit", "conductor"]
+BREAKDOWN_TOP = 6
+FIRST_TASK_TIMEOUT_SECONDS = 60
+
+def measure_import(module_name):
+    """Imports module_name in a fresh interpreter; returns (total_ms, [(child, cumulative_ms), ...])."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                               cwd=BENCH_DIR, capture_output=True, text=True, check=True)
+    total_ms = None
+    children = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line[12:]:
+            continue
+        _self_us, cumulative_us, name = line[12:].split("|", 2)
+        if not cumulative_us.strip().isdigit():
+            continue  # header line
+        cumulative_ms = int(cumulative_us) / 1000
+        if name.strip() == module_name and not name.startswith("  "):
+            total_ms = cumulative_ms
+        elif name.startswith("   ") and not name.startswith("    "):
+            # One level below the top: the direct imports of whatever module is about to finish.
+            children.append((name.strip(), cumulative_ms))
+    return total_ms, children
+
+def bench_imports(rounds):
+    results = {}
+    for module_name in ENTRY_MODULES:
+        totals = []
+        breakdown = {}
+        for _ in range(rounds):
+            total_ms, children = measure_import(module_name)
+            totals.append(total_ms)
+            for child, cumulative_ms in children:
+                breakdown.setdefault(child, []).append(cumulative_ms)
+        results[module_name] = statistics.median(totals)
+        print(f"{module_name:<22}{results[module_name]:>10.1f} ms")
+        top = sorted(breakdown.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:BREAKDOWN_TOP]
+        for child, samples in top:
+            print(f"    {child:<30}{statistics.median(samples):>10.1f} ms")
+    return results
+
+class _JsonHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def first_tasks(web_url):
+    """One cheap, side-effect free task per musician role."""
+    return {
+        "FileSystemMusician": {"action": "read_file", "parameters": {"file_path": os.path.abspath(__file__), "mode": "hash"}},
+        "ShellExecutorMusician": {"action": "run_command", "parameters": {"command": f'"{sys.executable}" --version'}},
+        "WebMusician": {"action": "get_json", "parameters": {"url": web_url}},
+        "AIOracleMusician": {"action": "capability_assessment", "parameters": {"requirements": "startup bench", "refresh": True}},
+    }
+
+def time_first_task(name, details):
+    """Milliseconds from Process.start() until the musician reports its first task."""
+    task_queue, log_queue, reporting_queue = multiprocessing.Queue(), multiprocessing.Queue(), multiprocessing.Queue()
+    process = get_musician_class(name)(name, task_queue, log_queue, reporting_queue)
+    task_queue.put({"task_id": "startup_bench", "musician": name, "details": details})
+    started = time.perf_counter()
+    process.start()
+    try:
+        deadline = started + FIRST_TASK_TIMEOUT_SECONDS
+        while True:
+            report = reporting_queue.get(timeout=max(deadline - time.perf_counter(), 0))
+            if report.get("task_id") == "startup_bench":
+                break
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if report["status"] != "completed":
+            raise RuntimeError(f"{name} first task failed: {report.get('error')}")
+        return elapsed_ms
+    finally:
+        task_queue.put('STOP')
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+
+def bench_first_task(rounds):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _JsonHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = {}
+    try:
+        tasks = first_tasks(f"http://127.0.0.1:{server.server_address[1]}/bench.json")
+        for name in MUSICIAN_REGISTRY:
+            if name not in tasks:
+                continue
+            try:
+                samples = [time_first_task(name, tasks[name]) for _ in range(rounds)]
+            except (RuntimeError, queue.Empty) as e:
+                print(f"{name:<22}{'failed':>10}  {e or 'no report'}")
+                continue
+            results[name] = statistics.median(samples)
+            print(f"{name:<22}{results[name]:>10.1f} ms")
+    finally:
+        server.shutdown()
+    return results
+
+def check_against_baseline(measured, baseline, tolerance, slack_ms):
+    """Returns a list of "section/name" strings that exceeded their budget."""
+    regressions = []
+    for section, values in measured.items():
+        for name, value in values.items():
+            budget = baseline.get(section, {}).get(name)
+            if budget is None:
+                continue
+            limit = budget * (1 + tolerance) + slack_ms
+            if value > limit:
+                regressions.append(f"{section}/{name}: {value:.1f} ms > {limit:.1f} ms (baseline {budget:.1f} ms)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time and startup budget for Syncphony processes.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--start-method", default="spawn", choices=multiprocessing.get_all_start_methods(),
+                        help="spawn matches Windows, where every musician re-imports its modules.")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--slack-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    # Keep the bench free of simulated Oracle thinking time and of the shared memo cache.
+    os.environ['SYNCPHONY_ORACLE_LATENCY_SCALE'] = "0"
+    os.environ['SYNCPHONY_ORACLE_MEMO_DIR'] = tempfile.mkdtemp(prefix="startup_bench_oracle-")
+
+    print(f"Import time (median of {args.rounds}, cumulative; largest direct imports below)")
+    measured = {"imports_ms": bench_imports(args.rounds)}
+    # MusicianProcess subclasses multiprocessing.Process, so the start method has to be set globally.
+    multiprocessing.set_start_method(args.start_method, force=True)
+    print(f"\nTime to first task ({args.start_method} start method, median of {args.rounds})")
+    measured["first_task_ms"] = bench_first_task(args.rounds)
+
+    if args.save_baseline:
+        measured = {section: {name: round(value, 1) for name, value in values.items()} for section, values in measured.items()}
+        baseline = dict(measured, python=platform.python_version(), platform=platform.platform(),
+                        start_method=args.start_method)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+    if args.check:
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = check_against_baseline(measured, baseline, args.tolerance, args.slack_ms)
+        if regressions:
+            print("\nStartup budget exceeded:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nWithin the startup budget.")
@@ -0,0 +1,86 @@
+# C:\syncphony\syncphony.py
+# Headless command line entry point.
+#
+#   python -m syncphony serve [--listen 127.0.0.1:7080] [--ws-port 8765] [--musician ShellExecutorMusician=8]
+#       Runs the Conductor service: symphonies submitted over the socket or the
+#       WebSocket start_symphony command run concurrently on shared musician pools.
+#
+#   python -m syncphony run SYMPHONY [SYMPHONY ...]
+#       Runs symphonies concurrently without a service and exits 1 if any failed.
+#
+#   python -m syncphony submit SYMPHONY [--no-wait]
+#   python -m syncphony status
+#       Talk to a running service.
+#
+# Mission Control (mission_control.py) remains the GUI for single performances.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from conductor_service import (MAX_CONCURRENT_PERFORMANCES, SERVICE_LISTEN, query_service, run_symphonies,
+                               serve_forever, submit_to_service)
+from musician_registry import parse_musicians
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="syncphony", description="Headless Syncphony Conductor.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the Conductor service.")
+    serve.add_argument("--listen", default=SERVICE_LISTEN, help="HOST:PORT for symphony submissions (SYNCPHONY_SERVICE_LISTEN).")
+    serve.add_argument("--ws-port", type=int, default=None, help="Also accept start_symphony over WebSocket on this port (needs SYNCPHONY_WS_TOKEN).")
+    serve.add_argument("--max-performances", type=int, default=MAX_CONCURRENT_PERFORMANCES)
+
+    run = commands.add_parser("run", help="Run symphonies without a service.")
+    run.add_argument("symphonies", nargs="+")
+
+    submit = commands.add_parser("submit", help="Send a symphony to a running service.")
+    submit.add_argument("symphony")
+    submit.add_argument("--no-wait", action="store_true", help="Return once the service has accepted the symphony.")
+
+    status = commands.add_parser("status", help="Show a running service's performances and pool.")
+
+    for command in (serve, run):
+        command.add_argument("--musician", action="append", default=[], metavar="ROLE[=SLOTS]",
+                             help="Musician processes to pool for a role; repeatable (default SYNCPHONY_SERVICE_SLOTS each).")
+    for command in (run, submit):
+        command.add_argument("--max-concurrency", type=int, default=None, help="Tasks one symphony may run at once.")
+    for command in (submit, status):
+        command.add_argument("--connect", default=SERVICE_LISTEN, help="HOST:PORT of the service.")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        asyncio.run(serve_forever(args.listen, args.ws_port, parse_musicians(args.musician), args.max_performances))
+        return 0
+    if args.command == "run":
+        summaries = asyncio.run(run_symphonies(args.symphonies, parse_musicians(args.musician), args.max_concurrency))
+        for summary in summaries:
+            print(json.dumps(summary))
+        return 0 if all(summary["status"] == "completed" for summary in summaries) else 1
+    if args.command == "submit":
+        answer = asyncio.run(submit_to_service(args.symphony, args.connect, args.max_concurrency, not args.no_wait))
+        print(json.dumps(answer))
+        if not answer or answer.get("type") == "error":
+            return 1
+        return 0 if args.no_wait or answer.get("status") == "completed" else 1
+    print(json.dumps(asyncio.run(query_service(args.connect)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    # SIGTERM shuts down like Ctrl+C so pooled musicians are stopped, not orphaned;
+    # spawned (not forked) musicians do not inherit this handler.
+    signal.signal(signal.SIGTERM, _interrupt)
+    multiprocessing.set_start_method("spawn")
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -2,6 +2,8 @@
 # Key Changes:
 # - SCHEMA_ROOT_DIR now defaults to a relative path, making the application
 #   more portable and less dependent on a specific C:\ drive structure.
+# - Importing this module has no side effects: logging is configured, schemas are
+#   read and jsonschema/aiohttp are imported the first time they are needed.
 
 import asyncio
 import collections
@@ -10,47 +12,104 @@ import json
 import time
 import os
 import random
+import re
 from datetime import datetime
 from functools import wraps
-from jsonschema import validate, ValidationError, RefResolver
 import traceback
 import sys
-import aiohttp
+import zlib
 import logging
 import logging.handlers
 import queue
 import threading
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from telemetry_metrics import MetricsRollup
+from blob_store import get_default_blob_store
 
 # --- Configuration ---
 TELEMETRY_BUFFER_SIZE = 100
 TELEMETRY_FLUSH_INTERVAL_SECONDS = 5
-TELEMETRY_API_ENDPOINT = "http://localhost:8080/telemetry_events"
+# The flusher also wakes once the buffered payloads reach this many bytes.
+TELEMETRY_FLUSH_MAX_BYTES = 1024 * 1024
+TELEMETRY_API_ENDPOINT = os.environ.get('SYNCPHONY_TELEMETRY_ENDPOINT', "http://localhost:8080/telemetry_events")
 HASH_ALGORITHM = "SHA256"
 
+# Wire format for flushed batches: "ndjson" streams one event per line,
+# "json" posts the legacy single JSON array.
+TELEMETRY_WIRE_FORMAT = os.environ.get('TELEMETRY_WIRE_FORMAT', "ndjson")
+# Content-Encoding for ndjson uploads: "gzip", "deflate" or "identity".
+TELEMETRY_CONTENT_ENCODING = os.environ.get('TELEMETRY_CONTENT_ENCODING', "gzip")
+TELEMETRY_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Key names containing any of these (case-insensitive) have their values masked.
+TELEMETRY_SENSITIVE_KEYS = [
+    k.strip() for k in os.environ.get(
+        'TELEMETRY_SENSITIVE_KEYS', "password,api_key,secret,token,credential,auth"
+    ).split(",") if k.strip()
+]
+
+# Large strings in task args and sub-log content are moved to the local blob
+# store and replaced by {blob, size, preview} references.
+TELEMETRY_EXTERNALIZE_BLOBS = os.environ.get('TELEMETRY_EXTERNALIZE_BLOBS', "1") == "1"
+
+# Lifecycle durations are rolled up into histograms and emitted as one
+# metrics_rollup event per interval. Successful task_start/task_complete
+# events are shipped for this fraction of tasks; task_error is always shipped.
+METRICS_ROLLUP_INTERVAL_SECONDS = 30
+TELEMETRY_LIFECYCLE_SAMPLE_RATE = float(os.environ.get('TELEMETRY_LIFECYCLE_SAMPLE_RATE', "1.0"))
+
 # MODIFIED: Use a relative path for portability
 DEFAULT_SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'syncphony_schemas', 'events')
 SCHEMA_ROOT_DIR = os.environ.get('SCHEMA_ROOT_DIR', DEFAULT_SCHEMA_DIR)
 
 LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "telemetry.log")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='{"timestamp": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}',
-    handlers=[
-        logging.StreamHandler(),
-        logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=10)
-    ]
-)
+# event_type -> schema file, loaded on first validation of that type
+EVENT_SCHEMA_FILES = {
+    "task_start": "task_lifecycle_event.json",
+    "task_progress": "task_lifecycle_event.json",
+    "task_complete": "task_lifecycle_event.json",
+    "task_error": "task_lifecycle_event.json",
+    "gdc_snapshot": "gdc_snapshot_event.json",
+    "sub_log_entry": "sub_log_entry.json",
+    "metrics_rollup": "metrics_rollup_event.json",
+}
+
 logger = logging.getLogger(__name__)
+_logging_configured = False
+
+def _configure_logging():
+    """Sets up console and rotating file logging the first time telemetry is used rather than at import."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    os.makedirs(LOG_DIR, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='{"timestamp": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}',
+        handlers=[
+            logging.StreamHandler(),
+            logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=10)
+        ]
+    )
 
 _telemetry_buffer = collections.deque()
 _buffer_lock = asyncio.Lock()
 _last_flush_time = time.time()
+_buffer_bytes = 0
+_oldest_buffered_time = None
+_flush_wakeup = asyncio.Event()
+_flush_lock = asyncio.Lock()
+_flusher_running = False
 _schemas_cache = {}
 _resolver = None
+_metrics_rollup = MetricsRollup()
+_last_rollup_time = time.time()
+_rollup_sinks = []
+_counters = collections.Counter()  # name -> count since the last rollup, e.g. "http_cache.hit"
+_background_flushes = set()  # keeps start_new_performance flushes referenced until they finish
 
 def _load_schema(schema_filename: str):
     full_path = os.path.join(SCHEMA_ROOT_DIR, schema_filename)
@@ -71,6 +130,7 @@ def _load_schema(schema_filename: str):
 def _get_schema_resolver():
     global _resolver
     if _resolver is None:
+        from jsonschema import RefResolver
         base_uri = "http://syncphony.com/schemas/events/"
         handlers = {
             base_uri: lambda uri: _load_schema(uri.split(base_uri)[1])
@@ -84,94 +144,328 @@ def _get_schema_resolver():
             logger.error(f"Failed to pre-load event_base.json into resolver: {e}")
     return _resolver
 
-try:
-    TASK_LIFECYCLE_EVENT_SCHEMA = _load_schema("task_lifecycle_event.json")
-    GDC_SNAPSHOT_EVENT_SCHEMA = _load_schema("gdc_snapshot_event.json")
-    SUB_LOG_ENTRY_SCHEMA = _load_schema("sub_log_entry.json")
-    _resolver_instance = _get_schema_resolver()
-except Exception as e:
-    logger.error(f"CRITICAL ERROR: Failed to load core schemas: {e}")
-    TASK_LIFECYCLE_EVENT_SCHEMA = {}
-    GDC_SNAPSHOT_EVENT_SCHEMA = {}
-    SUB_LOG_ENTRY_SCHEMA = {}
+def _validate_event(event):
+    """Raises if the event does not match the schema for its type. Event types without a schema always pass."""
+    schema_file = EVENT_SCHEMA_FILES.get(event["event_type"])
+    if schema_file is None:
+        return
+    schema = _load_schema(schema_file)
+    if schema:
+        from jsonschema import validate
+        validate(instance=event, schema=schema, resolver=_get_schema_resolver())
 
 def _generate_event_id():
     return f"event-{os.urandom(8).hex()}-{int(time.time() * 1000)}"
 
-def _calculate_payload_hash(payload):
-    payload_str = json.dumps(payload, sort_keys=True)
+def _calculate_payload_hash(payload, payload_str=None):
+    if payload_str is None:
+        payload_str = json.dumps(payload, sort_keys=True)
     return hashlib.sha256(payload_str.encode('utf-8')).hexdigest()
 
-def _mask_sensitive_data(data, sensitive_keys=["password", "api_key", "secret", "token", "credential", "auth"]):
-    masked = False
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if any(sensitive in key.lower() for sensitive in sensitive_keys):
-                data[key] = "[MASKED]"
-                masked = True
-            elif isinstance(value, (dict, list)):
-                nested_masked = _mask_sensitive_data(value, sensitive_keys)
+def _externalize_large_values(event_type, payload):
+    """
+    Swaps oversized task args and sub-log content for blob references.
+    Only fields whose schema allows it are touched: sub_log_entry content
+    must stay a string, so it keeps the preview and gains a content_blob.
+    """
+    store = get_default_blob_store()
+    if event_type == "sub_log_entry":
+        content = payload.get("content")
+        if isinstance(content, str):
+            ref = store.externalize(content)
+            if ref is not content:
+                payload = dict(payload, content=ref["preview"], content_blob=ref)
+        return payload
+    args = payload.get("args")
+    if isinstance(args, (dict, list)):
+        externalized_args = store.externalize(args)
+        if externalized_args is not args:
+            payload = dict(payload, args=externalized_args)
+    return payload
+
+class SensitiveDataMasker:
+    """
+    Redacts values whose key names look sensitive, copy-on-write.
+
+    The mask decision is cached per key name and a single compiled regex
+    replaces the per-key substring loop. Containers are only copied along
+    the paths that actually get redacted; everything else, including the
+    caller's own dicts, is returned untouched and shared.
+    """
+    _MAX_CACHED_KEYS = 4096
+
+    def __init__(self, sensitive_keys):
+        self.sensitive_keys = tuple(k.lower() for k in sensitive_keys if k)
+        self._pattern = re.compile("|".join(re.escape(k) for k in self.sensitive_keys), re.IGNORECASE) \
+            if self.sensitive_keys else None
+        self._decisions = {}
+
+    def is_sensitive_key(self, key):
+        decision = self._decisions.get(key)
+        if decision is None:
+            decision = bool(self._pattern and self._pattern.search(str(key)))
+            if len(self._decisions) >= self._MAX_CACHED_KEYS:
+                self._decisions.clear()
+            self._decisions[key] = decision
+        return decision
+
+    def mask(self, data):
+        """Returns (masked_data, was_masked). masked_data is data itself when nothing was redacted."""
+        if self._pattern is None:
+            return data, False
+        return self._mask(data)
+
+    def _mask(self, data):
+        if isinstance(data, dict):
+            copied = None
+            for key, value in data.items():
+                if self.is_sensitive_key(key):
+                    replacement = "[MASKED]"
+                elif isinstance(value, (dict, list)):
+                    replacement, nested_masked = self._mask(value)
+                    if not nested_masked:
+                        continue
+                else:
+                    continue
+                if copied is None:
+                    copied = dict(data)
+                copied[key] = replacement
+            return (data, False) if copied is None else (copied, True)
+        if isinstance(data, list):
+            copied = None
+            for i, item in enumerate(data):
+                # Scalars inside lists have no keys, so they can never need masking.
+                if not isinstance(item, (dict, list)):
+                    continue
+                replacement, nested_masked = self._mask(item)
                 if nested_masked:
-                    masked = True
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            nested_masked = _mask_sensitive_data(item, sensitive_keys)
-            if nested_masked:
-                masked = True
-    return masked
-
-async def _flush_telemetry_buffer():
-    global _last_flush_time
-    async with _buffer_lock:
-        if not _telemetry_buffer:
+                    if copied is None:
+                        copied = list(data)
+                    copied[i] = replacement
+            return (data, False) if copied is None else (copied, True)
+        return data, False
+
+_masker = SensitiveDataMasker(TELEMETRY_SENSITIVE_KEYS)
+
+_ZLIB_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+def _iter_ndjson_chunks(events, encoding=TELEMETRY_CONTENT_ENCODING, chunk_bytes=TELEMETRY_STREAM_CHUNK_BYTES):
+    """
+    Yields the events as NDJSON, compressed with the given content encoding,
+    in chunks of roughly chunk_bytes so a large batch never has to be
+    materialized as one big string.
+    """
+    compressor = None
+    if encoding in _ZLIB_WBITS:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, _ZLIB_WBITS[encoding])
+    pending = []
+    pending_size = 0
+    for event in events:
+        line = json.dumps(event, separators=(',', ':')).encode('utf-8') + b"\n"
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= chunk_bytes:
+            raw = b"".join(pending)
+            pending = []
+            pending_size = 0
+            data = compressor.compress(raw) if compressor else raw
+            if data:
+                yield data
+    raw = b"".join(pending)
+    data = (compressor.compress(raw) + compressor.flush()) if compressor else raw
+    if data:
+        yield data
+
+async def _ndjson_body(events, encoding):
+    """Async wrapper so aiohttp sends the NDJSON chunks with chunked transfer encoding."""
+    for chunk in _iter_ndjson_chunks(events, encoding):
+        yield chunk
+        await asyncio.sleep(0)
+
+def _build_flush_request(events):
+    """Returns the session.post() keyword arguments for a batch in the configured wire format."""
+    if TELEMETRY_WIRE_FORMAT != "ndjson":
+        return {"json": events}
+    headers = {"Content-Type": "application/x-ndjson"}
+    if TELEMETRY_CONTENT_ENCODING in _ZLIB_WBITS:
+        headers["Content-Encoding"] = TELEMETRY_CONTENT_ENCODING
+    return {"data": _ndjson_body(events, TELEMETRY_CONTENT_ENCODING), "headers": headers}
+
+async def _flush_telemetry_buffer(session=None, musician_name=None):
+    """
+    Posts everything buffered so far. Serialized by _flush_lock, so at most one
+    flush (and one set of retry sleeps) is in flight per process.
+    """
+    global _last_flush_time, _buffer_bytes, _oldest_buffered_time
+    async with _flush_lock:
+        async with _buffer_lock:
+            if not _telemetry_buffer:
+                return
+            events_to_flush = list(_telemetry_buffer)
+            _telemetry_buffer.clear()
+            oldest_time = _oldest_buffered_time or time.time()
+            _buffer_bytes = 0
+            _oldest_buffered_time = None
+            _last_flush_time = time.time()
+
+        logger.info(f"Attempting to flush {len(events_to_flush)} events...")
+        outcome = "failure"
+        retries = 3
+        for attempt in range(retries):
+            try:
+                # The request body is a one-shot generator, so build it per attempt.
+                request_kwargs = _build_flush_request(events_to_flush)
+                if session is not None:
+                    async with session.post(TELEMETRY_API_ENDPOINT, timeout=10, **request_kwargs) as response:
+                        response.raise_for_status()
+                else:
+                    import aiohttp
+                    async with aiohttp.ClientSession() as temp_session:
+                        async with temp_session.post(TELEMETRY_API_ENDPOINT, timeout=10, **request_kwargs) as response:
+                            response.raise_for_status()
+                logger.info(f"Successfully flushed {len(events_to_flush)} events.")
+                outcome = "success"
+                break
+            except Exception as e:
+                logger.error(f"Failed to flush events (attempt {attempt+1}/{retries}): {e}")
+                if attempt + 1 < retries:
+                    await asyncio.sleep(2 ** attempt + random.uniform(0, 0.1))
+
+        # Flush lag: how long the oldest event in the batch waited before it was delivered (or dumped).
+        _metrics_rollup.record(musician_name or "telemetry", "telemetry_flush_lag", outcome,
+                               (time.time() - oldest_time) * 1000)
+        if outcome == "success":
             return
-        events_to_flush = list(_telemetry_buffer)
-        _telemetry_buffer.clear()
-        _last_flush_time = time.time()
 
-    logger.info(f"Attempting to flush {len(events_to_flush)} events...")
-    retries = 3
-    for attempt in range(retries):
+        fallback_file = os.path.join(LOG_DIR, f"telemetry_failed_flush_{int(time.time())}.json")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(TELEMETRY_API_ENDPOINT, json=events_to_flush, timeout=10) as response:
-                    response.raise_for_status()
-            logger.info(f"Successfully flushed {len(events_to_flush)} events.")
-            return
+            with open(fallback_file, 'w', encoding='utf-8') as f:
+                json.dump(events_to_flush, f, indent=4)
+            logger.warning(f"Telemetry flush failed. Dumped events to {fallback_file}.")
         except Exception as e:
-            logger.error(f"Failed to flush events (attempt {attempt+1}/{retries}): {e}")
-            await asyncio.sleep(2 ** attempt + random.uniform(0, 0.1))
+            logger.critical(f"Failed to dump failed telemetry events to file: {e}")
+
+def _flush_due(now):
+    """Returns (due, seconds_until_age_trigger) for the count, byte size and age triggers."""
+    if not _telemetry_buffer:
+        return False, None
+    if len(_telemetry_buffer) >= TELEMETRY_BUFFER_SIZE or _buffer_bytes >= TELEMETRY_FLUSH_MAX_BYTES:
+        return True, 0
+    oldest = _oldest_buffered_time if _oldest_buffered_time is not None else now
+    remaining = TELEMETRY_FLUSH_INTERVAL_SECONDS - (now - oldest)
+    return remaining <= 0, max(remaining, 0)
 
-    fallback_file = os.path.join(LOG_DIR, f"telemetry_failed_flush_{int(time.time())}.json")
+def add_rollup_sink(callback):
+    """
+    Registers callback(series) to receive every drained metrics rollup, e.g.
+    to forward it to the Conductor so it can be merged into the GDC.
+    """
+    _rollup_sinks.append(callback)
+
+def increment_counter(name, value=1):
+    """Adds to a named counter that is reported, and reset, with the next metrics rollup."""
+    _counters[name] += value
+
+async def flush_metrics_rollup(musician_name, forward=True):
+    """
+    Drains the local duration histograms and counters into a single
+    metrics_rollup event. forward=False skips the rollup sinks, for series
+    whose Conductor is already gone.
+    """
+    global _last_rollup_time
+    interval_s = time.time() - _last_rollup_time
+    _last_rollup_time = time.time()
+    if not len(_metrics_rollup) and not _counters:
+        return
+    series = _metrics_rollup.snapshot_and_reset()
+    counters = dict(_counters)
+    _counters.clear()
+    if series and forward:
+        for sink in _rollup_sinks:
+            try:
+                sink(series)
+            except Exception as e:
+                logger.error(f"Metrics rollup sink failed: {e}")
+    payload = {"interval_s": interval_s, "series": series}
+    if counters:
+        payload["counters"] = counters
+    await emit_telemetry_event(musician_name, None, 'metrics_rollup', payload, mask_sensitive=False)
+
+async def start_new_performance(musician_name):
+    """
+    Closes out the previous performance in a reused musician process: its
+    leftover histograms go to telemetry only, and events still buffered are
+    flushed in the background so the new performance starts with empty buffers.
+    """
+    await flush_metrics_rollup(musician_name, forward=False)
+    if _telemetry_buffer:
+        flush = asyncio.create_task(_flush_telemetry_buffer(None, musician_name))
+        _background_flushes.add(flush)
+        flush.add_done_callback(_background_flushes.discard)
+
+async def _telemetry_flusher_task(musician_name=None):
+    """
+    The single flusher for this process. Sleeps on _flush_wakeup, which
+    emit_telemetry_event sets when the count or byte trigger fires, with a
+    timeout for the age trigger and the metrics rollup interval. Reuses one
+    keep-alive session for every flush, opened at the first flush so that
+    processes which never flush never import aiohttp.
+    """
+    global _flusher_running
+    _configure_logging()
+    if _flusher_running:
+        logger.warning("Telemetry flusher already running in this process; not starting another.")
+        return
+    _flusher_running = True
+    session = None
     try:
-        with open(fallback_file, 'w', encoding='utf-8') as f:
-            json.dump(events_to_flush, f, indent=4)
-        logger.warning(f"Telemetry flush failed. Dumped events to {fallback_file}.")
-    except Exception as e:
-        logger.critical(f"Failed to dump failed telemetry events to file: {e}")
+        while True:
+            now = time.time()
+            due, age_wait = _flush_due(now)
+            if not due:
+                waits = [TELEMETRY_FLUSH_INTERVAL_SECONDS if age_wait is None else age_wait]
+                if musician_name:
+                    waits.append(max(METRICS_ROLLUP_INTERVAL_SECONDS - (now - _last_rollup_time), 0))
+                try:
+                    await asyncio.wait_for(_flush_wakeup.wait(), timeout=min(waits))
+                except asyncio.TimeoutError:
+                    pass
+            _flush_wakeup.clear()
 
-async def _telemetry_flusher_task():
-    while True:
-        await asyncio.sleep(TELEMETRY_FLUSH_INTERVAL_SECONDS)
-        async with _buffer_lock:
-            should_flush = len(_telemetry_buffer) > 0 and (
-                len(_telemetry_buffer) >= TELEMETRY_BUFFER_SIZE or
-                (time.time() - _last_flush_time) >= TELEMETRY_FLUSH_INTERVAL_SECONDS
-            )
-        if should_flush:
-            await _flush_telemetry_buffer()
+            if musician_name and (time.time() - _last_rollup_time) >= METRICS_ROLLUP_INTERVAL_SECONDS:
+                await flush_metrics_rollup(musician_name)
+            async with _buffer_lock:
+                due, _ = _flush_due(time.time())
+            if due:
+                if session is None:
+                    import aiohttp
+                    session = aiohttp.ClientSession()
+                await _flush_telemetry_buffer(session, musician_name)
+    finally:
+        _flusher_running = False
+        if session is not None:
+            await session.close()
 
 async def emit_telemetry_event(musician_name, task_id, event_type, payload, parent_event_id=None, mask_sensitive=True):
-    processed_payload = payload.copy()
+    global _buffer_bytes, _oldest_buffered_time
+    _configure_logging()
+    processed_payload = payload
     was_masked = False
     if mask_sensitive:
-        was_masked = _mask_sensitive_data(processed_payload)
+        processed_payload, was_masked = _masker.mask(payload)
+    if TELEMETRY_EXTERNALIZE_BLOBS and isinstance(processed_payload, dict):
+        try:
+            processed_payload = _externalize_large_values(event_type, processed_payload)
+        except OSError as e:
+            logger.error(f"Blob store unavailable, sending payload inline for task {task_id}: {e}")
 
+    # Serialize once: the same string checks serializability and feeds the hash.
     try:
-        json.dumps(processed_payload)
+        payload_str = json.dumps(processed_payload, sort_keys=True)
     except TypeError as e:
         logger.error(f"Payload for task {task_id} is not JSON serializable: {e}")
         processed_payload = {"error": "Non-serializable payload", "summary": str(payload)[:200]}
+        payload_str = None
 
     event = {
         "event_id": _generate_event_id(),
@@ -181,32 +475,50 @@ async def emit_telemetry_event(musician_name, task_id, event_type, payload, pare
         "task_id": task_id,
         "event_type": event_type,
         "payload": processed_payload,
-        "data_hash": _calculate_payload_hash(processed_payload),
+        "data_hash": _calculate_payload_hash(processed_payload, payload_str),
         "parent_event_id": parent_event_id,
         "sensitive_data_masked": was_masked
     }
 
-    schema_map = {
-        "task_start": TASK_LIFECYCLE_EVENT_SCHEMA,
-        "task_progress": TASK_LIFECYCLE_EVENT_SCHEMA,
-        "task_complete": TASK_LIFECYCLE_EVENT_SCHEMA,
-        "task_error": TASK_LIFECYCLE_EVENT_SCHEMA,
-        "gdc_snapshot": GDC_SNAPSHOT_EVENT_SCHEMA,
-        "sub_log_entry": SUB_LOG_ENTRY_SCHEMA
-    }
-    schema_to_validate = schema_map.get(event_type)
-
-    if schema_to_validate:
-        try:
-            validate(instance=event, schema=schema_to_validate, resolver=_get_schema_resolver())
-        except (ValidationError, Exception) as e:
-            logger.error(f"Event validation failed for task {task_id}: {e}")
-            return
+    try:
+        _validate_event(event)
+    except Exception as e:
+        logger.error(f"Event validation failed for task {task_id}: {e}")
+        return
 
     async with _buffer_lock:
+        if not _telemetry_buffer:
+            # The buffer may have been drained elsewhere (e.g. the WS server), so restart the accounting.
+            _buffer_bytes = 0
+            _oldest_buffered_time = time.time()
         _telemetry_buffer.append(event)
-        if len(_telemetry_buffer) >= TELEMETRY_BUFFER_SIZE:
-            asyncio.create_task(_flush_telemetry_buffer())
+        _buffer_bytes += len(payload_str) if payload_str else 0
+        if len(_telemetry_buffer) >= TELEMETRY_BUFFER_SIZE or _buffer_bytes >= TELEMETRY_FLUSH_MAX_BYTES:
+            _flush_wakeup.set()
+
+async def enqueue_events(events):
+    """
+    Buffers events that were already built and validated in another process,
+    e.g. forwarded by a remote musician host, for this process's flusher.
+    """
+    global _buffer_bytes, _oldest_buffered_time
+    async with _buffer_lock:
+        if not _telemetry_buffer:
+            _buffer_bytes = 0
+            _oldest_buffered_time = time.time()
+        for event in events:
+            _telemetry_buffer.append(event)
+            _buffer_bytes += len(json.dumps(event.get("payload")))
+        if len(_telemetry_buffer) >= TELEMETRY_BUFFER_SIZE or _buffer_bytes >= TELEMETRY_FLUSH_MAX_BYTES:
+            _flush_wakeup.set()
+
+def _summarize_result(result, limit=500):
+    """Short string form of an action result; long strings are cut before str() copies them."""
+    if result is None:
+        return "None"
+    if isinstance(result, (str, bytes)):
+        result = result[:limit]
+    return str(result)[:limit]
 
 def log_task_lifecycle(mask_sensitive_params=True):
     def decorator(func):
@@ -214,30 +526,50 @@ def log_task_lifecycle(mask_sensitive_params=True):
         async def wrapper(instance, action_name, parameters, task_id, *args, **kwargs):
             musician_name = instance.name
             start_time = time.time()
-            
+            # Decide once per task so a shipped task_start always has its task_complete.
+            sampled = random.random() < TELEMETRY_LIFECYCLE_SAMPLE_RATE
+
             start_payload = {
                 "method": f"{instance.__class__.__name__}.{action_name}",
                 "args": parameters,
                 "description": f"Starting execution for task {task_id}.",
                 "status": "in_progress"
             }
-            await emit_telemetry_event(musician_name, task_id, 'task_start', start_payload, mask_sensitive=mask_sensitive_params)
+            if sampled:
+                await emit_telemetry_event(musician_name, task_id, 'task_start', start_payload, mask_sensitive=mask_sensitive_params)
 
             try:
                 result = await func(instance, action_name, parameters, task_id, *args, **kwargs)
                 duration_ms = (time.time() - start_time) * 1000
+                _metrics_rollup.record(musician_name, action_name, "success", duration_ms)
+                if not sampled:
+                    return result
 
                 complete_payload = {
                     "method": f"{instance.__class__.__name__}.{action_name}",
                     "status": "success",
                     "description": f"Completed execution for task {task_id}.",
-                    "result_summary": str(result)[:500] if result is not None else "None",
+                    "result_summary": _summarize_result(result),
                     "duration_ms": duration_ms
                 }
                 await emit_telemetry_event(musician_name, task_id, 'task_complete', complete_payload, mask_sensitive=mask_sensitive_params)
                 return result
+            except asyncio.CancelledError:
+                duration_ms = (time.time() - start_time) * 1000
+                _metrics_rollup.record(musician_name, action_name, "cancelled", duration_ms)
+                cancel_payload = {
+                    "method": f"{instance.__class__.__name__}.{action_name}",
+                    "status": "failure",
+                    "error_type": "CancelledError",
+                    "error_message": "Task cancelled (STOP, cancel request or timeout).",
+                    "duration_ms": duration_ms,
+                    "description": f"Execution cancelled for task {task_id}."
+                }
+                await emit_telemetry_event(musician_name, task_id, 'task_error', cancel_payload, mask_sensitive=mask_sensitive_params)
+                raise
             except Exception as e:
                 duration_ms = (time.time() - start_time) * 1000
+                _metrics_rollup.record(musician_name, action_name, "failure", duration_ms)
                 error_payload = {
                     "method": f"{instance.__class__.__name__}.{action_name}",
                     "status": "failure",
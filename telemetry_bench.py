@@ -0,0 +1,164 @@
+# C:\syncphony\telemetry_bench.py
+# Telemetry micro-benchmarks.
+#
+#   python telemetry_bench.py flush --events 5000 --rounds 5
+#       Replays the logs/telemetry_failed_flush_*.json dumps against the local
+#       ingest stand-in and reports wire bytes and flush time per wire format.
+#
+#   python telemetry_bench.py mask --depth 6 --width 8 --rounds 200
+#       Compares the copy-on-write masker with the legacy deep walk on deep
+#       task `args` payloads.
+
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import telemetry
+from telemetry_ingest_server import TelemetryIngestServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPLAY_GLOB = os.path.join(BENCH_DIR, "logs", "telemetry_failed_flush_*.json")
+
+# (label, wire format, content encoding)
+WIRE_VARIANTS = [
+    ("json array", "json", "identity"),
+    ("ndjson", "ndjson", "identity"),
+    ("ndjson+deflate", "ndjson", "deflate"),
+    ("ndjson+gzip", "ndjson", "gzip"),
+]
+
+def load_replay_events(target_count):
+    """Loads the failed-flush dumps and repeats them until target_count events are available."""
+    recorded = []
+    for path in sorted(glob.glob(REPLAY_GLOB)):
+        with open(path, 'r', encoding='utf-8') as f:
+            recorded.extend(json.load(f))
+    if not recorded:
+        raise SystemExit(f"No replay files matched {REPLAY_GLOB}")
+    events = []
+    while len(events) < target_count:
+        for event in recorded[:target_count - len(events)]:
+            replayed = dict(event)
+            replayed["event_id"] = f"{event['event_id']}-replay{len(events)}"
+            events.append(replayed)
+    return events
+
+def wire_bytes(events, wire_format, encoding):
+    if wire_format == "json":
+        return len(json.dumps(events).encode('utf-8'))
+    return sum(len(chunk) for chunk in telemetry._iter_ndjson_chunks(events, encoding))
+
+async def post_batch(session, url, events, wire_format, encoding):
+    if wire_format == "json":
+        kwargs = {"json": events}
+    else:
+        headers = {"Content-Type": "application/x-ndjson"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        kwargs = {"data": telemetry._ndjson_body(events, encoding), "headers": headers}
+    async with session.post(url, **kwargs) as response:
+        response.raise_for_status()
+
+async def run_flush_bench(event_count, rounds, port):
+    events = load_replay_events(event_count)
+    server = TelemetryIngestServer(max_events=event_count)
+    runner = await server.start(port=port)
+    url = f"http://127.0.0.1:{port}/telemetry_events"
+    try:
+        print(f"Replaying {len(events)} events ({rounds} rounds per variant)")
+        print(f"{'variant':<16}{'wire bytes':>14}{'ratio':>8}{'best flush ms':>16}")
+        baseline = None
+        async with aiohttp.ClientSession() as session:
+            for label, wire_format, encoding in WIRE_VARIANTS:
+                size = wire_bytes(events, wire_format, encoding)
+                baseline = baseline or size
+                timings = []
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    await post_batch(session, url, events, wire_format, encoding)
+                    timings.append((time.perf_counter() - started) * 1000)
+                print(f"{label:<16}{size:>14}{size / baseline:>8.2f}{min(timings):>16.1f}")
+    finally:
+        await runner.cleanup()
+    expected = len(events) * rounds * len(WIRE_VARIANTS)
+    if server.events_received != expected:
+        raise SystemExit(f"Ingest server received {server.events_received} events, expected {expected}")
+
+def _legacy_mask(data, sensitive_keys):
+    """The original in-place walk, kept here as the benchmark baseline."""
+    masked = False
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if any(sensitive in key.lower() for sensitive in sensitive_keys):
+                data[key] = "[MASKED]"
+                masked = True
+            elif isinstance(value, (dict, list)):
+                if _legacy_mask(value, sensitive_keys):
+                    masked = True
+    elif isinstance(data, list):
+        for item in data:
+            if _legacy_mask(item, sensitive_keys):
+                masked = True
+    return masked
+
+def build_deep_args(depth, width, with_secret):
+    """Builds a write_file-style args payload nested depth levels deep."""
+    def level(d):
+        node = {f"field_{i}": f"value {i} at depth {d}" for i in range(width)}
+        node["items"] = [{"id": i, "name": f"item-{i}"} for i in range(width)]
+        if d > 0:
+            node["child"] = level(d - 1)
+        elif with_secret:
+            node["api_key"] = "sk-not-a-real-key"
+        return node
+    return {"file_path": "C:\\syncphony\\out.txt", "content": "x" * 4096, "options": level(depth)}
+
+def run_mask_bench(depth, width, rounds):
+    masker = telemetry.SensitiveDataMasker(telemetry.TELEMETRY_SENSITIVE_KEYS)
+    print(f"Masking args payloads (depth={depth}, width={width}, {rounds} rounds)")
+    print(f"{'payload':<14}{'legacy us':>12}{'masker us':>12}{'speedup':>10}")
+    for label, with_secret in (("clean", False), ("one secret", True)):
+        payload = build_deep_args(depth, width, with_secret)
+
+        # The legacy walk mutated its input, so it has to pay for a deep copy
+        # to leave the caller's parameters intact.
+        started = time.perf_counter()
+        for _ in range(rounds):
+            _legacy_mask(copy.deepcopy(payload), telemetry.TELEMETRY_SENSITIVE_KEYS)
+        legacy_us = (time.perf_counter() - started) / rounds * 1e6
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            masker.mask(payload)
+        masker_us = (time.perf_counter() - started) / rounds * 1e6
+
+        print(f"{label:<14}{legacy_us:>12.1f}{masker_us:>12.1f}{legacy_us / masker_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telemetry micro-benchmarks.")
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+
+    flush_parser = subparsers.add_parser("flush", help="Benchmark flush wire formats.")
+    flush_parser.add_argument("--events", type=int, default=2000)
+    flush_parser.add_argument("--rounds", type=int, default=3)
+    flush_parser.add_argument("--port", type=int, default=8089)
+
+    mask_parser = subparsers.add_parser("mask", help="Benchmark sensitive-field masking.")
+    mask_parser.add_argument("--depth", type=int, default=6)
+    mask_parser.add_argument("--width", type=int, default=8)
+    mask_parser.add_argument("--rounds", type=int, default=200)
+
+    args = parser.parse_args()
+    if args.bench == "flush":
+        asyncio.run(run_flush_bench(args.events, args.rounds, args.port))
+    else:
+        run_mask_bench(args.depth, args.width, args.rounds)
@@ -0,0 +1,95 @@
+# C:\syncphony\telemetry_ingest_server.py
+# Local stand-in for the telemetry collector behind TELEMETRY_API_ENDPOINT.
+# Accepts both the legacy JSON array batches and the streamed NDJSON batches
+# (optionally gzip/deflate encoded) posted by telemetry._flush_telemetry_buffer.
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logger_config import get_logger
+
+logger = get_logger("TelemetryIngest")
+
+class TelemetryIngestServer:
+    """
+    Minimal aiohttp collector. Keeps the most recent events in memory and
+    counts what it has received so benchmarks and manual runs can inspect it.
+    """
+    def __init__(self, max_events=10000):
+        self.events = collections.deque(maxlen=max_events)
+        self.batches_received = 0
+        self.events_received = 0
+
+    async def handle_events(self, request):
+        """Ingests one telemetry batch. aiohttp undoes Content-Encoding before we read."""
+        content_type = request.headers.get("Content-Type", "")
+        received = 0
+        try:
+            if "ndjson" in content_type:
+                # Split on newlines ourselves: StreamReader.readline() caps line
+                # length, and events carrying file contents can exceed it.
+                tail = b""
+                async for chunk in request.content.iter_any():
+                    lines = (tail + chunk).split(b"\n")
+                    tail = lines.pop()
+                    for line in lines:
+                        if line.strip():
+                            self.events.append(json.loads(line))
+                            received += 1
+                if tail.strip():
+                    self.events.append(json.loads(tail))
+                    received += 1
+            else:
+                batch = await request.json()
+                if not isinstance(batch, list):
+                    batch = [batch]
+                self.events.extend(batch)
+                received = len(batch)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Rejected malformed telemetry batch: {e}")
+            return web.json_response({"status": "error", "message": str(e)}, status=400)
+
+        self.batches_received += 1
+        self.events_received += received
+        logger.info(f"Ingested {received} events ({content_type or 'unknown content type'}).")
+        return web.json_response({"status": "ok", "received": received})
+
+    def make_app(self):
+        app = web.Application(client_max_size=256 * 1024 * 1024)
+        app.router.add_post("/telemetry_events", self.handle_events)
+        return app
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Starts the server and returns the runner so callers can clean it up."""
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        logger.info(f"Telemetry ingest server listening on http://{host}:{port}/telemetry_events")
+        return runner
+
+
+async def _serve_forever(host, port):
+    runner = await TelemetryIngestServer().start(host, port)
+    try:
+        await asyncio.Future()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local telemetry ingest stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("Telemetry ingest server stopped.")
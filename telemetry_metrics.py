@@ -0,0 +1,144 @@
+# C:\syncphony\telemetry_metrics.py
+# Compact, mergeable duration histograms used to roll task lifecycle timings
+# up per (musician, action, outcome) instead of shipping every raw event.
+
+import math
+
+class DurationHistogram:
+    """
+    Log-bucketed histogram (HDR/DDSketch style) of durations in milliseconds.
+
+    Bucket k holds values in (gamma^(k-1), gamma^k], so every quantile is
+    reported within relative_accuracy of the true value. Buckets are stored
+    sparsely, and two histograms with the same accuracy merge by adding counts.
+    """
+    def __init__(self, relative_accuracy=0.02):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value_ms):
+        value_ms = max(float(value_ms), 0.0)
+        if value_ms == 0.0:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value_ms) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        self.sum += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge histograms with different relative accuracy.")
+        for key, bucket_count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (0 <= q <= 1), or None when empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket, which keeps the error within relative_accuracy.
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum_ms": self.sum,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "zero_count": self.zero_count,
+            "buckets": {str(key): bucket_count for key, bucket_count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data.get("relative_accuracy", 0.02))
+        histogram.count = data.get("count", 0)
+        histogram.sum = data.get("sum_ms", 0.0)
+        histogram.min = data.get("min_ms")
+        histogram.max = data.get("max_ms")
+        histogram.zero_count = data.get("zero_count", 0)
+        histogram.buckets = {int(key): bucket_count for key, bucket_count in data.get("buckets", {}).items()}
+        return histogram
+
+
+class MetricsRollup:
+    """
+    Duration histograms keyed by (musician, action, outcome).
+
+    Musicians record into one rollup and periodically drain it with
+    snapshot_and_reset(); the Conductor merges the drained series into its
+    own long-lived rollup with merge_series().
+    """
+    QUANTILES = (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99))
+
+    def __init__(self, relative_accuracy=0.02):
+        self.relative_accuracy = relative_accuracy
+        self._histograms = {}
+
+    def __len__(self):
+        return len(self._histograms)
+
+    def record(self, musician, action, outcome, duration_ms):
+        key = (musician, action, outcome)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = DurationHistogram(self.relative_accuracy)
+        histogram.record(duration_ms)
+
+    def series(self):
+        """Returns one JSON-ready entry per key, with quantiles and mergeable buckets."""
+        entries = []
+        for (musician, action, outcome), histogram in sorted(self._histograms.items()):
+            entry = {"musician": musician, "action": action, "outcome": outcome}
+            entry.update(histogram.to_dict())
+            for label, q in self.QUANTILES:
+                entry[label] = histogram.quantile(q)
+            entries.append(entry)
+        return entries
+
+    def snapshot_and_reset(self):
+        entries = self.series()
+        self._histograms = {}
+        return entries
+
+    def merge_series(self, entries):
+        for entry in entries:
+            key = (entry["musician"], entry["action"], entry["outcome"])
+            incoming = DurationHistogram.from_dict(entry)
+            if key in self._histograms:
+                self._histograms[key].merge(incoming)
+            else:
+                self._histograms[key] = incoming
+
+    def summary(self):
+        """Nested {musician: {action: {outcome: stats}}} view without the raw buckets, for the GDC."""
+        nested = {}
+        for entry in self.series():
+            stats = {k: entry[k] for k in ("count", "sum_ms", "min_ms", "max_ms", "p50_ms", "p95_ms", "p99_ms")}
+            nested.setdefault(entry["musician"], {}).setdefault(entry["action"], {})[entry["outcome"]] = stats
+        return nested
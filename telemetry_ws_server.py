@@ -4,6 +4,7 @@ import asyncio
 import websockets
 import json
 import collections
+import hmac
 import time
 from datetime import datetime
 import sys
@@ -12,6 +13,15 @@ import queue # For multiprocessing.Queue.Empty exception
 
 # Add the current directory to sys.path so it can find telemetry and genome_data_cache
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blob_store import get_default_blob_store
+
+# Browsers send an Origin header with every WebSocket handshake; CLI and script
+# clients send none. Only those, plus the origins listed here (comma-separated),
+# may connect, so a web page open in the user's browser cannot reach the server.
+WS_ALLOWED_ORIGINS = [origin.strip() for origin in os.environ.get('SYNCPHONY_WS_ORIGINS', "").split(",") if origin.strip()]
+# Shared secret a client must send as "token" with start_symphony / stop_symphony.
+# Unset, those commands are refused.
+WS_CONTROL_TOKEN = os.environ.get('SYNCPHONY_WS_TOKEN', "")
 
 # Assuming these are available from the main application context (MissionControl passes references)
 # We don't import them directly here to avoid circular dependencies if this were a true microservice
@@ -21,12 +31,13 @@ class TelemetryWebSocketServer:
     """
     Manages WebSocket connections for real-time telemetry and control.
     """
-    def __init__(self, gdc_instance, log_queue, reporting_queue, telemetry_buffer_ref):
+    def __init__(self, gdc_instance, log_queue, reporting_queue, telemetry_buffer_ref, symphony_service=None):
         self.connected_clients = set() # Store connected WebSocket clients
         self.gdc = gdc_instance # Reference to the main GDC instance
         self.log_queue = log_queue # Reference to the system log queue (multiprocessing.Queue)
         self.reporting_queue = reporting_queue # Reference to the task reporting queue (multiprocessing.Queue)
         self.telemetry_buffer_ref = telemetry_buffer_ref # Tuple: (_telemetry_buffer_deque, _buffer_lock_asyncio) from telemetry.py
+        self.symphony_service = symphony_service # conductor_service.ConductorService when running headless; None under Mission Control
 
         self._last_gdc_root = None # To detect GDC changes for pushing snapshots
 
@@ -81,6 +92,35 @@ class TelemetryWebSocketServer:
                     "key": key,
                     "data": node_data
                 }))
+            elif msg_type == "fetch_blob":
+                # Resolves a {blob, size, preview} reference from the GDC or a telemetry event
+                blob_hash = data.get("blob")
+                try:
+                    content = get_default_blob_store().get_text(blob_hash)
+                except (KeyError, ValueError, TypeError):
+                    await websocket.send(json.dumps({"type": "error", "message": f"Unknown blob: {blob_hash}"}))
+                else:
+                    await websocket.send(json.dumps({
+                        "type": "blob_response",
+                        "blob": blob_hash,
+                        "size": len(content.encode('utf-8')),
+                        "content": content
+                    }))
+            elif msg_type in ("start_symphony", "stop_symphony") and self.symphony_service is not None \
+                    and not self._authorized(data):
+                await websocket.send(json.dumps({"type": "error", "message": f"{msg_type} needs a valid token (SYNCPHONY_WS_TOKEN)."}))
+            elif msg_type == "stop_symphony" and self.symphony_service is not None:
+                stopped = self.symphony_service.stop_performance(data.get("performance_id"))
+                await websocket.send(json.dumps({"type": "command_ack", "status": "stopping" if stopped else "unknown",
+                                                 "command": "stop_symphony", "performance_id": data.get("performance_id")}))
+            elif msg_type == "start_symphony" and self.symphony_service is not None:
+                symphony_path = data.get("symphony_path")
+                if not symphony_path:
+                    await websocket.send(json.dumps({"type": "error", "message": "start_symphony needs a symphony_path."}))
+                    return
+                performance = self.symphony_service.submit(symphony_path, data.get("max_concurrency"))
+                await websocket.send(json.dumps({"type": "command_ack", "status": "accepted", "command": "start_symphony",
+                                                 "performance_id": performance.performance_id}))
             elif msg_type == "start_symphony":
                 symphony_path = data.get("symphony_path")
                 # This would feed into the Conductor's input queue or trigger MissionControl's start method
@@ -113,7 +153,13 @@ class TelemetryWebSocketServer:
             except websockets.exceptions.ConnectionClosed:
                 pass
 
-    async def websocket_handler(self, websocket, path):
+    @staticmethod
+    def _authorized(data):
+        token = data.get("token")
+        return bool(WS_CONTROL_TOKEN) and isinstance(token, str) and \
+            hmac.compare_digest(token.encode('utf-8'), WS_CONTROL_TOKEN.encode('utf-8'))
+
+    async def websocket_handler(self, websocket, path=None):
         """Main handler for new WebSocket connections."""
         await self.register_client(websocket)
         try:
@@ -180,7 +226,7 @@ class TelemetryWebSocketServer:
 
             # 4. Check for new reporting messages from multiprocessing.Queue
             new_reports = []
-            while True:
+            while self.reporting_queue is not None:
                 try:
                     report_entry = self.reporting_queue.get_nowait()
                     new_reports.append(report_entry)
@@ -202,7 +248,7 @@ class TelemetryWebSocketServer:
 
         # Use asyncio.gather to send to all clients concurrently
         # and handle potential connection errors gracefully
-        pending_sends = [client.send(message) for client in list(self.connected_clients)]
+        pending_sends = [asyncio.ensure_future(client.send(message)) for client in list(self.connected_clients)]
         
         if not pending_sends: # No active sends if clients disconnected
             return
@@ -223,7 +269,7 @@ class TelemetryWebSocketServer:
         """Starts the WebSocket server."""
         print(f"[WS Server]: Starting WebSocket server on ws://{host}:{port}")
         # The `serve` context manager runs the server
-        async with websockets.serve(self.websocket_handler, host, port):
+        async with websockets.serve(self.websocket_handler, host, port, origins=[None] + WS_ALLOWED_ORIGINS):
             # Start the background task for pushing updates
             asyncio.create_task(self._push_telemetry_updates())
             # This Future keeps the server running indefinitely
@@ -0,0 +1,450 @@
+# C:\syncphony\workflow_analysis.py
+# Static analysis of a Symphony's task DAG for AIOracleMusician.optimize_workflow:
+# levels and widths, the critical path, redundant and ordering-only edges,
+# serial chains, batchable tasks, and a rewritten Symphony with its predicted
+# makespan. Pure functions over plain dicts; no I/O.
+
+import copy
+import os
+
+# Conductor dispatch and reporting each poll every 0.1s, so every task pays
+# roughly this much on top of its own duration.
+TASK_DISPATCH_OVERHEAD_MS = 150
+DEFAULT_TASK_DURATION_MS = 1000
+DEFAULT_ACTION_DURATIONS_MS = {
+    "create_directory": 20,
+    "write_file": 50,
+    "read_file": 50,
+    "delete_path": 50,
+    "run_command": 5000,
+    "get_json": 500,
+    "post_data": 500,
+    "analyze_goal": 2000,
+    "suggest_symphony": 1500,
+    "generate_symphony": 3000,
+    "capability_assessment": 1000,
+    "optimize_workflow": 2000,
+    "explain_approach": 1500,
+}
+
+# Single-entry action -> (bulk action, parameter keys the bulk action can carry, bulk parameter name)
+BATCHABLE_ACTIONS = {
+    "write_file": ("write_files", {"file_path", "content"}, "files"),
+    "delete_path": ("delete_paths", {"path"}, "paths"),
+    "run_command": ("run_commands", {"command", "cwd", "env"}, "commands"),
+    "get_json": ("get_json_many", {"url"}, "urls"),
+}
+
+# Filesystem actions whose parameters name every path they touch: what they
+# produce, and everything they read or write. An edge is only dropped when both
+# ends are listed here and their paths do not overlap. Every other action (shell
+# commands, web calls, Oracle calls) may read files it never names, so edges
+# into and out of it are always kept.
+PRODUCED_PATH_PARAMETERS = {
+    "create_directory": ("path",),
+    "write_file": ("file_path",),
+    "write_files": ("file_path",),
+    "delete_path": ("path",),
+    "delete_paths": ("paths",),
+    "copy_tree": ("dst",),
+    "sync_tree": ("dst",),
+}
+TOUCHED_PATH_PARAMETERS = {
+    "create_directory": ("path",),
+    "write_file": ("file_path",),
+    "write_files": ("file_path",),
+    "read_file": ("file_path",),
+    "delete_path": ("path",),
+    "delete_paths": ("paths",),
+    "copy_tree": ("src", "dst"),
+    "sync_tree": ("src", "dst"),
+}
+
+
+def normalize_tasks(symphony):
+    """
+    Accepts both Symphony layouts in this repo ({"tasks": [...]} with
+    details/depends_on, or {task_id: {musician, action, parameters,
+    dependencies}}) and returns a list of
+    {task_id, musician, action, parameters, depends_on, source}.
+    """
+    if isinstance(symphony, dict) and isinstance(symphony.get("tasks"), list):
+        raw_tasks = symphony["tasks"]
+    elif isinstance(symphony, dict):
+        raw_tasks = [dict(task, task_id=task_id) for task_id, task in symphony.items() if isinstance(task, dict)]
+    else:
+        raise ValueError("Symphony must be a dict with a 'tasks' list or a mapping of task_id to task.")
+
+    tasks = []
+    for index, task in enumerate(raw_tasks):
+        details = task.get("details", {})
+        tasks.append({
+            "task_id": task.get("task_id") or f"task_{index}",
+            "musician": task.get("musician"),
+            "action": details.get("action", task.get("action")),
+            "parameters": details.get("parameters", task.get("parameters", {})) or {},
+            "depends_on": list(task.get("depends_on", task.get("dependencies")) or []),
+            "source": task,
+        })
+    known = {task["task_id"] for task in tasks}
+    for task in tasks:
+        missing = [dep for dep in task["depends_on"] if dep not in known]
+        if missing:
+            raise ValueError(f"Task '{task['task_id']}' depends on unknown task(s): {', '.join(missing)}")
+    return tasks
+
+
+def _topological_order(tasks):
+    by_id = {task["task_id"]: task for task in tasks}
+    remaining = {task_id: len(set(task["depends_on"])) for task_id, task in by_id.items()}
+    dependents = {task_id: [] for task_id in by_id}
+    for task in tasks:
+        for dep in set(task["depends_on"]):
+            dependents[dep].append(task["task_id"])
+    ready = [task["task_id"] for task in tasks if remaining[task["task_id"]] == 0]
+    order = []
+    while ready:
+        task_id = ready.pop(0)
+        order.append(task_id)
+        for child in dependents[task_id]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    if len(order) != len(tasks):
+        cyclic = sorted(task_id for task_id, count in remaining.items() if count > 0)
+        raise ValueError(f"Symphony has a dependency cycle involving: {', '.join(cyclic)}")
+    return order
+
+
+def _levels(tasks, order):
+    """Longest-path layering: a task's level is one more than its deepest dependency."""
+    by_id = {task["task_id"]: task for task in tasks}
+    level = {}
+    for task_id in order:
+        level[task_id] = 1 + max((level[dep] for dep in by_id[task_id]["depends_on"]), default=-1)
+    levels = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for task_id in order:
+        levels[level[task_id]].append(task_id)
+    return levels
+
+
+def _redundant_edges(tasks, order):
+    """Edges implied by another path (the ones a transitive reduction drops)."""
+    by_id = {task["task_id"]: task for task in tasks}
+    bit = {task_id: 1 << i for i, task_id in enumerate(order)}
+    ancestors = {}
+    for task_id in order:
+        mask = 0
+        for dep in by_id[task_id]["depends_on"]:
+            mask |= ancestors[dep] | bit[dep]
+        ancestors[task_id] = mask
+    redundant = []
+    for task_id in order:
+        deps = list(dict.fromkeys(by_id[task_id]["depends_on"]))
+        for dep in deps:
+            # dep is redundant if another direct dependency already has it as an ancestor.
+            if any(other != dep and ancestors[other] & bit[dep] for other in deps):
+                redundant.append((dep, task_id))
+    return redundant
+
+
+def _normalize_path(value):
+    path = value.strip().replace("\\", "/").rstrip("/").lower()
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+def _path_values(value, keys):
+    """Every string (or list of strings) stored under one of keys, at any depth (e.g. write_files' files[].file_path)."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in keys and isinstance(item, str):
+                yield item
+            elif key in keys and isinstance(item, list) and all(isinstance(entry, str) for entry in item):
+                yield from item
+            else:
+                yield from _path_values(item, keys)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _path_values(item, keys)
+
+
+def _declared_paths(task, table):
+    keys = table.get(task["action"])
+    if keys is None:
+        return None
+    return [_normalize_path(path) for path in _path_values(task["parameters"], keys)]
+
+
+def _paths_overlap(a, b):
+    if os.path.isabs(a) != os.path.isabs(b):
+        return True  # relative to an unknown cwd; cannot tell them apart
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
+
+
+def _is_data_dependency(producer, consumer):
+    """
+    False only when both tasks are filesystem actions that declare their paths
+    and nothing the producer writes is, contains or lies under a path the
+    consumer touches (the edge then only orders the two).
+    """
+    produced = _declared_paths(producer, PRODUCED_PATH_PARAMETERS)
+    touched = _declared_paths(consumer, TOUCHED_PATH_PARAMETERS)
+    if not produced or not touched:
+        return True
+    return any(_paths_overlap(path, other) for path in produced for other in touched)
+
+
+def _serial_chains(tasks, order, removable):
+    """Maximal single-in/single-out chains of three or more tasks, with the edges that need not be serial."""
+    by_id = {task["task_id"]: task for task in tasks}
+    dependents = {task_id: [] for task_id in by_id}
+    for task in tasks:
+        for dep in set(task["depends_on"]):
+            dependents[dep].append(task["task_id"])
+
+    def links_onward(task_id):
+        return len(dependents[task_id]) == 1 and len(set(by_id[dependents[task_id][0]]["depends_on"])) == 1
+
+    chains = []
+    seen = set()
+    for task_id in order:
+        if task_id in seen:
+            continue
+        deps = set(by_id[task_id]["depends_on"])
+        if len(deps) == 1 and links_onward(next(iter(deps))):
+            continue  # not the head of a chain
+        chain = [task_id]
+        while links_onward(chain[-1]):
+            chain.append(dependents[chain[-1]][0])
+        seen.update(chain)
+        if len(chain) >= 3:
+            edges = list(zip(chain, chain[1:]))
+            independent = [list(edge) for edge in edges if edge in removable]
+            if independent:
+                chains.append({"tasks": chain, "independent_edges": independent})
+    return chains
+
+
+def _duration_lookup(historical_durations):
+    """
+    historical_durations may map task_id -> ms, or be the Conductor's
+    metrics_rollup summary ({musician: {action: {outcome: {"p50_ms": ...}}}}).
+    """
+    historical_durations = historical_durations or {}
+
+    def duration_of(task):
+        value = historical_durations.get(task["task_id"])
+        if isinstance(value, (int, float)):
+            return float(value)
+        for musician in (task["musician"], f"{task['musician']}Musician"):
+            stats = historical_durations.get(musician, {})
+            stats = stats.get(task["action"], {}).get("success") if isinstance(stats, dict) else None
+            if isinstance(stats, dict) and stats.get("p50_ms") is not None:
+                return float(stats["p50_ms"])
+        return float(DEFAULT_ACTION_DURATIONS_MS.get(task["action"], DEFAULT_TASK_DURATION_MS))
+
+    return duration_of
+
+
+def _critical_path(tasks, order, durations):
+    by_id = {task["task_id"]: task for task in tasks}
+    finish = {}
+    previous = {}
+    for task_id in order:
+        deps = by_id[task_id]["depends_on"]
+        start = max((finish[dep] for dep in deps), default=0.0)
+        previous[task_id] = max(deps, key=lambda dep: finish[dep]) if deps else None
+        finish[task_id] = start + durations[task_id] + TASK_DISPATCH_OVERHEAD_MS
+    if not finish:
+        return [], 0.0
+    end = max(finish, key=finish.get)
+    path = [end]
+    while previous[path[-1]] is not None:
+        path.append(previous[path[-1]])
+    return list(reversed(path)), finish[end]
+
+
+def simulate_makespan(tasks, durations):
+    """
+    Predicted wall time of a performance: a task starts once its dependencies
+    are done and its musician is free (each musician runs one task at a time),
+    plus the per-task dispatch overhead.
+    """
+    by_id = {task["task_id"]: task for task in tasks}
+    order = _topological_order(tasks)
+    position = {task_id: i for i, task_id in enumerate(order)}
+    musician_free = {}
+    finish = {}
+    # Tasks are considered in order of their earliest possible start, ties by Symphony order.
+    pending = set(by_id)
+    while pending:
+        ready = [task_id for task_id in pending if all(dep in finish for dep in by_id[task_id]["depends_on"])]
+        task_id = min(ready, key=lambda t: (max((finish[d] for d in by_id[t]["depends_on"]), default=0.0), position[t]))
+        task = by_id[task_id]
+        start = max([finish[dep] for dep in task["depends_on"]] + [musician_free.get(task["musician"], 0.0)])
+        finish[task_id] = start + durations[task_id] + TASK_DISPATCH_OVERHEAD_MS
+        musician_free[task["musician"]] = finish[task_id]
+        pending.remove(task_id)
+    return max(finish.values(), default=0.0)
+
+
+def _batch_groups(tasks, levels):
+    """Same-level tasks for one musician whose action has a bulk form and whose dependencies are identical."""
+    by_id = {task["task_id"]: task for task in tasks}
+    groups = []
+    for level in levels:
+        buckets = {}
+        for task_id in level:
+            task = by_id[task_id]
+            spec = BATCHABLE_ACTIONS.get(task["action"])
+            if spec is None or not set(task["parameters"]) <= spec[1]:
+                continue
+            key = (task["musician"], task["action"], tuple(sorted(set(task["depends_on"]))))
+            buckets.setdefault(key, []).append(task_id)
+        for (musician, action, _deps), members in buckets.items():
+            if len(members) > 1:
+                groups.append({"musician": musician, "action": action,
+                               "batch_action": BATCHABLE_ACTIONS[action][0], "tasks": members})
+    return groups
+
+
+def _batched_duration(action, member_durations):
+    if action == "run_command":
+        # run_commands runs up to CPU-count commands at once.
+        lanes = min(len(member_durations), os.cpu_count() or 1)
+        return max(max(member_durations), sum(member_durations) / lanes)
+    return max(member_durations)
+
+
+def _batch_parameters(action, members):
+    _bulk_action, _keys, list_name = BATCHABLE_ACTIONS[action]
+    if action == "get_json":
+        return {list_name: [task["parameters"]["url"] for task in members]}
+    if action == "delete_path":
+        return {list_name: [task["parameters"]["path"] for task in members]}
+    return {list_name: [dict(task["parameters"]) for task in members]}
+
+
+def _task_timeout(task):
+    source = task["source"]
+    return source.get("timeout_s", (source.get("details") or {}).get("timeout_s"))
+
+
+def _rewritten_entry(task):
+    """The task's original entry with only its dependencies and parameters replaced; every other field is kept."""
+    entry = {"task_id": task["task_id"], "musician": task["musician"]}
+    entry.update(copy.deepcopy(task["source"]))
+    details = entry.setdefault("details", {})
+    for key in ("action", "parameters"):
+        # Mapping-layout Symphonies keep these at the top level; the rewrite uses the list layout.
+        if key in entry:
+            details.setdefault(key, entry.pop(key))
+    entry.pop("dependencies", None)
+    entry["task_id"] = task["task_id"]
+    entry["musician"] = task["musician"]
+    details["action"] = task["action"]
+    details["parameters"] = task["parameters"]
+    entry["depends_on"] = task["depends_on"]
+    return entry
+
+
+def analyze_workflow(symphony, historical_durations=None):
+    """
+    Returns the full DAG analysis, a rewritten Symphony and the predicted
+    makespan change. Rewritten tasks keep every field of their original entry
+    (timeouts included) except depends_on and parameters. A batch task carries
+    musician, action, parameters, a description and, if every member had one,
+    the sum of their timeouts as timeout_s, since its members may run one
+    after another.
+    """
+    tasks = normalize_tasks(symphony)
+    order = _topological_order(tasks)
+    by_id = {task["task_id"]: task for task in tasks}
+    duration_of = _duration_lookup(historical_durations)
+    durations = {task["task_id"]: duration_of(task) for task in tasks}
+
+    levels = _levels(tasks, order)
+    critical_path, critical_ms = _critical_path(tasks, order, durations)
+    redundant = _redundant_edges(tasks, order)
+    ordering_only = [(dep, task["task_id"]) for task in tasks for dep in dict.fromkeys(task["depends_on"])
+                     if (dep, task["task_id"]) not in redundant and not _is_data_dependency(by_id[dep], task)]
+    removable = set(redundant) | set(ordering_only)
+    chains = _serial_chains(tasks, order, removable)
+
+    # Rewrite: an ordering-only edge is replaced by the dependencies of the task
+    # it pointed at (so e.g. "directory exists" still holds), then redundant
+    # edges are dropped, the DAG is re-layered and batchable groups are merged.
+    rewritten = copy.deepcopy(tasks)
+    rewritten_by_id = {task["task_id"]: task for task in rewritten}
+    for task_id in order:
+        task = rewritten_by_id[task_id]
+        kept = []
+        worklist = list(dict.fromkeys(task["depends_on"]))
+        while worklist:
+            dep = worklist.pop(0)
+            if dep in kept:
+                continue
+            if _is_data_dependency(by_id[dep], task):
+                kept.append(dep)
+            else:
+                worklist.extend(rewritten_by_id[dep]["depends_on"])
+        task["depends_on"] = kept
+    rewritten_order = _topological_order(rewritten)
+    for dep, task_id in _redundant_edges(rewritten, rewritten_order):
+        rewritten_by_id[task_id]["depends_on"].remove(dep)
+    rewritten_levels = _levels(rewritten, rewritten_order)
+    batches = _batch_groups(rewritten, rewritten_levels)
+
+    rewritten_durations = dict(durations)
+    renamed = {}
+    for group in batches:
+        members = [rewritten_by_id.pop(task_id) for task_id in group["tasks"]]
+        batch_id = f"{members[0]['task_id']}__batch"
+        group["batch_task_id"] = batch_id
+        source = {"description": f"Batched: {', '.join(group['tasks'])}"}
+        timeouts = [_task_timeout(member) for member in members]
+        if all(timeout is not None for timeout in timeouts):
+            source["timeout_s"] = sum(timeouts)
+        rewritten_by_id[batch_id] = {
+            "task_id": batch_id,
+            "musician": group["musician"],
+            "action": group["batch_action"],
+            "parameters": _batch_parameters(group["action"], members),
+            "depends_on": list(members[0]["depends_on"]),
+            "source": source,
+        }
+        rewritten_durations[batch_id] = _batched_duration(group["action"], [durations[m["task_id"]] for m in members])
+        for member in members:
+            renamed[member["task_id"]] = batch_id
+    for task in rewritten_by_id.values():
+        task["depends_on"] = list(dict.fromkeys(renamed.get(dep, dep) for dep in task["depends_on"]))
+    rewritten_tasks = [rewritten_by_id[task_id] for task_id in
+                       dict.fromkeys(renamed.get(task["task_id"], task["task_id"]) for task in tasks)]
+
+    original_ms = simulate_makespan(tasks, durations)
+    optimized_ms = simulate_makespan(rewritten_tasks, rewritten_durations)
+
+    rewritten_symphony = {"tasks": []}
+    if isinstance(symphony, dict) and isinstance(symphony.get("tasks"), list):
+        rewritten_symphony = {key: value for key, value in symphony.items() if key != "tasks"}
+        rewritten_symphony["tasks"] = []
+    for task in rewritten_tasks:
+        rewritten_symphony["tasks"].append(_rewritten_entry(task))
+
+    return {
+        "task_count": len(tasks),
+        "edge_count": sum(len(set(task["depends_on"])) for task in tasks),
+        "levels": levels,
+        "width_per_level": [len(level) for level in levels],
+        "max_width": max((len(level) for level in levels), default=0),
+        "critical_path": {"tasks": critical_path, "duration_ms": critical_ms},
+        "task_durations_ms": durations,
+        "redundant_edges": [list(edge) for edge in redundant],
+        "ordering_only_edges": [list(edge) for edge in ordering_only],
+        "serial_chains": chains,
+        "batchable_groups": batches,
+        "rewritten_symphony": rewritten_symphony,
+        "predicted_makespan_ms": {"original": original_ms, "optimized": optimized_ms},
+    }